@@ -1,34 +1,299 @@
 import os
+import asyncio
+import functools
 import threading
 import queue
+import time
 from pathlib import Path
-from video_processing import extract_audio
-from transcription import transcribe_audio
-from content_generation import (
-    generate_title, generate_description, generate_tags,
-    generate_hashtags, generate_chapters, generate_captions
-)
+from video_processing import prepare_audio, cleanup_audio, remove_stale_temp_dirs
+from transcription import transcribe_segments, get_transcription_settings, scale_for_workers
+from transcript_cache import lookup_transcript, store_transcript
+from response_cache import response_cache
+from content_generation import CONTENT_KINDS, generate_all, agenerate_all, async_perplexity_client, is_valid_combined_response, is_error_response, prepare_deferred, complete_deferred, deferred_content
+from batch_providers import get_batch_provider, run_batch_requests
+from job_store import job_store as default_job_store
+from transcript import Transcript
+from config import config
+
+# Marks the end of a stage's input once every upstream worker has finished
+_STAGE_DONE = object()
+
+class PipelineStage:
+    """
+    A pool of worker threads running one step of the batch pipeline.
+    
+    Workers take jobs from the input queue, run the handler on them and put
+    the returned job on the output queue. The output queue is bounded, so a
+    slow downstream stage makes this stage wait instead of piling up work.
+    A handler that raises only fails its own job: on_error is called with
+    the job and the exception, and the worker moves on to the next job.
+    """
+    
+    def __init__(self, name, handler, workers, input_queue, output_queue=None, stop_when_empty=False, on_error=None):
+        self.name = name
+        self.handler = handler
+        self.on_error = on_error
+        self.workers = max(1, workers)
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.stop_when_empty = stop_when_empty
+        self.processed = 0
+        self.busy_time = 0.0
+        self.active = 0
+        self.started_at = None
+        self.finished_at = None
+        self._threads = []
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """
+        Start the stage's worker threads.
+        """
+        self.started_at = time.perf_counter()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-{index}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+    
+    def join(self):
+        """
+        Wait until every worker of the stage has exited.
+        """
+        for thread in self._threads:
+            thread.join()
+        self.finished_at = time.perf_counter()
+    
+    def close(self):
+        """
+        Tell every worker that no more input is coming.
+        """
+        for _ in range(self.workers):
+            self.input_queue.put(_STAGE_DONE)
+    
+    def get_stats(self):
+        """
+        Get utilization statistics for the stage.
+        
+        Returns:
+            dict: Worker count, processed jobs, busy time and utilization
+        """
+        with self._lock:
+            elapsed = 0.0
+            if self.started_at is not None:
+                elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+            return {
+                "workers": self.workers,
+                "active": self.active,
+                "processed": self.processed,
+                "busy_seconds": round(self.busy_time, 3),
+                "utilization": self.busy_time / (elapsed * self.workers) if elapsed else 0.0,
+                "queued": self.input_queue.qsize(),
+            }
+    
+    def _worker(self):
+        while True:
+            if self.stop_when_empty:
+                try:
+                    job = self.input_queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                job = self.input_queue.get()
+                if job is _STAGE_DONE:
+                    break
+            
+            with self._lock:
+                self.active += 1
+            start_time = time.perf_counter()
+            try:
+                job = self._run_handler(job)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.processed += 1
+                    self.busy_time += time.perf_counter() - start_time
+                self.input_queue.task_done()
+            
+            if job is not None and self.output_queue is not None:
+                self.output_queue.put(job)
+    
+    def _run_handler(self, job):
+        try:
+            return self.handler(job)
+        except Exception as e:
+            self._handle_error(job, e)
+            return None
+    
+    def _handle_error(self, job, error):
+        # An exception escaping here would end the worker, leaving the
+        # upstream stage blocked on a full queue
+        print(f"DEBUG: {self.name} stage failed: {error}")
+        if self.on_error:
+            try:
+                self.on_error(job, error)
+            except Exception as e:
+                print(f"Warning: Could not record the failed job: {e}")
+
+class AsyncPipelineStage(PipelineStage):
+    """
+    A pipeline stage whose handler is a coroutine function.
+    
+    A single thread runs an event loop that keeps up to `workers` jobs in
+    flight, so a network-bound stage can overlap many jobs without one
+    thread per job.
+    """
+    
+    def start(self):
+        """
+        Start the stage's event loop thread.
+        """
+        self.started_at = time.perf_counter()
+        thread = threading.Thread(target=asyncio.run, args=(self._run(),), name=self.name)
+        thread.daemon = True
+        thread.start()
+        self._threads.append(thread)
+    
+    def close(self):
+        """
+        Tell the stage that no more input is coming.
+        """
+        self.input_queue.put(_STAGE_DONE)
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.workers)
+        tasks = set()
+        try:
+            while True:
+                await slots.acquire()
+                job = await loop.run_in_executor(None, self.input_queue.get)
+                if job is _STAGE_DONE:
+                    break
+                task = loop.create_task(self._handle(job, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            # The pooled connections belong to this loop, which ends with the stage
+            await async_perplexity_client.aclose()
+    
+    async def _handle(self, job, slots):
+        with self._lock:
+            self.active += 1
+        start_time = time.perf_counter()
+        try:
+            job = await self.handler(job)
+        except Exception as e:
+            self._handle_error(job, e)
+            job = None
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.processed += 1
+                self.busy_time += time.perf_counter() - start_time
+            self.input_queue.task_done()
+            slots.release()
+        
+        if job is not None and self.output_queue is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.output_queue.put, job)
 
 class BatchProcessor:
     """
     Batch processor for handling multiple video files.
+    
+    Files flow through three stages, each with its own worker pool: audio
+    extraction (ffmpeg), transcription (Whisper) and content generation
+    (network bound). Bounded queues between the stages provide backpressure.
+    When audio is streamed (transcription_settings.stream_audio) the
+    transcription workers decode it just before transcribing, so at most
+    one decoded file per transcription worker is held in memory; the
+    extraction stage then only looks up cached and resumed transcripts.
+    
+    With the "async" generation engine the generation stage is a single
+    event loop thread running up to async_generate_jobs files at once.
+    With the "deferred" engine it only prepares each file's prompts; once
+    every file is through the pipeline, all prompts are sent together as
+    batch jobs of a BatchProvider and the responses written back to the
+    results.
+    
+    With a job store (batch_settings.durable_queue) every queued file and
+    the output of each stage it completes are recorded on disk, and
+    resume() re-queues the files an interrupted run left unfinished, each
+    continuing after its last completed stage.
     """
     
-    def __init__(self):
+    def __init__(self, extract_workers=None, transcribe_workers=None, generate_workers=None, stage_queue_size=None, generation_engine=None, batch_provider=None, job_store=None):
         self.processing_queue = queue.Queue()
         self.results = {}
         self.processing = False
         self.current_file = None
         self.progress_callback = None
+        self.result_callback = None
+        self.stage_callback = None
+        self.complete_callback = None
+        self.extract_workers = extract_workers or config.get_batch_setting("extract_workers") or 1
+        self.transcribe_workers = transcribe_workers or config.get_batch_setting("transcribe_workers") or self._default_transcribe_workers()
+        self.generate_workers = generate_workers or config.get_batch_setting("generate_workers") or 1
+        self.stage_queue_size = stage_queue_size or config.get_batch_setting("stage_queue_size") or 1
+        self.generation_engine = generation_engine or config.get_generation_setting("engine") or "threads"
+        self.batch_provider = batch_provider
+        self.job_store = job_store
+        if job_store is None and config.get_batch_setting("durable_queue"):
+            self.job_store = default_job_store
+        self._deferred_jobs = []
+        self.stages = []
+        self._results_lock = threading.Lock()
+        # Serializes queueing a file with a run deciding it is finished
+        self._queue_lock = threading.Lock()
+    
+    @staticmethod
+    def _default_transcribe_workers():
+        # Whisper already uses several threads per decode, so a few
+        # concurrent transcriptions are enough to saturate the cores
+        return max(1, min(4, (os.cpu_count() or 1) // 4))
     
-    def add_file(self, file_path):
+    def add_file(self, file_path, options=None, start=False):
         """
         Add a file to the processing queue.
         
+        A file added while a run is finishing is always picked up: either
+        the run sees it and continues, or the run has ended and, with
+        start, processing is restarted for it.
+        
         Args:
             file_path (str): Path to the video file
+            options (dict): Per-job options, e.g. {"generation_mode": "combined", "profile": "fast"}
+            start (bool): Start processing the queue if it is not running
+        
+        Returns:
+            bool: True if this call started processing
         """
-        self.processing_queue.put(file_path)
+        options = options or {}
+        job_id = self.job_store.add_job(file_path, options) if self.job_store else None
+        with self._queue_lock:
+            self.processing_queue.put((file_path, options, job_id))
+            return start and self._start_processing()
+    
+    def resume(self):
+        """
+        Queue the files a previous run left unfinished.
+        
+        Files still being processed by another running process that
+        shares the job store are not queued.
+        
+        Returns:
+            int: Number of files queued
+        """
+        if not self.job_store:
+            return 0
+        # Audio extracted by a run that crashed is never used again
+        remove_stale_temp_dirs()
+        jobs = self.job_store.claim_unfinished_jobs()
+        for job_id, file_path, options in jobs:
+            self.processing_queue.put((file_path, options, job_id))
+        return len(jobs)
     
     def set_progress_callback(self, callback):
         """
@@ -39,97 +304,514 @@ class BatchProcessor:
         """
         self.progress_callback = callback
     
+    def set_result_callback(self, callback):
+        """
+        Set callback function called when a file leaves the pipeline.
+        
+        Args:
+            callback (function): Called with (file_path, result) from the
+                worker thread that finished the file
+        """
+        self.result_callback = callback
+    
+    def set_stage_callback(self, callback):
+        """
+        Set callback function for structured per-file progress.
+        
+        Args:
+            callback (function): Called with (file_path, stage, fraction)
+                when a file enters a stage ("extract", "transcribe",
+                "generate") and as transcription advances
+        """
+        self.stage_callback = callback
+    
+    def set_complete_callback(self, callback):
+        """
+        Set callback function called when the queue has been processed.
+        
+        Args:
+            callback (function): Called without arguments from the batch
+                thread once processing stops
+        """
+        self.complete_callback = callback
+    
     def process_queue(self):
         """
         Process all files in the queue.
+        
+        Returns:
+            bool: True if processing was started, False if it was already
+                running
         """
+        with self._queue_lock:
+            return self._start_processing()
+    
+    def _start_processing(self):
+        # Called with self._queue_lock held
         if self.processing:
-            return
+            return False
         
         self.processing = True
         
         def worker():
-            while not self.processing_queue.empty():
+            while True:
+                # Checked under the lock add_file queues with, so a file
+                # queued now is either seen here or restarts processing
+                with self._queue_lock:
+                    if self.processing_queue.empty():
+                        self.processing = False
+                        self.current_file = None
+                        break
                 try:
-                    file_path = self.processing_queue.get_nowait()
-                    self.current_file = file_path
-                    self._update_progress(f"Processing {os.path.basename(file_path)}")
-                    
-                    # Process the file
-                    result = self._process_file(file_path)
-                    self.results[file_path] = result
-                    
-                    self._update_progress(f"Completed {os.path.basename(file_path)}")
-                    self.processing_queue.task_done()
-                except queue.Empty:
-                    break
+                    # Files added while the pipeline was draining start another run
+                    self._run_pipeline()
                 except Exception as e:
-                    self._update_progress(f"Error processing file: {e}")
+                    self._update_progress(f"Error processing batch: {e}")
             
-            self.processing = False
-            self.current_file = None
             self._update_progress("Batch processing completed")
+            if self.complete_callback:
+                self.complete_callback()
         
         # Start processing in a separate thread
         thread = threading.Thread(target=worker)
         thread.daemon = True
         thread.start()
+        return True
     
-    def _process_file(self, file_path):
+    def _run_pipeline(self):
         """
-        Process a single file.
+        Run every queued file through the extraction, transcription and
+        generation stages, returning once all of them have finished.
+        """
+        transcribe_queue = queue.Queue(maxsize=self.stage_queue_size)
+        generate_queue = queue.Queue(maxsize=self.stage_queue_size)
+        
+        self.stages = [
+            PipelineStage("extract", self._extract_stage, self.extract_workers,
+                          self.processing_queue, transcribe_queue, stop_when_empty=True,
+                          on_error=self._fail_job),
+            PipelineStage("transcribe", self._transcribe_stage, self.transcribe_workers,
+                          transcribe_queue, generate_queue, on_error=self._fail_job),
+            self._create_generate_stage(generate_queue),
+        ]
+        for stage in self.stages:
+            stage.start()
+        
+        for upstream, downstream in zip(self.stages, self.stages[1:]):
+            upstream.join()
+            downstream.close()
+        self.stages[-1].join()
+        
+        if self._deferred_jobs:
+            self._run_deferred()
+        
+        summary = ", ".join(
+            f"{stage.name} {stats['utilization']:.0%} ({stats['workers']} workers)"
+            for stage, stats in ((stage, stage.get_stats()) for stage in self.stages)
+        )
+        print(f"DEBUG: Batch stage utilization: {summary}")
+        self._update_progress(f"Stage utilization: {summary}")
+        
+        cache_stats = response_cache.get_stats()
+        print(f"DEBUG: Response cache hit ratio {cache_stats['hit_ratio']:.0%}, "
+              f"{cache_stats['tokens_saved']} tokens saved")
+    
+    def _create_generate_stage(self, generate_queue):
+        if self.generation_engine == "async":
+            jobs = config.get_batch_setting("async_generate_jobs") or 50
+            return AsyncPipelineStage("generate", self._agenerate_stage, jobs, generate_queue, on_error=self._fail_job)
+        if self.generation_engine == "deferred":
+            return PipelineStage("generate", self._prepare_stage, self.generate_workers, generate_queue, on_error=self._fail_job)
+        return PipelineStage("generate", self._generate_stage, self.generate_workers, generate_queue, on_error=self._fail_job)
+    
+    def _new_job(self, file_path, options, job_id=None):
+        return {
+            "file": file_path,
+            "options": options,
+            "job_id": job_id,
+            "audio": None,
+            "audio_path": None,
+            "transcript": None,
+            "settings": None,
+            "cache_key": None,
+            "result": {
+                "file": file_path,
+                "job_id": job_id,
+                "status": "failed",
+                "error": None,
+                "content": {},
+                "timings": {}
+            }
+        }
+    
+    def _extract_stage(self, item):
+        """
+        Extraction stage: pull the audio track out of the video.
         
         Args:
-            file_path (str): Path to the video file
+            item (tuple): (file_path, options, job_id) as queued by add_file
         
         Returns:
-            dict: Processing results
+            dict: Job for the transcription stage, or None if extraction failed
         """
-        result = {
-            "file": file_path,
-            "status": "failed",
-            "error": None,
-            "content": {}
-        }
+        file_path, options, job_id = item
+        job = self._new_job(file_path, options, job_id)
+        self.current_file = file_path
         
         try:
-            # Extract audio
-            self._update_progress("Extracting audio...")
-            audio_path = extract_audio(file_path)
-            if not audio_path:
-                result["error"] = "Failed to extract audio"
-                return result
+            settings = get_transcription_settings(options.get("profile"))
+            # Let the shared model decode one file per transcription worker
+            job["settings"] = scale_for_workers(settings, self.transcribe_workers)
+            # Record what the transcript was produced with
+            job["result"]["transcription_settings"] = job["settings"]
             
-            # Transcribe audio
-            self._update_progress("Transcribing audio...")
-            transcript = transcribe_audio(audio_path)
-            if not transcript:
-                result["error"] = "Failed to transcribe audio"
-                return result
-            result["transcript"] = transcript # Store transcript in result
+            if self._restore_job(job):
+                return job
             
-            # Generate content
-            self._update_progress("Generating content...")
-            result["content"]["title"] = generate_title(transcript)
-            result["content"]["description"] = generate_description(transcript)
-            result["content"]["tags"] = generate_tags(transcript)
-            result["content"]["hashtags"] = generate_hashtags(transcript)
-            result["content"]["chapters"] = generate_chapters(transcript)
-            result["content"]["captions"] = generate_captions(transcript)
+            # A cached transcript lets the job skip extraction and transcription
+            job["cache_key"], transcript = lookup_transcript(file_path, job["settings"])
+            if transcript:
+                self._update_progress(f"Using cached transcript: {os.path.basename(file_path)}")
+                job["transcript"] = transcript
+                job["result"]["transcript"] = transcript.text
+                job["result"]["segments"] = transcript.to_dict()
+                job["result"]["cached_transcript"] = True
+                return job
             
-            result["status"] = "success"
+            if config.get_transcription_setting("stream_audio"):
+                # Decoded PCM takes ~230 MB per hour of audio; the
+                # transcription stage decodes it right before use, so jobs
+                # waiting in the queue only hold the file path
+                return job
+            if not self._extract_audio(job):
+                self._finish_job(job)
+                return None
+            return job
+        except Exception as e:
+            job["result"]["error"] = str(e)
+            self._finish_job(job)
+            return None
+    
+    def _extract_audio(self, job):
+        """
+        Extract or decode the audio of a job into job["audio"].
+        
+        Returns:
+            bool: True on success; on failure the job's error is set
+        """
+        self._update_progress(f"Extracting audio: {os.path.basename(job['file'])}")
+        self._report_stage(job["file"], "extract")
+        start_time = time.perf_counter()
+        try:
+            job["audio"], job["audio_path"] = prepare_audio(job["file"])
+        finally:
+            job["result"]["timings"]["extract"] = time.perf_counter() - start_time
+        if job["audio"] is None:
+            job["result"]["error"] = "Failed to extract audio"
+            return False
+        return True
+    
+    def _restore_job(self, job):
+        """
+        Reuse the stage outputs a previous run recorded for this job.
+        
+        Returns:
+            bool: True if the stored transcript lets the job skip
+                extraction and transcription
+        """
+        if not self.job_store or job["job_id"] is None:
+            return False
+        stored = self.job_store.get_job(job["job_id"])
+        if stored is None:
+            return False
+        job["result"]["content"].update(stored["content"])
+        
+        if stored["segments"]:
+            transcript = Transcript.from_dict(stored["segments"])
+            self._update_progress(f"Resuming after transcription: {os.path.basename(job['file'])}")
+            job["transcript"] = transcript
+            job["result"]["transcript"] = transcript.text
+            job["result"]["segments"] = stored["segments"]
+            job["result"]["resumed_from"] = "transcribed"
+            return True
+        return False
+    
+    def _remaining_kinds(self, job):
+        # Fields generated by a previous run are not generated again
+        return [kind for kind in CONTENT_KINDS if kind not in job["result"]["content"]]
+    
+    def _transcribe_stage(self, job):
+        """
+        Transcription stage: run Whisper on the extracted audio, decoding
+        it first when audio is streamed.
+        
+        Args:
+            job (dict): Job produced by the extraction stage
+        
+        Returns:
+            dict: Job for the generation stage, or None if transcription failed
+        """
+        if job["transcript"] is not None:
+            return job
+        
+        name = os.path.basename(job['file'])
+        reported_step = 0
+        
+        def on_progress(fraction):
+            # Report in 10% steps so long files do not flood the callback
+            nonlocal reported_step
+            self._report_stage(job["file"], "transcribe", fraction)
+            step = int(fraction * 10)
+            if step > reported_step:
+                reported_step = step
+                self._update_progress(f"Transcribing audio: {name} ({step * 10}%)")
+        
+        start_time = None
+        try:
+            if job["audio"] is None and not self._extract_audio(job):
+                self._finish_job(job)
+                return None
             
-            # Clean up temporary audio file
+            self._update_progress(f"Transcribing audio: {name}")
+            self._report_stage(job["file"], "transcribe")
+            start_time = time.perf_counter()
+            vad_report = {}
+            transcript = transcribe_segments(job["audio"], on_progress, job["settings"], vad_report)
+            if vad_report:
+                job["result"]["vad"] = vad_report
+            if not transcript:
+                job["result"]["error"] = "Failed to transcribe audio"
+                self._finish_job(job)
+                return None
+            job["transcript"] = transcript
+            job["result"]["transcript"] = transcript.text # Store transcript in result
+            job["result"]["segments"] = transcript.to_dict()
+            store_transcript(job["cache_key"], transcript, job["file"], job["settings"])
+            if self.job_store and job["job_id"] is not None:
+                self.job_store.mark_transcribed(job["job_id"], job["result"]["segments"])
+            return job
+        except Exception as e:
+            job["result"]["error"] = str(e)
+            self._finish_job(job)
+            return None
+        finally:
+            if start_time is not None:
+                job["result"]["timings"]["transcribe"] = time.perf_counter() - start_time
+            # The audio is not needed once it has been transcribed
+            job["audio"] = None
+            cleanup_audio(job["audio_path"])
+    
+    def _generate_stage(self, job):
+        """
+        Generation stage: create all content from the transcript.
+        
+        Args:
+            job (dict): Job produced by the transcription stage
+        """
+        self._update_progress(f"Generating content: {os.path.basename(job['file'])}")
+        self._report_stage(job["file"], "generate")
+        start_time = time.perf_counter()
+        try:
+            generation_report = {}
+            content = generate_all(job["transcript"], self._remaining_kinds(job), mode=job["options"].get("generation_mode"), report=generation_report)
+            self._record_content(job, content, generation_report)
+        except Exception as e:
+            job["result"]["error"] = str(e)
+        finally:
+            job["result"]["timings"]["generate"] = time.perf_counter() - start_time
+            self._finish_job(job)
+        self._update_progress(f"Completed {os.path.basename(job['file'])}")
+        return None
+    
+    async def _agenerate_stage(self, job):
+        """
+        Generation stage for the async engine; see _generate_stage.
+        """
+        self._update_progress(f"Generating content: {os.path.basename(job['file'])}")
+        self._report_stage(job["file"], "generate")
+        start_time = time.perf_counter()
+        try:
+            generation_report = {}
+            content = await agenerate_all(job["transcript"], self._remaining_kinds(job), mode=job["options"].get("generation_mode"), report=generation_report)
+            self._record_content(job, content, generation_report)
+        except Exception as e:
+            job["result"]["error"] = str(e)
+        finally:
+            job["result"]["timings"]["generate"] = time.perf_counter() - start_time
+            self._finish_job(job)
+        self._update_progress(f"Completed {os.path.basename(job['file'])}")
+        return None
+    
+    def _prepare_stage(self, job):
+        """
+        Generation stage for the deferred engine: plan the API requests of
+        a file and hold the job until the batch is sent.
+        
+        Args:
+            job (dict): Job produced by the transcription stage
+        """
+        self._report_stage(job["file"], "generate")
+        job["generate_started"] = time.perf_counter()
+        job["generation_report"] = {}
+        try:
+            job["plan"] = prepare_deferred(job["transcript"], self._remaining_kinds(job), mode=job["options"].get("generation_mode"), report=job["generation_report"])
+        except Exception as e:
+            job["result"]["error"] = str(e)
+            self._finish_job(job)
+            return None
+        
+        if not job["plan"]["requests"]:
+            self._finish_deferred(job)
+            return None
+        with self._results_lock:
+            self._deferred_jobs.append(job)
+        self._update_progress(f"Deferred content generation: {os.path.basename(job['file'])}")
+        return None
+    
+    def _run_deferred(self):
+        """
+        Send the requests of every deferred job as provider batch jobs and
+        complete the jobs with the responses.
+        """
+        jobs = self._deferred_jobs
+        self._deferred_jobs = []
+        try:
+            provider = self.batch_provider or get_batch_provider()
+        except ValueError as e:
+            for job in jobs:
+                job["result"]["error"] = str(e)
+                self._finish_job(job)
+            return
+        
+        batch_round = 1
+        while jobs:
+            requests = {
+                f"{index}:{name}": prompts
+                for index, job in enumerate(jobs)
+                for name, prompts in job["plan"]["requests"].items()
+            }
+            # Combined responses that do not parse are kept out of the cache
+            validators = {
+                f"{index}:combined": functools.partial(is_valid_combined_response, kinds=job["plan"]["combined_kinds"])
+                for index, job in enumerate(jobs)
+                if "combined" in job["plan"]["requests"]
+            }
+            self._update_progress(f"Sending deferred batch {batch_round}: {len(requests)} requests for {len(jobs)} files")
             try:
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
+                responses = run_batch_requests(requests, provider, progress_callback=self._update_progress, validators=validators)
             except Exception as e:
-                print(f"Warning: Could not remove temporary audio file: {e}")
-                
+                responses = {custom_id: f"Error: batch submission failed: {e}" for custom_id in requests}
+            
+            by_job = {}
+            for custom_id, text in responses.items():
+                index, name = custom_id.split(":", 1)
+                by_job.setdefault(int(index), {})[name] = text
+            
+            remaining = []
+            for index, job in enumerate(jobs):
+                if complete_deferred(job["plan"], by_job.get(index, {})):
+                    self._finish_deferred(job)
+                else:
+                    remaining.append(job)
+            jobs = remaining
+            batch_round += 1
+    
+    def _finish_deferred(self, job):
+        try:
+            self._record_content(job, deferred_content(job["plan"]), job["generation_report"])
         except Exception as e:
-            result["error"] = str(e)
+            job["result"]["error"] = str(e)
+        job["result"]["timings"]["generate"] = time.perf_counter() - job["generate_started"]
+        job["result"]["deferred"] = True
+        self._finish_job(job)
+        self._update_progress(f"Completed {os.path.basename(job['file'])}")
+    
+    def _record_content(self, job, content, generation_report):
+        result = job["result"]
+        if generation_report.get("tokens_saved"):
+            result["prompt_tokens_saved"] = generation_report["tokens_saved"]
+        if generation_report.get("map_windows"):
+            result["map_windows"] = generation_report["map_windows"]
         
-        return result
+        # Keep API error messages out of the content so they are never exported
+        failed = {kind: text for kind, text in content.items() if is_error_response(text)}
+        generated = {kind: text for kind, text in content.items() if kind not in failed}
+        result["content"].update(generated)
+        if self.job_store and job["job_id"] is not None:
+            self.job_store.save_content(job["job_id"], generated)
+        if failed:
+            result["failed_kinds"] = sorted(failed)
+            result["error"] = f"Generation failed for {', '.join(sorted(failed))}: {next(iter(failed.values()))}"
+        else:
+            result["status"] = "success"
+    
+    def _finish_job(self, job):
+        if job.get("finished"):
+            return
+        job["finished"] = True
+        result = job["result"]
+        summary = result
+        if self.job_store and job["job_id"] is not None:
+            try:
+                self.job_store.finish_job(job["job_id"], result["status"], result["error"], result["timings"])
+                # The store holds the transcript and content; keeping them here
+                # too would grow memory with every file of a large batch
+                summary = {key: value for key, value in result.items() if key not in ("transcript", "segments", "content")}
+            except Exception as e:
+                # The job stays pending in the store and is resumed later
+                print(f"Warning: Could not record finished job {job['file']}: {e}")
+        with self._results_lock:
+            self.results[job["file"]] = summary
+        if self.result_callback:
+            try:
+                self.result_callback(job["file"], result)
+            except Exception as e:
+                print(f"Warning: Result callback failed for {job['file']}: {e}")
+    
+    def _fail_job(self, job, error):
+        """
+        Record a job whose stage raised as failed.
+        
+        Args:
+            job: Input of the stage; a (file_path, options, job_id) tuple as
+                queued by add_file, or a job dict
+            error (Exception): What the stage raised
+        """
+        if isinstance(job, tuple):
+            job = self._new_job(*job)
+        if job.get("finished"):
+            return
+        job["result"]["status"] = "failed"
+        job["result"]["error"] = str(error)
+        self._finish_job(job)
+    
+    def _process_file(self, file_path, options=None):
+        """
+        Process a single file through every stage on the calling thread.
+        
+        Args:
+            file_path (str): Path to the video file
+            options (dict): Per-job options, as for add_file
+        
+        Returns:
+            dict: Processing results; without the transcript and content
+                when a job store keeps them
+        """
+        job = self._extract_stage((file_path, options or {}, None))
+        if job is not None:
+            job = self._transcribe_stage(job)
+        if job is not None:
+            if self.generation_engine == "deferred":
+                self._prepare_stage(job)
+                if self._deferred_jobs:
+                    self._run_deferred()
+            else:
+                self._generate_stage(job)
+        return self.results[file_path]
+    
+    def _report_stage(self, file_path, stage, fraction=0.0):
+        if self.stage_callback:
+            self.stage_callback(file_path, stage, fraction)
     
     def _update_progress(self, message):
         """
@@ -146,10 +828,21 @@ class BatchProcessor:
         Get processing results.
         
         Returns:
-            dict: Processing results
+            dict: File path mapped to its result; with a job store, results
+                only hold the status, error, timings and job ID, and the
+                content is read back with job_store.get_job
         """
         return self.results
     
+    def get_stage_stats(self):
+        """
+        Get per-stage utilization of the current or last pipeline run.
+        
+        Returns:
+            dict: Stage name mapped to its statistics
+        """
+        return {stage.name: stage.get_stats() for stage in self.stages}
+    
     def is_processing(self):
         """
         Check if batch processing is active.
@@ -169,8 +862,8 @@ class BatchProcessor:
         return self.processing_queue.qsize()
 
 # Example usage:
-# processor = BatchProcessor()
+# processor = BatchProcessor(extract_workers=2, generate_workers=4)
 # processor.add_file("video1.mp4")
 # processor.add_file("video2.mp4")
 # processor.set_progress_callback(lambda msg: print(msg))
-# processor.process_queue()
\ No newline at end of file
+# processor.process_queue()
@@ -0,0 +1,282 @@
+import os
+import json
+import time
+import uuid
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from config import config
+from content_generation import perplexity_client, is_error_response
+
+class BatchProvider:
+    """
+    Interface of a provider that runs chat requests as one batch job.
+
+    A batch job is a JSONL file with one request per line:
+    {"custom_id": ..., "body": {"model": ..., "messages": [...]}}.
+    Providers submit the file, report its status when polled and return
+    the response text of every request once the job has completed.
+    """
+
+    name = None
+    # Provider quotas: requests per job file and jobs running at once
+    max_requests_per_batch = 1000
+    max_active_batches = 1
+
+    def submit(self, job_file):
+        """
+        Submit a batch job file.
+
+        Args:
+            job_file (str): Path to the JSONL job file
+
+        Returns:
+            str: Batch ID used to poll the job
+        """
+        raise NotImplementedError
+
+    def poll(self, batch_id):
+        """
+        Get the status of a batch job.
+
+        Args:
+            batch_id (str): ID returned by submit
+
+        Returns:
+            str: "pending", "completed" or "failed"
+        """
+        raise NotImplementedError
+
+    def fetch_results(self, batch_id):
+        """
+        Get the responses of a completed batch job.
+
+        Args:
+            batch_id (str): ID returned by submit
+
+        Returns:
+            dict: custom_id mapped to the response text or an error message
+        """
+        raise NotImplementedError
+
+def read_job_file(job_file):
+    """
+    Read the requests of a batch job file.
+
+    Returns:
+        list: (custom_id, system prompt, user prompt) tuples
+    """
+    requests = []
+    with open(job_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            messages = {message["role"]: message["content"] for message in entry["body"]["messages"]}
+            requests.append((entry["custom_id"], messages.get("system", ""), messages.get("user", "")))
+    return requests
+
+class MockBatchProvider(BatchProvider):
+    """
+    Local provider that answers every request itself, for tests and dry runs.
+
+    Jobs report "pending" for pending_polls polls before completing.
+    """
+
+    name = "mock"
+
+    def __init__(self, responder=None, pending_polls=0, max_requests_per_batch=1000, max_active_batches=2):
+        self.responder = responder or (lambda system_prompt, user_prompt: f"Mock response to: {user_prompt[:60]}")
+        self.pending_polls = pending_polls
+        self.max_requests_per_batch = max_requests_per_batch
+        self.max_active_batches = max_active_batches
+        self.submitted = []
+        self._jobs = {}
+
+    def submit(self, job_file):
+        batch_id = f"mock-{uuid.uuid4().hex[:12]}"
+        self._jobs[batch_id] = {"requests": read_job_file(job_file), "polls": 0}
+        self.submitted.append(batch_id)
+        return batch_id
+
+    def poll(self, batch_id):
+        job = self._jobs[batch_id]
+        job["polls"] += 1
+        return "completed" if job["polls"] > self.pending_polls else "pending"
+
+    def fetch_results(self, batch_id):
+        return {
+            custom_id: self.responder(system_prompt, user_prompt)
+            for custom_id, system_prompt, user_prompt in self._jobs.pop(batch_id)["requests"]
+        }
+
+class PerplexityBatchProvider(BatchProvider):
+    """
+    Runs batch jobs through the regular Perplexity client.
+
+    Perplexity has no batch endpoint, so each job is worked off in the
+    background through the shared client, which keeps it under the
+    configured rate limits and retries throttled requests.
+    """
+
+    name = "perplexity"
+
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency or config.get_generation_setting("max_concurrency") or 4
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_file):
+        batch_id = f"local-{uuid.uuid4().hex[:12]}"
+        requests = read_job_file(job_file)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="batch")
+        # run_batch_requests checks and fills the response cache itself
+        futures = {
+            custom_id: executor.submit(perplexity_client.chat, system_prompt, user_prompt, use_cache=False)
+            for custom_id, system_prompt, user_prompt in requests
+        }
+        executor.shutdown(wait=False)
+        with self._lock:
+            self._jobs[batch_id] = futures
+        return batch_id
+
+    def poll(self, batch_id):
+        with self._lock:
+            futures = self._jobs[batch_id]
+        return "completed" if all(future.done() for future in futures.values()) else "pending"
+
+    def fetch_results(self, batch_id):
+        with self._lock:
+            futures = self._jobs.pop(batch_id)
+        results = {}
+        for custom_id, future in futures.items():
+            try:
+                results[custom_id] = future.result()
+            except Exception as e:
+                results[custom_id] = f"Error calling Perplexity API: {e}"
+        return results
+
+# Provider name mapped to its class
+BATCH_PROVIDERS = {
+    "perplexity": PerplexityBatchProvider,
+    "mock": MockBatchProvider,
+}
+
+def get_batch_provider(name=None):
+    """
+    Create the batch provider with the given name.
+
+    Args:
+        name (str): Provider name; defaults to batch_settings.deferred_provider
+
+    Returns:
+        BatchProvider: Provider instance
+
+    Raises:
+        ValueError: If there is no provider with that name
+    """
+    name = name or config.get_batch_setting("deferred_provider") or "perplexity"
+    if name not in BATCH_PROVIDERS:
+        raise ValueError(f"Unknown batch provider: {name}")
+    return BATCH_PROVIDERS[name]()
+
+def write_job_file(requests, job_dir=None):
+    """
+    Write requests to a new batch job file.
+
+    Args:
+        requests (list): (custom_id, system prompt, user prompt) tuples
+        job_dir (str): Directory for job files; defaults to
+            batch_settings.deferred_job_dir
+
+    Returns:
+        str: Path to the job file
+    """
+    job_dir = Path(job_dir or config.get_batch_setting("deferred_job_dir") or "cache/batches")
+    job_dir.mkdir(parents=True, exist_ok=True)
+    job_file = job_dir / f"batch_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.jsonl"
+    with open(job_file, "w", encoding="utf-8") as f:
+        for custom_id, system_prompt, user_prompt in requests:
+            body = perplexity_client.build_payload(system_prompt, user_prompt)
+            f.write(json.dumps({"custom_id": custom_id, "body": body}) + "\n")
+    return str(job_file)
+
+def run_batch_requests(requests, provider=None, job_dir=None, poll_interval=None, progress_callback=None, validators=None):
+    """
+    Run chat requests as provider batch jobs and wait for every response.
+
+    Requests already in the response cache are answered from it. The rest
+    are split into job files of at most max_requests_per_batch requests,
+    with up to max_active_batches jobs submitted at a time, so throughput
+    is bounded only by the provider's batch quotas. Successful responses
+    are stored in the response cache. Job files are deleted once their
+    job has completed.
+
+    Args:
+        requests (dict): Custom ID mapped to (system prompt, user prompt)
+        provider (BatchProvider): Provider; defaults to get_batch_provider()
+        job_dir (str): Directory for the job files
+        poll_interval (float): Seconds between polls; defaults to
+            batch_settings.deferred_poll_interval
+        progress_callback (function): Called with progress messages
+        validators (dict): Custom ID mapped to a function that checks the
+            response text; responses it rejects are not cached
+
+    Returns:
+        dict: Custom ID mapped to the response text or an error message
+    """
+    provider = provider or get_batch_provider()
+    if poll_interval is None:
+        poll_interval = config.get_batch_setting("deferred_poll_interval")
+        if poll_interval is None:
+            poll_interval = 30
+
+    validators = validators or {}
+    results = {}
+    pending = []
+    cache_keys = {}
+    for custom_id, (system_prompt, user_prompt) in requests.items():
+        cache_keys[custom_id], cached = perplexity_client.lookup_cache(
+            system_prompt, user_prompt, validate=validators.get(custom_id)
+        )
+        if cached is not None:
+            results[custom_id] = cached
+        else:
+            pending.append((custom_id, system_prompt, user_prompt))
+
+    size = max(1, provider.max_requests_per_batch)
+    chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+    active = {}
+    while chunks or active:
+        while chunks and len(active) < max(1, provider.max_active_batches):
+            chunk = chunks.pop(0)
+            job_file = write_job_file(chunk, job_dir)
+            batch_id = provider.submit(job_file)
+            active[batch_id] = (chunk, job_file)
+            print(f"DEBUG: Submitted batch {batch_id} with {len(chunk)} requests")
+            if progress_callback:
+                progress_callback(f"Submitted batch job {batch_id} ({len(chunk)} requests)")
+
+        finished = False
+        for batch_id in list(active):
+            status = provider.poll(batch_id)
+            if status == "pending":
+                continue
+            finished = True
+            chunk, job_file = active.pop(batch_id)
+            outputs = {}
+            if status == "completed":
+                outputs = provider.fetch_results(batch_id)
+                # Failed job files are kept for inspection
+                os.remove(job_file)
+            for custom_id, _, _ in chunk:
+                text = outputs.get(custom_id) or f"Error: batch job {batch_id} returned no response ({status})"
+                results[custom_id] = text
+                if not is_error_response(text):
+                    perplexity_client.store_cache(cache_keys[custom_id], text, {}, validate=validators.get(custom_id))
+            if progress_callback:
+                progress_callback(f"Batch job {batch_id} {status}: {len(results)} of {len(requests)} responses")
+
+        if active and not finished:
+            time.sleep(poll_interval)
+    return results
@@ -0,0 +1,86 @@
+"""
+Measure how long the app's modules take to import, against a budget.
+
+Usage:
+    python benchmarks/benchmark_imports.py [--runs N] [--scale X] [module ...]
+
+Each module is imported in a fresh interpreter, so nothing is cached
+between runs, and the median time is compared with its budget. The run
+also fails if importing a module pulls in a heavy ML package (torch,
+faster_whisper, ctranslate2), which must only load on first transcription.
+Exits with status 1 when anything is over budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median import time budget per module, in milliseconds
+IMPORT_BUDGETS_MS = {
+    "config": 50,
+    "transcription": 400,
+    "content_generation": 600,
+    "batch_processing": 900,
+    "cli": 1000,
+}
+
+HEAVY_MODULES = ("torch", "faster_whisper", "ctranslate2")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def measure(module, runs):
+    """
+    Import a module in fresh interpreters.
+
+    Returns:
+        tuple: (median milliseconds, heavy modules that were imported)
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    times = []
+    heavy = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        # The last line is the probe's; config may print before it
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["ms"])
+        heavy.update(result["heavy"])
+    return statistics.median(times), sorted(heavy)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="Modules to measure (default: all with a budget)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh imports per module")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. for slow CI machines")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules or IMPORT_BUDGETS_MS:
+        budget = IMPORT_BUDGETS_MS.get(module, 1000) * args.scale
+        try:
+            median_ms, heavy = measure(module, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{module:20s} import failed:\n{e.stderr}")
+            failed = True
+            continue
+        over = median_ms > budget or heavy
+        failed = failed or over
+        note = f"  imports {', '.join(heavy)}" if heavy else ""
+        print(f"{module:20s} {median_ms:7.1f} ms  (budget {budget:.0f} ms)  {'FAIL' if over else 'ok'}{note}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
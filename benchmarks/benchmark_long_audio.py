@@ -0,0 +1,64 @@
+"""
+Compare single-stream and chunked parallel transcription of a long recording.
+
+Usage:
+    python benchmarks/benchmark_long_audio.py talk.mp4 [--workers N] [--chunk-seconds S]
+
+Both runs decode on the CPU with the configured profile's model, compute
+type and decoding options, as the chunk workers do, so only the
+parallelism differs. The single-stream run reuses a warmed-up model, so
+its time is pure decoding. The chunked run includes starting the worker
+processes and loading a model in each of them.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_processing import decode_audio
+from vad import SAMPLE_RATE
+from transcription import (
+    model_registry, transcribe_chunked, get_transcription_settings, get_chunk_workers
+)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("media", help="Video or audio file to transcribe")
+    parser.add_argument("--workers", type=int, default=None, help="Chunk worker processes")
+    parser.add_argument("--chunk-seconds", type=float, default=None, help="Target chunk length")
+    args = parser.parse_args()
+
+    audio = decode_audio(args.media)
+    if audio is None:
+        sys.exit(f"Could not decode {args.media}")
+    settings = get_transcription_settings()
+    workers = args.workers or get_chunk_workers()
+    print(f"Audio: {len(audio) / SAMPLE_RATE:.0f}s, model: {settings['model_size']}, workers: {workers}")
+
+    model = model_registry.get_model(
+        settings["model_size"],
+        device="cpu",
+        compute_type=settings["compute_type"] or "int8",
+        cpu_threads=settings["cpu_threads"],
+    )
+    start_time = time.perf_counter()
+    segments, _ = model.transcribe(
+        audio,
+        beam_size=settings["beam_size"],
+        vad_filter=settings["vad_filter"],
+        word_timestamps=settings["word_timestamps"],
+    )
+    single_count = len(list(segments))
+    single_time = time.perf_counter() - start_time
+    print(f"Single stream: {single_time:.1f}s ({single_count} segments)")
+
+    start_time = time.perf_counter()
+    chunked_count = len(list(transcribe_chunked(audio, settings, args.chunk_seconds, workers)))
+    chunked_time = time.perf_counter() - start_time
+    print(f"Chunked:       {chunked_time:.1f}s ({chunked_count} segments)")
+    print(f"Speedup:       {single_time / chunked_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
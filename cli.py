@@ -0,0 +1,346 @@
+"""
+Headless command line entry point for batch runs.
+
+    python -m cli batch <dir|glob|file> ... [--workers N] [--profile fast] [--out DIR] [--retry-failed]
+    python -m cli daemon --spool DIR [--watch DIR] [--out DIR] [--profile fast] [--settle SECONDS]
+    python -m cli jobs [--retry-failed] [--prune]
+
+Progress is written to stdout as one JSON object per line; the debug
+output of the pipeline goes to stderr. Nothing here imports Flet.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import signal
+import argparse
+import threading
+from pathlib import Path
+from config import config
+from batch_processing import BatchProcessor
+from job_store import job_store
+from content_generation import GENERATION_MODES
+from export_utils import export_content
+from transcript import Transcript
+from transcription import model_registry, get_transcription_settings, scale_for_workers
+from hot_folder import HotFolderWatcher, VIDEO_EXTENSIONS
+
+# Real stdout, reserved for JSON events once main() redirects prints
+_events = sys.stdout
+_events_lock = threading.Lock()
+
+def emit(event, **fields):
+    """
+    Write one machine-readable progress event.
+
+    Args:
+        event (str): Event name, e.g. "progress", "result" or "summary"
+        **fields: Event data
+    """
+    with _events_lock:
+        _events.write(json.dumps({"event": event, "time": round(time.time(), 3), **fields}) + "\n")
+        _events.flush()
+
+def expand_inputs(inputs):
+    """
+    Expand directories and glob patterns into video files.
+
+    Args:
+        inputs (list): Directories, glob patterns or file paths
+
+    Returns:
+        list: Video file paths, without duplicates, in input order
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(
+                str(path) for path in Path(item).iterdir()
+                if path.is_file() and path.suffix.lower() in VIDEO_EXTENSIONS
+            )
+        elif glob.has_magic(item):
+            matches = sorted(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+        else:
+            matches = [item] if os.path.isfile(item) else []
+        if not matches:
+            emit("warning", message=f"No video files match {item}")
+        files.extend(path for path in matches if path not in files)
+    return files
+
+def export_result(file_path, result, out_dir):
+    """
+    Write the content of a successful result to out_dir.
+
+    Returns:
+        list: Paths of the exported files
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    base_filename = os.path.join(out_dir, Path(file_path).stem)
+    transcript = Transcript.from_dict(result["segments"]) if result.get("segments") else None
+    return export_content(result["content"], base_filename, transcript)
+
+def warm_up(profile, workers=1):
+    """
+    Load the Whisper model of a profile before the first file needs it.
+
+    Args:
+        profile (str): Transcription profile
+        workers (int): Concurrent transcriptions the model is loaded for
+    """
+    settings = scale_for_workers(get_transcription_settings(profile), workers)
+    model_registry.warm_up(
+        settings["model_size"], None, settings["compute_type"],
+        settings["cpu_threads"], settings["num_workers"],
+    )
+
+def _create_processor(args):
+    return BatchProcessor(
+        transcribe_workers=args.workers,
+        generate_workers=args.generate_workers,
+        generation_engine=args.engine,
+    )
+
+def _job_options(args):
+    options = {"profile": args.profile}
+    if args.mode:
+        options["generation_mode"] = args.mode
+    return options
+
+def _on_result(args, summary):
+    lock = threading.Lock()
+
+    def on_result(file_path, result):
+        exported = []
+        if result["status"] == "success" and args.out:
+            try:
+                exported = export_result(file_path, result, args.out)
+            except Exception as e:
+                result["status"] = "failed"
+                result["error"] = f"Export failed: {e}"
+        with lock:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        emit(
+            "result",
+            file=file_path,
+            status=result["status"],
+            error=result["error"],
+            timings=result["timings"],
+            exported=exported,
+        )
+    return on_result
+
+def run_batch(args):
+    """
+    Process files once and exit.
+
+    Returns:
+        int: Exit code; 0 if every file succeeded, 1 otherwise
+    """
+    files = expand_inputs(args.inputs)
+    processor = _create_processor(args)
+    if args.retry_failed and processor.job_store:
+        emit("requeued", jobs=processor.job_store.requeue_failed())
+    resumed = processor.resume() if args.resume or args.retry_failed else 0
+    if not files and not resumed:
+        emit("summary", total=0, success=0, failed=0, seconds=0.0)
+        return 1
+
+    summary = {}
+    processor.set_progress_callback(lambda message: emit("progress", message=message))
+    processor.set_result_callback(_on_result(args, summary))
+    warm_up(args.profile, processor.transcribe_workers)
+
+    options = _job_options(args)
+    for file_path in files:
+        processor.add_file(file_path, dict(options))
+    emit("queued", files=len(files), resumed=resumed)
+
+    start_time = time.perf_counter()
+    processor.process_queue()
+    while processor.is_processing():
+        time.sleep(0.2)
+
+    failed = summary.get("failed", 0)
+    emit(
+        "summary",
+        total=summary.get("success", 0) + failed,
+        success=summary.get("success", 0),
+        failed=failed,
+        seconds=round(time.perf_counter() - start_time, 3),
+        stages=processor.get_stage_stats(),
+    )
+    return 1 if failed else 0
+
+def run_jobs(args):
+    """
+    Report the job store and optionally requeue failed jobs or remove
+    finished ones.
+
+    Returns:
+        int: Exit code
+    """
+    if not config.get_batch_setting("durable_queue"):
+        emit("warning", message="The job store is disabled (batch_settings.durable_queue)")
+        return 1
+    if args.retry_failed:
+        # Processed by the next batch --resume, daemon or GUI start
+        emit("requeued", jobs=job_store.requeue_failed())
+    if args.prune:
+        pruned = job_store.count_jobs("done")
+        job_store.clear(finished_only=True)
+        emit("pruned", jobs=pruned)
+    emit("jobs", **job_store.get_stats())
+    return 0
+
+def _accept_spool_file(path, spool, options, settle_seconds=0):
+    """
+    Read one spool job file and move it out of the way.
+
+    A job file is JSON: {"file": "video.mp4", "options": {...}} or
+    {"files": [...], "options": {...}}. Writers should create it under
+    another name (e.g. job.json.tmp) and rename it into place; a *.json
+    file modified within settle_seconds is left for a later poll in case
+    it is still being written.
+
+    Returns:
+        list: (file path, options) to queue; empty for a rejected file or
+            one that has not settled yet
+    """
+    try:
+        if time.time() - path.stat().st_mtime < settle_seconds:
+            return []
+    except OSError:
+        # Renamed or removed since the spool was listed
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        paths = data.get("files") or [data["file"]]
+        job_options = {**options, **data.get("options", {})}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        emit("rejected", job=str(path), error=str(e))
+        shutil.move(str(path), str(spool / "rejected" / path.name))
+        return []
+    shutil.move(str(path), str(spool / "accepted" / path.name))
+    return [(file_path, dict(job_options)) for file_path in paths]
+
+def run_daemon(args):
+    """
+    Keep the model loaded and process jobs dropped into a spool directory,
+    and optionally new videos appearing in a watched folder.
+
+    Returns:
+        int: Exit code
+    """
+    spool = Path(args.spool)
+    for name in ("accepted", "rejected"):
+        (spool / name).mkdir(parents=True, exist_ok=True)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    # Keep the model loaded between jobs instead of evicting it when idle
+    model_registry.idle_timeout = 0
+    processor = _create_processor(args)
+    warm_up(args.profile, processor.transcribe_workers)
+
+    summary = {}
+    processor.set_progress_callback(lambda message: emit("progress", message=message))
+    on_result = _on_result(args, summary)
+    resumed = processor.resume()
+    options = _job_options(args)
+
+    watcher = None
+    if args.watch:
+        def on_new_file(path):
+            processor.add_file(path, dict(options), start=True)
+            emit("queued", file=path, job="watch")
+
+        watcher = HotFolderWatcher(args.watch, on_new_file)
+
+        def on_watched_result(file_path, result):
+            on_result(file_path, result)
+            watcher.mark_done(file_path, result["status"] == "success")
+
+        processor.set_result_callback(on_watched_result)
+        watcher.start()
+    else:
+        processor.set_result_callback(on_result)
+    if resumed:
+        processor.process_queue()
+    emit("started", spool=str(spool), watch=args.watch, resumed=resumed)
+
+    while not stop.is_set():
+        for path in sorted(spool.glob("*.json")):
+            for file_path, job_options in _accept_spool_file(path, spool, options, args.settle):
+                processor.add_file(file_path, job_options, start=True)
+                emit("queued", file=file_path, job=path.name)
+        stop.wait(args.poll)
+
+    if watcher is not None:
+        watcher.stop()
+    emit("stopping", processing=processor.is_processing(), queued=processor.get_queue_size())
+    # Files still queued are resumed from the job store on the next start
+    while processor.is_processing() and args.drain:
+        time.sleep(0.2)
+    if processor.job_store:
+        processor.job_store.release()
+    emit("summary", success=summary.get("success", 0), failed=summary.get("failed", 0))
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli", description="Headless YouTube content batch processing")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(subparser):
+        subparser.add_argument("--workers", type=int, default=None, help="Concurrent transcriptions")
+        subparser.add_argument("--generate-workers", type=int, default=None, help="Concurrent generation jobs")
+        subparser.add_argument("--profile", default=config.get_transcription_setting("profile") or "fast",
+                               choices=config.get_transcription_profile_names(), help="Transcription profile")
+        subparser.add_argument("--mode", choices=GENERATION_MODES, default=None, help="Generation mode")
+        subparser.add_argument("--engine", choices=("threads", "async", "deferred"), default=None,
+                               help="Generation engine")
+        subparser.add_argument("--out", default=None, help="Directory to export content to")
+
+    batch = subparsers.add_parser("batch", help="Process files once and exit")
+    batch.add_argument("inputs", nargs="+", help="Video files, directories or glob patterns")
+    batch.add_argument("--resume", action="store_true", help="Also resume unfinished files of earlier runs")
+    batch.add_argument("--retry-failed", action="store_true",
+                       help="Also retry the failed files of earlier runs (implies --resume)")
+    add_common(batch)
+
+    daemon = subparsers.add_parser("daemon", help="Process jobs dropped into a spool directory")
+    daemon.add_argument("--spool", required=True, help="Directory watched for *.json job files")
+    daemon.add_argument("--watch", default=None, help="Folder whose new videos are processed automatically")
+    daemon.add_argument("--poll", type=float, default=2.0, help="Seconds between spool scans")
+    daemon.add_argument("--settle", type=float, default=2.0,
+                        help="Seconds a job file must be unmodified before it is read")
+    daemon.add_argument("--drain", action="store_true", help="Finish the current run before exiting")
+    add_common(daemon)
+
+    jobs = subparsers.add_parser("jobs", help="Show or maintain the job store")
+    jobs.add_argument("--retry-failed", action="store_true", help="Queue failed jobs to be resumed")
+    jobs.add_argument("--prune", action="store_true", help="Remove finished jobs and their content")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command != "jobs" and not config.get_api_key("perplexity"):
+        emit("warning", message="Perplexity API key not set; content generation will fail")
+
+    # The pipeline reports through print(); keep stdout for JSON events only
+    sys.stdout = sys.stderr
+    try:
+        if args.command == "batch":
+            return run_batch(args)
+        if args.command == "jobs":
+            return run_jobs(args)
+        return run_daemon(args)
+    finally:
+        sys.stdout = _events
+
+if __name__ == "__main__":
+    sys.exit(main())
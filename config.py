@@ -25,7 +25,108 @@ class Config:
             },
             "ui_settings": {
                 "theme": "light",
-                "window_size": [800, 600]
+                "window_size": [800, 600],
+                "max_progress_updates_per_second": 4,
+                "results_page_size": 50,
+                "transcript_chunk_chars": 5000,
+                "transcript_chunks_per_view": 4
+            },
+            "transcription_settings": {
+                "profile": "fast",
+                "device": "auto",
+                "max_cached_models": 2,
+                "model_memory_budget_mb": 4096,
+                "model_idle_timeout": 900,
+                "warm_up_on_start": True,
+                "stream_audio": True,
+                "word_timestamps": False,
+                "vad_prefilter": True,
+                "long_audio_threshold": 1200,
+                "chunk_seconds": 300,
+                "chunk_workers": 0
+            },
+            "transcription_profiles": {
+                "fast": {
+                    "model_size": "tiny",
+                    "compute_type": "int8",
+                    "beam_size": 1,
+                    "vad_filter": True,
+                    "cpu_threads": 0,
+                    "num_workers": 1
+                },
+                "balanced": {
+                    "model_size": "base",
+                    "compute_type": None,
+                    "beam_size": 5,
+                    "vad_filter": True,
+                    "cpu_threads": 0,
+                    "num_workers": 1
+                },
+                "accurate": {
+                    "model_size": "small",
+                    "compute_type": None,
+                    "beam_size": 5,
+                    "vad_filter": False,
+                    "cpu_threads": 0,
+                    "num_workers": 1
+                }
+            },
+            "batch_settings": {
+                "extract_workers": 2,
+                "transcribe_workers": 0,
+                "generate_workers": 4,
+                "stage_queue_size": 4,
+                "async_generate_jobs": 50,
+                "deferred_provider": "perplexity",
+                "deferred_poll_interval": 30,
+                "deferred_job_dir": "cache/batches",
+                "durable_queue": True,
+                "job_store_path": "cache/jobs.sqlite3",
+                "job_lease_seconds": 60
+            },
+            "generation_settings": {
+                "max_concurrency": 6,
+                "mode": "separate",
+                "pool_size": 10,
+                "connect_timeout": 10,
+                "read_timeout": 120,
+                "captions_from_transcript": True,
+                "prompt_token_budget": 6000,
+                "map_reduce_threshold_tokens": 24000,
+                "map_window_tokens": 6000,
+                "map_overlap_tokens": 300,
+                "map_concurrency": 4,
+                "requests_per_minute": 50,
+                "tokens_per_minute": 0,
+                "max_retries": 5,
+                "backoff_base": 1.0,
+                "backoff_max": 60,
+                "circuit_failure_threshold": 5,
+                "circuit_reset_seconds": 60,
+                "max_circuit_wait": 300,
+                "engine": "threads",
+                "async_max_concurrency": 64
+            },
+            "cache_settings": {
+                "transcript_cache_enabled": True,
+                "transcript_cache_dir": "cache/transcripts",
+                "transcript_cache_max_mb": 500,
+                "response_cache_enabled": True,
+                "response_cache_path": "cache/responses.sqlite3",
+                "response_cache_ttl_hours": 168,
+                "response_cache_max_mb": 100,
+                "temp_dir": "",
+                "prefer_ram_temp": True
+            },
+            "hot_folder_settings": {
+                "folder": "",
+                "recursive": True,
+                "stable_seconds": 10,
+                "poll_interval": 5,
+                "rescan_interval": 300,
+                "full_rescan_interval": 3600,
+                "use_events": True,
+                "index_path": "cache/hot_folder.sqlite3"
             }
         }
         
@@ -148,5 +249,170 @@ class Config:
         self.config["ui_settings"][setting] = value
         self.save_config()
 
+    def get_transcription_setting(self, setting):
+        """
+        Get transcription setting.
+        
+        Args:
+            setting (str): Setting name
+        
+        Returns:
+            Value of the setting
+        """
+        return self.config.get("transcription_settings", {}).get(setting)
+    
+    def set_transcription_setting(self, setting, value):
+        """
+        Set transcription setting.
+        
+        Args:
+            setting (str): Setting name
+            value: Value to set
+        """
+        if "transcription_settings" not in self.config:
+            self.config["transcription_settings"] = {}
+        
+        self.config["transcription_settings"][setting] = value
+        self.save_config()
+
+    def get_transcription_profile(self, name):
+        """
+        Get a named transcription profile.
+        
+        Args:
+            name (str): Profile name (e.g., 'fast', 'balanced', 'accurate')
+        
+        Returns:
+            dict: Profile settings, or None if there is no such profile
+        """
+        return self.config.get("transcription_profiles", {}).get(name)
+    
+    def get_transcription_profile_names(self):
+        """
+        Get the names of all transcription profiles.
+        
+        Returns:
+            list: Profile names
+        """
+        return list(self.config.get("transcription_profiles", {}))
+    
+    def set_transcription_profile(self, name, settings):
+        """
+        Add or replace a transcription profile.
+        
+        Args:
+            name (str): Profile name
+            settings (dict): Model and decoding settings of the profile
+        """
+        if "transcription_profiles" not in self.config:
+            self.config["transcription_profiles"] = {}
+        
+        self.config["transcription_profiles"][name] = settings
+        self.save_config()
+    
+    def get_batch_setting(self, setting):
+        """
+        Get batch processing setting.
+        
+        Args:
+            setting (str): Setting name
+        
+        Returns:
+            Value of the setting
+        """
+        return self.config.get("batch_settings", {}).get(setting)
+    
+    def set_batch_setting(self, setting, value):
+        """
+        Set batch processing setting.
+        
+        Args:
+            setting (str): Setting name
+            value: Value to set
+        """
+        if "batch_settings" not in self.config:
+            self.config["batch_settings"] = {}
+        
+        self.config["batch_settings"][setting] = value
+        self.save_config()
+
+    def get_generation_setting(self, setting):
+        """
+        Get content generation setting.
+        
+        Args:
+            setting (str): Setting name
+        
+        Returns:
+            Value of the setting
+        """
+        return self.config.get("generation_settings", {}).get(setting)
+    
+    def set_generation_setting(self, setting, value):
+        """
+        Set content generation setting.
+        
+        Args:
+            setting (str): Setting name
+            value: Value to set
+        """
+        if "generation_settings" not in self.config:
+            self.config["generation_settings"] = {}
+        
+        self.config["generation_settings"][setting] = value
+        self.save_config()
+
+    def get_cache_setting(self, setting):
+        """
+        Get cache setting.
+        
+        Args:
+            setting (str): Setting name
+        
+        Returns:
+            Value of the setting
+        """
+        return self.config.get("cache_settings", {}).get(setting)
+    
+    def set_cache_setting(self, setting, value):
+        """
+        Set cache setting.
+        
+        Args:
+            setting (str): Setting name
+            value: Value to set
+        """
+        if "cache_settings" not in self.config:
+            self.config["cache_settings"] = {}
+        
+        self.config["cache_settings"][setting] = value
+        self.save_config()
+
+    def get_hot_folder_setting(self, setting):
+        """
+        Get hot folder setting.
+        
+        Args:
+            setting (str): Setting name
+        
+        Returns:
+            Value of the setting
+        """
+        return self.config.get("hot_folder_settings", {}).get(setting)
+    
+    def set_hot_folder_setting(self, setting, value):
+        """
+        Set hot folder setting.
+        
+        Args:
+            setting (str): Setting name
+            value: Value to set
+        """
+        if "hot_folder_settings" not in self.config:
+            self.config["hot_folder_settings"] = {}
+        
+        self.config["hot_folder_settings"][setting] = value
+        self.save_config()
+
 # Global config instance
 config = Config()
\ No newline at end of file
@@ -1,96 +1,1190 @@
 import os
 import requests
 import json
+import threading
+import time
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from config import config
+from rate_limiting import RateLimiter, CircuitBreaker, backoff_delay, parse_retry_after
+from response_cache import response_cache
+from transcript import Transcript
+from transcript_compaction import compact_prompt_inputs, estimate_tokens, split_windows, KIND_VIEWS
+
+try:
+    import httpx
+except ImportError:
+    # Optional: without httpx the async engine runs the sync client in threads
+    httpx = None
 
 API_URL = "https://api.perplexity.ai/chat/completions"
 
-def _call_perplexity_api(system_prompt, user_prompt):
+DEFAULT_MODEL = "llama-3-sonar-large-32k-online"
+
+CIRCUIT_OPEN_ERROR = "Error calling Perplexity API: the API is failing repeatedly; giving up for now"
+
+# Most rounds of merging map-step notes before the rest is condensed locally
+MAX_REDUCE_ROUNDS = 3
+
+class PerplexityClient:
     """
-    Helper function to call the Perplexity API with given prompts.
+    Reusable client for the Perplexity chat completions API.
+
+    All calls go through one requests.Session whose pooled HTTPAdapter keeps
+    connections alive between requests, so only the first call to the host
+    pays the TCP+TLS handshake. The session is safe to share between worker
+    threads: the connection pool is thread-safe and the API key is sent per
+    request rather than stored on the session.
+
+    The client is also where calls are paced: a shared RateLimiter keeps
+    all workers under the configured requests and tokens per minute,
+    throttled and transient failures are retried with jittered exponential
+    backoff, and a CircuitBreaker pauses every worker while the API keeps
+    failing instead of letting each one burn through its retries.
     """
-    # Get API key from config (which checks both environment variables and config file)
-    api_key = config.get_api_key("perplexity")
-    if not api_key:
-        print("DEBUG: Perplexity API key not found.")
-        return "Error: Perplexity API key not set. Please configure it in the settings."
-    print(f"DEBUG: Using Perplexity API key (first 5 chars): {api_key[:5]}*****")
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    def __init__(self, api_url=API_URL, model=DEFAULT_MODEL, pool_size=None, connect_timeout=None, read_timeout=None):
+        self.api_url = api_url
+        self.model = model
+        self.pool_size = pool_size or config.get_generation_setting("pool_size") or 10
+        self.connect_timeout = connect_timeout or config.get_generation_setting("connect_timeout") or 10
+        self.read_timeout = read_timeout or config.get_generation_setting("read_timeout") or 120
+        self.max_retries = config.get_generation_setting("max_retries")
+        if self.max_retries is None:
+            self.max_retries = 5
+        self.backoff_base = config.get_generation_setting("backoff_base") or 1.0
+        self.backoff_max = config.get_generation_setting("backoff_max") or 60
+        self.max_circuit_wait = config.get_generation_setting("max_circuit_wait") or 300
+        self.rate_limiter = RateLimiter(
+            config.get_generation_setting("requests_per_minute") or 50,
+            config.get_generation_setting("tokens_per_minute") or 0,
+        )
+        self.circuit_breaker = CircuitBreaker(
+            config.get_generation_setting("circuit_failure_threshold") or 5,
+            config.get_generation_setting("circuit_reset_seconds") or 60,
+        )
+        self._session = None
+        self._lock = threading.Lock()
 
-    payload = {
-        "model": "llama-3-sonar-large-32k-online",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-    }
-    
-    print(f"DEBUG: API Request Payload: {json.dumps(payload, indent=2)}")
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.pool_size,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Content-Type": "application/json",
+                    "Connection": "keep-alive",
+                })
+                self._session = session
+            return self._session
 
-    try:
-        response = requests.post(API_URL, json=payload, headers=headers)
-        print(f"DEBUG: API Response Status Code: {response.status_code}")
+    def post(self, payload, api_key):
+        """
+        Send a raw request to the API.
+
+        Args:
+            payload (dict): JSON request body
+            api_key (str): Perplexity API key
+
+        Returns:
+            requests.Response: The API response
+        """
+        return self._get_session().post(
+            self.api_url,
+            json=payload,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=(self.connect_timeout, self.read_timeout),
+        )
+
+    def chat(self, system_prompt, user_prompt, bypass_cache=False, validate=None, use_cache=True):
+        """
+        Call the API with a system and user prompt.
+
+        Successful responses are served from and stored in the response
+        cache unless it is disabled in the config. With bypass_cache the
+        API is always called and its response replaces the cached one.
+        Error messages are never cached.
+
+        Args:
+            system_prompt (str): System message
+            user_prompt (str): User message
+            bypass_cache (bool): Always call the API, e.g. for a user retry
+            validate (function): Called with the response text; responses
+                it rejects are neither cached nor served from the cache
+            use_cache (bool): False to neither read nor write the cache,
+                for callers that manage it themselves
+
+        Returns:
+            str: Generated text, or an error message starting with "Error"
+                or "HTTP Error" if the call failed
+        """
+        cache_key, cached = None, None
+        if use_cache:
+            cache_key, cached = self.lookup_cache(system_prompt, user_prompt, bypass_cache, validate)
+        if cached is not None:
+            return cached
+
+        # Get API key from config (which checks both environment variables and config file)
+        api_key = config.get_api_key("perplexity")
+        if not api_key:
+            print("DEBUG: Perplexity API key not found.")
+            return "Error: Perplexity API key not set. Please configure it in the settings."
+        print(f"DEBUG: Using Perplexity API key (first 5 chars): {api_key[:5]}*****")
+
+        payload = self.build_payload(system_prompt, user_prompt)
+        print(f"DEBUG: API Request Payload: {json.dumps(payload, indent=2)}")
+
+        estimated_tokens = self.estimate_request_tokens(system_prompt, user_prompt)
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if not self._wait_for_circuit():
+                return error or CIRCUIT_OPEN_ERROR
+            self.rate_limiter.acquire(estimated_tokens)
+
+            retry_after = None
+            try:
+                response = self.post(payload, api_key)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.circuit_breaker.record_failure()
+                error = f"Error calling Perplexity API: {e}"
+            except requests.exceptions.RequestException as e:
+                self.circuit_breaker.record_failure()
+                return f"Error calling Perplexity API: {e}"
+            else:
+                outcome, value, retry_after = self.handle_response(response)
+                if outcome == "ok":
+                    self.store_cache(cache_key, *value, validate=validate)
+                    return value[0]
+                if outcome == "failed":
+                    return value
+                error = value
+
+            if attempt == self.max_retries:
+                return error
+            delay = self.retry_delay(attempt, retry_after)
+            time.sleep(delay)
+        return error
+
+    def lookup_cache(self, system_prompt, user_prompt, bypass_cache=False, validate=None):
+        """
+        Look a request up in the response cache.
+
+        Args:
+            validate (function): Ignore a cached response it rejects
+
+        Returns:
+            tuple: (cache key or None if caching is off, cached text or
+                None; always None with bypass_cache)
+        """
+        if not config.get_cache_setting("response_cache_enabled"):
+            return None, None
+        cache_key = response_cache.make_key(self.model, system_prompt, user_prompt)
+        if bypass_cache:
+            # The fresh response replaces the cached one
+            return cache_key, None
+        try:
+            cached = response_cache.get(cache_key)
+        except Exception as e:
+            # E.g. "database is locked" while another process writes; call the API
+            print(f"Warning: Could not read the response cache: {e}")
+            return cache_key, None
+        if cached is not None and validate is not None and not validate(cached):
+            cached = None
+        if cached is not None:
+            print("DEBUG: Using cached API response")
+        return cache_key, cached
+
+    def store_cache(self, cache_key, content, result, validate=None):
+        """
+        Store a successful response in the response cache.
+
+        Args:
+            validate (function): Skip responses it rejects, e.g. combined
+                responses that are not valid JSON
+        """
+        if validate is not None and not validate(content):
+            print("DEBUG: Not caching a response that failed validation")
+            return
+        if cache_key is not None and content:
+            try:
+                response_cache.put(cache_key, self.model, content, result.get("usage"))
+            except Exception as e:
+                print(f"Warning: Could not cache API response: {e}")
+
+    def build_payload(self, system_prompt, user_prompt):
+        """
+        Build the JSON request body for a chat completion.
+        """
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+        }
+
+    @staticmethod
+    def estimate_request_tokens(system_prompt, user_prompt):
+        # Prompt tokens plus a rough allowance for the completion
+        return estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + 500
+
+    def handle_response(self, response):
+        """
+        Interpret an API response and update the rate limiter and breaker.
+
+        Every reply settles the circuit breaker: 429 and 5xx count as
+        failures, any other status shows the API is reachable and counts
+        as a success, even if the request itself was rejected.
+
+        Works with both requests and httpx responses.
+
+        Args:
+            response: HTTP response of a chat completion request
+
+        Returns:
+            tuple: ("ok", (content, result JSON), None),
+                ("retry", error message, Retry-After seconds or None) or
+                ("failed", error message, None)
+        """
+        status_code = response.status_code
+        print(f"DEBUG: API Response Status Code: {status_code}")
         print(f"DEBUG: API Response Headers: {response.headers}")
         print(f"DEBUG: API Response Text: {response.text}")
-        
-        response.raise_for_status()  # Raise an exception for bad status codes
-        result = response.json()
-        return result['choices'][0]['message']['content'].strip()
-    except requests.exceptions.HTTPError as e:
-        return f"HTTP Error calling Perplexity API: {e}. Status code: {response.status_code}. Response: {response.text}"
-    except requests.exceptions.RequestException as e:
-        return f"Error calling Perplexity API: {e}"
-    except Exception as e:
-        return f"Unexpected error calling Perplexity API: {e}"
-
-def generate_title(transcript):
+
+        reason = getattr(response, "reason", None) or getattr(response, "reason_phrase", "")
+        error = f"HTTP Error calling Perplexity API: {status_code} {reason}. Status code: {status_code}. Response: {response.text}"
+        if status_code == 429 or status_code >= 500:
+            if status_code == 429:
+                self.rate_limiter.on_throttled()
+            self.circuit_breaker.record_failure()
+            return "retry", error, parse_retry_after(response.headers.get("Retry-After"))
+        self.circuit_breaker.record_success()
+        if status_code >= 400:
+            return "failed", error, None
+
+        try:
+            result = response.json()
+            content = result['choices'][0]['message']['content'].strip()
+        except Exception as e:
+            return "failed", f"Unexpected error calling Perplexity API: {e}", None
+        self.rate_limiter.on_success()
+        return "ok", (content, result), None
+
+    def retry_delay(self, attempt, retry_after=None):
+        """
+        Seconds to wait before retrying a failed attempt.
+        """
+        delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        print(f"DEBUG: Retrying Perplexity API call in {delay:.1f}s (attempt {attempt + 2} of {self.max_retries + 1})")
+        return delay
+
+    def circuit_wait(self, waited):
+        """
+        How long to wait for the circuit breaker before the next attempt.
+
+        Args:
+            waited (float): Seconds already spent waiting for this attempt
+
+        Returns:
+            float: 0 to send now, a positive delay to wait and ask again, or
+                None once max_circuit_wait has been used up
+        """
+        wait = self.circuit_breaker.before_request()
+        if wait <= 0:
+            return 0.0
+        if waited >= self.max_circuit_wait:
+            return None
+        return min(wait, self.max_circuit_wait - waited)
+
+    def _wait_for_circuit(self):
+        """
+        Wait while the circuit breaker is open.
+
+        Returns:
+            bool: True once a request may be sent, False if the circuit stayed
+                open longer than max_circuit_wait
+        """
+        waited = 0.0
+        wait = self.circuit_wait(waited)
+        while wait:
+            time.sleep(wait)
+            waited += wait
+            wait = self.circuit_wait(waited)
+        return wait is not None
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+# Shared client used by all generators
+perplexity_client = PerplexityClient()
+
+def _call_perplexity_api(system_prompt, user_prompt, bypass_cache=False, validate=None):
+    """
+    Helper function to call the Perplexity API with given prompts.
+    """
+    return perplexity_client.chat(system_prompt, user_prompt, bypass_cache=bypass_cache, validate=validate)
+
+def is_error_response(text):
+    """
+    Check whether an API helper returned an error message instead of content.
+
+    Args:
+        text (str): Value returned by _call_perplexity_api
+
+    Returns:
+        bool: True if the text is one of the client's error messages
+    """
+    return isinstance(text, str) and text.startswith(("Error", "HTTP Error", "Unexpected error calling"))
+
+# System prompt and user prompt template of every content kind
+PROMPT_TEMPLATES = {
+    "title": (
+        "You are a YouTube title generator.",
+        "Generate a catchy, clear title under 60 characters for a video with this transcript. Place primary keywords at the beginning for better SEO. Incorporate numbers and power words to increase click-through rates. Ensure relevance to video content while avoiding misleading clickbait:\n\n{transcript}",
+    ),
+    "description": (
+        "You are a YouTube description writer. Create engaging, keyword-rich descriptions that hook viewers in the first 2-3 lines.",
+        "Create a detailed YouTube video description for a video with this transcript. Include:\n1. A hook with keyword-rich opening 2-3 lines\n2. Detailed video summary for YouTube's algorithm\n3. Timestamped chapters for easy navigation\n4. Social media links and website references\n5. Credits and acknowledgments\n6. Optimized hashtags at the end\n\nTranscript:\n{transcript}",
+    ),
+    "tags": (
+        "You are a YouTube SEO expert specializing in tag optimization.",
+        "Generate a mix of broad and specific tags for maximum reach for a video with this transcript. Include exact match and long-tail keyword variations. Balance relevance with strategic reach optimization:\n\n{transcript}",
+    ),
+    "hashtags": (
+        "You are a social media trends expert who identifies trending hashtags.",
+        "Generate trending hashtags for a video with this transcript. Combine trending general hashtags with video-specific ones. Research current social media trends across platforms. Balance discovery with relevance:\n\n{transcript}",
+    ),
+    "chapters": (
+        "You are a YouTube chapter generator that creates timestamped content segments.",
+        "Generate descriptive chapter titles with precise timestamps for a video with this transcript. Automatically detect content segments from the transcript analysis. Format chapters for optimal YouTube integration:\n\n{transcript}",
+    ),
+    "captions": (
+        "You are a caption formatter that creates SEO-optimized, accessible captions.",
+        "Format this transcript as SEO-optimized, accessible captions. Ensure proper formatting for YouTube. Include punctuation and speaker identification if applicable:\n\n{transcript}",
+    ),
+}
+
+def build_prompts(kind, transcript):
+    """
+    Build the system and user prompt that generate one content kind.
+
+    Args:
+        kind (str): Content kind (a key of PROMPT_TEMPLATES)
+        transcript (str): Transcript text the content is generated from
+
+    Returns:
+        tuple: (system prompt, user prompt)
+    """
+    system_prompt, user_template = PROMPT_TEMPLATES[kind]
+    return system_prompt, user_template.format(transcript=transcript)
+
+def generate_title(transcript, bypass_cache=False):
     """
     Generates a YouTube title based on the video transcript.
     """
-    system_prompt = "You are a YouTube title generator."
-    user_prompt = f"Generate a catchy, clear title under 60 characters for a video with this transcript. Place primary keywords at the beginning for better SEO. Incorporate numbers and power words to increase click-through rates. Ensure relevance to video content while avoiding misleading clickbait:\n\n{transcript}"
-    return _call_perplexity_api(system_prompt, user_prompt)
+    system_prompt, user_prompt = build_prompts("title", transcript)
+    return _call_perplexity_api(system_prompt, user_prompt, bypass_cache=bypass_cache)
 
-def generate_description(transcript):
+def generate_description(transcript, bypass_cache=False):
     """
     Generates a YouTube video description based on the transcript.
     """
-    system_prompt = "You are a YouTube description writer. Create engaging, keyword-rich descriptions that hook viewers in the first 2-3 lines."
-    user_prompt = f"Create a detailed YouTube video description for a video with this transcript. Include:\n1. A hook with keyword-rich opening 2-3 lines\n2. Detailed video summary for YouTube's algorithm\n3. Timestamped chapters for easy navigation\n4. Social media links and website references\n5. Credits and acknowledgments\n6. Optimized hashtags at the end\n\nTranscript:\n{transcript}"
-    return _call_perplexity_api(system_prompt, user_prompt)
+    system_prompt, user_prompt = build_prompts("description", transcript)
+    return _call_perplexity_api(system_prompt, user_prompt, bypass_cache=bypass_cache)
 
-def generate_tags(transcript):
+def generate_tags(transcript, bypass_cache=False):
     """
     Generates optimized YouTube tags based on the transcript.
     """
-    system_prompt = "You are a YouTube SEO expert specializing in tag optimization."
-    user_prompt = f"Generate a mix of broad and specific tags for maximum reach for a video with this transcript. Include exact match and long-tail keyword variations. Balance relevance with strategic reach optimization:\n\n{transcript}"
-    return _call_perplexity_api(system_prompt, user_prompt)
+    system_prompt, user_prompt = build_prompts("tags", transcript)
+    return _call_perplexity_api(system_prompt, user_prompt, bypass_cache=bypass_cache)
 
-def generate_hashtags(transcript):
+def generate_hashtags(transcript, bypass_cache=False):
     """
     Generates trending hashtags based on the transcript.
     """
-    system_prompt = "You are a social media trends expert who identifies trending hashtags."
-    user_prompt = f"Generate trending hashtags for a video with this transcript. Combine trending general hashtags with video-specific ones. Research current social media trends across platforms. Balance discovery with relevance:\n\n{transcript}"
-    return _call_perplexity_api(system_prompt, user_prompt)
+    system_prompt, user_prompt = build_prompts("hashtags", transcript)
+    return _call_perplexity_api(system_prompt, user_prompt, bypass_cache=bypass_cache)
 
-def generate_chapters(transcript):
+def generate_chapters(transcript, bypass_cache=False):
     """
     Generates timestamped chapters based on the transcript.
     """
-    system_prompt = "You are a YouTube chapter generator that creates timestamped content segments."
-    user_prompt = f"Generate descriptive chapter titles with precise timestamps for a video with this transcript. Automatically detect content segments from the transcript analysis. Format chapters for optimal YouTube integration:\n\n{transcript}"
-    return _call_perplexity_api(system_prompt, user_prompt)
+    system_prompt, user_prompt = build_prompts("chapters", transcript)
+    return _call_perplexity_api(system_prompt, user_prompt, bypass_cache=bypass_cache)
 
-def generate_captions(transcript):
+def generate_captions(transcript, bypass_cache=False):
     """
     Generates formatted captions based on the transcript.
     """
-    system_prompt = "You are a caption formatter that creates SEO-optimized, accessible captions."
-    user_prompt = f"Format this transcript as SEO-optimized, accessible captions. Ensure proper formatting for YouTube. Include punctuation and speaker identification if applicable:\n\n{transcript}"
-    return _call_perplexity_api(system_prompt, user_prompt)
\ No newline at end of file
+    system_prompt, user_prompt = build_prompts("captions", transcript)
+    return _call_perplexity_api(system_prompt, user_prompt, bypass_cache=bypass_cache)
+
+# Content kinds in display order, mapped to their generator
+GENERATORS = {
+    "title": generate_title,
+    "description": generate_description,
+    "tags": generate_tags,
+    "hashtags": generate_hashtags,
+    "chapters": generate_chapters,
+    "captions": generate_captions,
+}
+
+CONTENT_KINDS = tuple(GENERATORS)
+
+GENERATION_MODES = ("separate", "combined")
+
+# What the combined request asks for in each JSON field
+COMBINED_FIELD_INSTRUCTIONS = {
+    "title": "a catchy, clear title under 60 characters with primary keywords at the beginning, using numbers or power words where they fit, without misleading clickbait",
+    "description": "a detailed description with a keyword-rich 2-3 line hook, a summary for YouTube's algorithm, timestamped chapters, social media and website references, credits, and optimized hashtags at the end",
+    "tags": "a comma-separated mix of broad and specific tags, including exact match and long-tail keyword variations",
+    "hashtags": "space-separated hashtags combining trending general hashtags with video-specific ones",
+    "chapters": "descriptive chapter titles with precise timestamps, one chapter per line, formatted for YouTube",
+    "captions": "the transcript formatted as SEO-optimized, accessible captions with proper punctuation and speaker identification if applicable",
+}
+
+def _parse_combined_response(response_text, kinds):
+    """
+    Extract the requested fields from a combined JSON response.
+
+    Args:
+        response_text (str): Raw model output
+        kinds (list): Content kinds that were requested
+
+    Returns:
+        dict: Content kind mapped to text for every field that parsed
+    """
+    text = response_text.strip()
+    # Models often wrap JSON in a markdown code fence or add prose around it
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    parsed = {}
+    for kind in kinds:
+        value = data.get(kind)
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            separator = " " if kind == "hashtags" else ("\n" if kind in ("chapters", "captions") else ", ")
+            value = separator.join(item.strip() for item in value)
+        if isinstance(value, str) and value.strip():
+            parsed[kind] = value.strip()
+    return parsed
+
+def is_valid_combined_response(response_text, kinds):
+    """
+    Check whether a combined response has at least one usable field.
+
+    A response that fails this check is not cached, so a retry asks the
+    API again instead of getting the same broken JSON back.
+    """
+    return bool(_parse_combined_response(response_text, kinds))
+
+def generate_combined(transcript, kinds=CONTENT_KINDS, bypass_cache=False):
+    """
+    Generates several content kinds with a single API request.
+
+    The transcript is sent once and the model is asked for a JSON object
+    with one field per content kind, instead of paying the transcript's
+    prompt tokens once per generator.
+
+    Args:
+        transcript (str): Video transcript
+        kinds (iterable): Content kinds to generate (keys of GENERATORS)
+        bypass_cache (bool): Ask the API even if the response is cached
+
+    Returns:
+        dict: Content kind mapped to text for every field that parsed;
+            missing kinds failed to parse and need a separate call
+    """
+    kinds = list(kinds)
+    system_prompt, user_prompt = build_combined_prompts(transcript, kinds)
+    response_text = _call_perplexity_api(
+        system_prompt, user_prompt, bypass_cache=bypass_cache,
+        validate=lambda text: is_valid_combined_response(text, kinds),
+    )
+    return _parse_combined_response(response_text, kinds)
+
+def build_combined_prompts(transcript, kinds):
+    """
+    Build the prompts of a combined request for several content kinds.
+
+    Returns:
+        tuple: (system prompt, user prompt)
+    """
+    system_prompt = "You are a YouTube content optimization assistant. You respond with a single valid JSON object and nothing else."
+    fields = "\n".join(f'- "{kind}": {COMBINED_FIELD_INSTRUCTIONS[kind]}' for kind in kinds)
+    user_prompt = f"Analyze this video transcript and return a JSON object with exactly these string fields:\n{fields}\n\nTranscript:\n{transcript}"
+    return system_prompt, user_prompt
+
+def summarize_window(window, index, total):
+    """
+    Summarizes one window of a long transcript (the map step of map-reduce).
+    """
+    system_prompt, user_prompt = build_window_prompts(window, index, total)
+    return _call_perplexity_api(system_prompt, user_prompt)
+
+def build_window_prompts(window, index, total):
+    """
+    Build the prompts that summarize one window of a long transcript.
+
+    Returns:
+        tuple: (system prompt, user prompt)
+    """
+    system_prompt = "You take notes on one part of a long video transcript."
+    user_prompt = f"This is part {index} of {total} of a video transcript. Write a concise summary of this part, then list each topic change as 'HH:MM:SS - topic' using the timestamps in the text when present:\n\n{window}"
+    return system_prompt, user_prompt
+
+def merge_notes(notes, index, total):
+    """
+    Merges the notes of consecutive windows into one (a reduce round).
+    """
+    system_prompt, user_prompt = build_reduce_prompts(notes, index, total)
+    return _call_perplexity_api(system_prompt, user_prompt)
+
+def build_reduce_prompts(notes, index, total):
+    """
+    Build the prompts that merge the notes of consecutive windows.
+
+    Returns:
+        tuple: (system prompt, user prompt)
+    """
+    system_prompt = "You merge notes on consecutive parts of a long video transcript."
+    user_prompt = f"These are notes on consecutive parts of a video transcript (group {index} of {total}). Merge them into one concise summary of the whole stretch, then list each topic change as 'HH:MM:SS - topic', keeping the timestamps from the notes:\n\n{notes}"
+    return system_prompt, user_prompt
+
+def map_reduce_notes(transcript, window_tokens=None, overlap_tokens=None, max_concurrency=None):
+    """
+    Condenses a transcript that does not fit the model context into notes.
+
+    The transcript is split into overlapping windows that are summarized
+    concurrently (the map step). While the notes together are still larger
+    than the prompt token budget, groups of consecutive notes are merged by
+    further requests (reduce rounds), so the notes end up small enough to
+    be the input of the regular generators.
+
+    Args:
+        transcript (str or Transcript): Video transcript
+        window_tokens (int): Window size in tokens
+        overlap_tokens (int): Tokens shared by consecutive windows
+        max_concurrency (int): Maximum number of window requests in flight
+
+    Returns:
+        tuple: (notes text, number of windows); notes is None if every
+            window request failed
+    """
+    windows = _map_windows(transcript, window_tokens, overlap_tokens)
+    max_concurrency = max_concurrency or config.get_generation_setting("map_concurrency") or 1
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(windows))), thread_name_prefix="map") as executor:
+        futures = [executor.submit(summarize_window, window, index, len(windows)) for index, window in enumerate(windows, 1)]
+        summaries = _valid_notes(future.result() for future in futures)
+
+        for _ in range(MAX_REDUCE_ROUNDS):
+            groups = _reduce_groups(summaries)
+            if groups is None:
+                break
+            futures = [executor.submit(merge_notes, group, index, len(groups)) for index, group in enumerate(groups, 1)]
+            summaries = _merged_notes([future.result() for future in futures], groups)
+
+    return _join_notes(summaries), len(windows)
+
+def _map_windows(transcript, window_tokens=None, overlap_tokens=None):
+    window_tokens = window_tokens or config.get_generation_setting("map_window_tokens")
+    overlap_tokens = overlap_tokens if overlap_tokens is not None else config.get_generation_setting("map_overlap_tokens")
+    windows = split_windows(transcript, window_tokens, overlap_tokens)
+    print(f"DEBUG: Summarizing {len(windows)} transcript windows")
+    return windows
+
+def _valid_notes(summaries):
+    return [summary for summary in summaries if not is_error_response(summary)]
+
+def _reduce_groups(summaries):
+    """
+    Group consecutive notes into merge requests within the prompt budget.
+
+    Returns:
+        list: Text of each group, or None if the notes already fit or
+            cannot be grouped any further
+    """
+    token_budget = config.get_generation_setting("prompt_token_budget")
+    if not token_budget or estimate_tokens(_join_notes(summaries) or "") <= token_budget:
+        return None
+    groups = []
+    current = []
+    used = 0
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        if current and used + tokens > token_budget:
+            groups.append("\n\n".join(current))
+            current = []
+            used = 0
+        current.append(summary)
+        used += tokens
+    if current:
+        groups.append("\n\n".join(current))
+    if len(groups) == len(summaries):
+        return None
+    print(f"DEBUG: Merging {len(summaries)} notes into {len(groups)}")
+    return groups
+
+def _merged_notes(merged, groups):
+    # A group whose merge request failed keeps its notes unmerged
+    return [group if is_error_response(text) else text for text, group in zip(merged, groups)]
+
+def _join_notes(summaries):
+    parts = [f"Part {index}:\n{summary}" for index, summary in enumerate(summaries, 1) if not is_error_response(summary)]
+    if not parts:
+        return None
+    header = "(Notes on a long video, written part by part from its transcript.)"
+    return "\n\n".join([header] + parts)
+
+def _prompt_inputs(transcript, kinds, report=None):
+    """
+    Pick the transcript text each content kind is generated from.
+
+    Chapters get the timestamped rendering of a Transcript so the model can
+    use real segment times; everything else gets the plain text. Transcripts
+    beyond the map-reduce threshold are first condensed into per-window
+    notes; any input still larger than the prompt token budget is replaced
+    by the condensed views each kind needs, and the tokens saved are
+    recorded in report.
+
+    Captions are the exception: a condensed transcript cannot be captioned,
+    so they always get the full text, however long. The input shares the
+    transcript string rather than copying it. Captions only get here when
+    captions_from_transcript is off or the transcript has no segment
+    times, and an input over the budget is warned about.
+    """
+    base_inputs, text = _base_inputs(transcript, kinds)
+    inputs = base_inputs
+    notes = None
+    if _needs_map_reduce(text):
+        notes, window_count = map_reduce_notes(transcript)
+        inputs = _apply_notes(inputs, notes, window_count, report)
+    return _compact_inputs(transcript, inputs, base_inputs, notes, report)
+
+def _base_inputs(transcript, kinds):
+    if isinstance(transcript, Transcript):
+        text = transcript.text
+        timestamped = transcript.to_timestamped_text() if {"chapters", "combined"} & set(kinds) else text
+    else:
+        text = timestamped = transcript
+    inputs = {kind: text for kind in kinds}
+    if "chapters" in inputs:
+        inputs["chapters"] = timestamped
+    if "combined" in inputs and "chapters" in kinds:
+        inputs["combined"] = timestamped
+    return inputs, text
+
+def _needs_map_reduce(text):
+    map_reduce_threshold = config.get_generation_setting("map_reduce_threshold_tokens")
+    return bool(map_reduce_threshold) and estimate_tokens(text) > map_reduce_threshold
+
+def _apply_notes(inputs, notes, window_count, report=None):
+    if report is not None:
+        report["map_windows"] = window_count
+    if notes is None:
+        return inputs
+    # Captions need the full text (see _prompt_inputs); every other kind works from the notes
+    return {kind: notes if KIND_VIEWS.get(kind) is not None else value for kind, value in inputs.items()}
+
+def _compact_inputs(transcript, inputs, base_inputs, notes=None, report=None):
+    """
+    Condense inputs that are still over the prompt token budget.
+
+    Inputs that were replaced by map-reduce notes are condensed from the
+    notes, the others from the transcript. The tokens saved per kind are
+    measured from the full transcript input to what is actually sent.
+    """
+    token_budget = config.get_generation_setting("prompt_token_budget")
+    if "captions" in inputs and token_budget and estimate_tokens(inputs["captions"]) > token_budget:
+        print(f"Warning: Captions are generated from the full transcript (~{estimate_tokens(inputs['captions'])} tokens); "
+              "enable captions_from_transcript to build them from the segments instead")
+    if token_budget:
+        # _apply_notes puts the notes object itself into the inputs it replaces
+        from_notes = {kind: text for kind, text in inputs.items() if notes is not None and text is notes}
+        compacted, _ = compact_prompt_inputs(
+            transcript, {kind: text for kind, text in inputs.items() if kind not in from_notes}, token_budget
+        )
+        if from_notes:
+            compacted.update(compact_prompt_inputs(notes, from_notes, token_budget)[0])
+        inputs = {kind: compacted[kind] for kind in inputs}
+
+    saved = {
+        kind: estimate_tokens(base_inputs[kind]) - estimate_tokens(text)
+        for kind, text in inputs.items() if text is not base_inputs[kind]
+    }
+    for kind, tokens in saved.items():
+        print(f"DEBUG: Condensed {kind} prompt input, saving ~{tokens} tokens")
+    if report is not None and saved:
+        report["tokens_saved"] = saved
+    return inputs
+
+def generate_all(transcript, kinds=CONTENT_KINDS, max_concurrency=None, mode=None, report=None, bypass_cache=False):
+    """
+    Generates several content kinds for a transcript.
+
+    In "separate" mode each generator is an independent API round trip, run
+    in parallel so the total latency is roughly the slowest call. In
+    "combined" mode one request returns every kind as JSON, and only the
+    fields that fail to parse fall back to their separate generator.
+
+    When given a timestamped Transcript, chapters are generated from real
+    segment times and, with captions_from_transcript enabled, captions are
+    built directly from the segments as SRT without an API call.
+
+    Transcripts longer than generation_settings.prompt_token_budget are
+    condensed before prompting: each kind receives only the keywords,
+    summary or outline it needs.
+
+    Args:
+        transcript (str or Transcript): Video transcript
+        kinds (iterable): Content kinds to generate (keys of GENERATORS)
+        max_concurrency (int): Maximum number of API calls in flight;
+            defaults to the generation_settings config value
+        mode (str): "separate" or "combined"; defaults to the
+            generation_settings config value
+        report (dict): If given, "tokens_saved" is set to the estimated
+            prompt tokens saved per kind by condensing the transcript
+        bypass_cache (bool): Ask the API for new content even if earlier
+            responses are cached, e.g. when the user regenerates; the new
+            responses replace the cached ones. Map-reduce notes are still
+            served from the cache.
+
+    Returns:
+        dict: Content kind mapped to the generated text, in the order of kinds
+    """
+    kinds, mode, content, api_kinds = _plan_generation(transcript, kinds, mode)
+    if not api_kinds:
+        return {kind: content[kind] for kind in kinds}
+    inputs = _prompt_inputs(transcript, _input_kinds(api_kinds, mode), report)
+
+    if mode == "combined":
+        content.update(generate_combined(inputs["combined"], api_kinds, bypass_cache))
+        missing = [kind for kind in api_kinds if kind not in content]
+        if missing:
+            print(f"DEBUG: Combined response missing {', '.join(missing)}; falling back to separate calls")
+            content.update(_generate_separately(inputs, missing, max_concurrency, bypass_cache))
+        _filter_combined_report(report, missing)
+    else:
+        content.update(_generate_separately(inputs, api_kinds, max_concurrency, bypass_cache))
+
+    return {kind: content[kind] for kind in kinds}
+
+def _plan_generation(transcript, kinds, mode):
+    """
+    Validate a generation request and build what needs no API call.
+
+    Returns:
+        tuple: (kinds, mode, content built locally, kinds left for the API)
+    """
+    kinds = list(kinds)
+    unknown = [kind for kind in kinds if kind not in GENERATORS]
+    if unknown:
+        raise ValueError(f"Unknown content kinds: {', '.join(unknown)}")
+
+    if mode is None:
+        mode = config.get_generation_setting("mode") or "separate"
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"Unknown generation mode: {mode}")
+
+    content = {}
+    api_kinds = kinds
+    if "captions" in kinds and isinstance(transcript, Transcript) and config.get_generation_setting("captions_from_transcript"):
+        content["captions"] = transcript.to_srt()
+        api_kinds = [kind for kind in kinds if kind != "captions"]
+    return kinds, mode, content, api_kinds
+
+def _input_kinds(api_kinds, mode):
+    return api_kinds + ["combined"] if mode == "combined" else api_kinds
+
+def _filter_combined_report(report, missing):
+    if report is not None and "tokens_saved" in report:
+        # Only count the requests that were actually sent
+        sent = set(missing) | {"combined"}
+        report["tokens_saved"] = {kind: tokens for kind, tokens in report["tokens_saved"].items() if kind in sent}
+
+def _generate_separately(inputs, kinds, max_concurrency, bypass_cache=False):
+    if max_concurrency is None:
+        max_concurrency = config.get_generation_setting("max_concurrency")
+    max_workers = max(1, min(max_concurrency or len(kinds), len(kinds)))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generate") as executor:
+        futures = {kind: executor.submit(GENERATORS[kind], inputs[kind], bypass_cache) for kind in kinds}
+        return {kind: futures[kind].result() for kind in kinds}
+
+def prepare_deferred(transcript, kinds=CONTENT_KINDS, mode=None, report=None):
+    """
+    Plans a generation whose API requests are sent later, e.g. as part of
+    a provider batch job, instead of calling the API now.
+
+    Transcripts beyond the map-reduce threshold are planned in rounds like
+    map_reduce_notes: the window summaries are the first requests, any
+    merges of their notes the next, and the content requests are built
+    from the notes once they arrive. No API call is made here.
+
+    Args:
+        transcript (str or Transcript): Video transcript
+        kinds (iterable): Content kinds to generate (keys of GENERATORS)
+        mode (str): "separate" or "combined"; defaults to the
+            generation_settings config value
+        report (dict): Filled like the report of generate_all
+
+    Returns:
+        dict: Generation plan; plan["requests"] maps a request name to its
+            (system prompt, user prompt) and is empty once the plan is done
+    """
+    kinds, mode, content, api_kinds = _plan_generation(transcript, kinds, mode)
+    plan = {"kinds": kinds, "mode": mode, "content": content, "inputs": {}, "requests": {}, "report": report}
+    if not api_kinds:
+        return plan
+
+    plan["api_kinds"] = api_kinds
+    base_inputs, text = _base_inputs(transcript, _input_kinds(api_kinds, mode))
+    if _needs_map_reduce(text):
+        windows = _map_windows(transcript)
+        plan.update(transcript=transcript, base_inputs=base_inputs, window_count=len(windows), reduce_round=0)
+        plan["requests"] = {
+            f"map-{index}": build_window_prompts(window, index, len(windows))
+            for index, window in enumerate(windows, 1)
+        }
+        return plan
+
+    _plan_content_requests(plan, _compact_inputs(transcript, base_inputs, base_inputs, None, report))
+    return plan
+
+def _plan_content_requests(plan, inputs):
+    plan["inputs"] = inputs
+    api_kinds = plan["api_kinds"]
+    if plan["mode"] == "combined":
+        plan["combined_kinds"] = api_kinds
+        plan["requests"] = {"combined": build_combined_prompts(inputs["combined"], api_kinds)}
+    else:
+        plan["requests"] = {kind: build_prompts(kind, inputs[kind]) for kind in api_kinds}
+
+def _continue_notes(plan, summaries):
+    """
+    Plan the next round of a deferred map-reduce: another merge of the
+    notes, or the content requests once the notes fit.
+    """
+    if plan["reduce_round"] < MAX_REDUCE_ROUNDS:
+        groups = _reduce_groups(summaries)
+        if groups is not None:
+            plan["reduce_round"] += 1
+            plan["groups"] = groups
+            plan["requests"] = {
+                f"reduce-{index}": build_reduce_prompts(group, index, len(groups))
+                for index, group in enumerate(groups, 1)
+            }
+            return
+
+    notes = _join_notes(summaries)
+    inputs = _apply_notes(plan["base_inputs"], notes, plan["window_count"], plan["report"])
+    _plan_content_requests(plan, _compact_inputs(plan["transcript"], inputs, plan["base_inputs"], notes, plan["report"]))
+    # The full transcript is not needed any more
+    for key in ("transcript", "base_inputs", "groups"):
+        plan.pop(key, None)
+
+def complete_deferred(plan, responses):
+    """
+    Applies the responses to a plan's requests.
+
+    Window summaries and note merges turn into the next round of
+    requests. A combined response missing some fields turns those kinds
+    into follow-up requests, like the fallback of generate_all.
+
+    Args:
+        plan (dict): Plan from prepare_deferred
+        responses (dict): Request name mapped to the response text
+
+    Returns:
+        bool: True if the plan is done, False if plan["requests"] now holds
+            follow-up requests
+    """
+    requests = plan["requests"]
+    plan["requests"] = {}
+    names = list(requests)
+    if names and names[0].startswith(("map-", "reduce-")):
+        texts = [responses.get(name) or "Error: no response to deferred request" for name in names]
+        if names[0].startswith("map-"):
+            summaries = _valid_notes(texts)
+        else:
+            summaries = _merged_notes(texts, plan["groups"])
+        _continue_notes(plan, summaries)
+        return not plan["requests"]
+
+    for name in requests:
+        text = responses.get(name) or "Error: no response to deferred request"
+        if name != "combined":
+            plan["content"][name] = text
+            continue
+        combined_kinds = plan["combined_kinds"]
+        plan["content"].update(_parse_combined_response(text, combined_kinds))
+        missing = [kind for kind in combined_kinds if kind not in plan["content"]]
+        if missing:
+            print(f"DEBUG: Combined response missing {', '.join(missing)}; deferring separate requests")
+            plan["requests"] = {kind: build_prompts(kind, plan["inputs"][kind]) for kind in missing}
+        _filter_combined_report(plan["report"], missing)
+    return not plan["requests"]
+
+def deferred_content(plan):
+    """
+    Returns:
+        dict: Content kind mapped to the generated text of a completed plan
+    """
+    return {kind: plan["content"][kind] for kind in plan["kinds"]}
+
+class AsyncPerplexityClient:
+    """
+    asyncio counterpart of PerplexityClient, built on httpx.
+
+    It reuses the sync client's model, timeouts, response cache, rate
+    limiter and circuit breaker, so sync and async callers share one quota.
+    Each event loop gets its own httpx.AsyncClient, whose pool keeps
+    connections alive, and a semaphore that caps the requests in flight;
+    several loops (e.g. the batch stage's and the page's) can use the
+    client at the same time. Without httpx installed the sync client runs
+    in the loop's executor.
+    """
+
+    def __init__(self, client=None, max_concurrency=None):
+        self.client = client or perplexity_client
+        self.max_concurrency = max_concurrency or config.get_generation_setting("async_max_concurrency") or 64
+        # Event loop -> (semaphore, httpx.AsyncClient or None)
+        self._loops = weakref.WeakKeyDictionary()
+        self._loops_lock = threading.Lock()
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        with self._loops_lock:
+            state = self._loops.get(loop)
+            if state is None:
+                http = None
+                if httpx is not None:
+                    http = httpx.AsyncClient(
+                        limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+                        timeout=httpx.Timeout(self.client.read_timeout, connect=self.client.connect_timeout),
+                        headers={"Content-Type": "application/json"},
+                    )
+                state = (asyncio.Semaphore(self.max_concurrency), http)
+                self._loops[loop] = state
+        return state
+
+    async def chat(self, system_prompt, user_prompt, bypass_cache=False, validate=None):
+        """
+        Call the API with a system and user prompt; see PerplexityClient.chat.
+
+        Returns:
+            str: Generated text, or an error message starting with "Error"
+                or "HTTP Error" if the call failed
+        """
+        semaphore, http = self._bind_loop()
+        async with semaphore:
+            if http is None:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self.client.chat, system_prompt, user_prompt, bypass_cache, validate)
+            return await self._chat(http, system_prompt, user_prompt, bypass_cache, validate)
+
+    async def _chat(self, http, system_prompt, user_prompt, bypass_cache, validate):
+        client = self.client
+        # The response cache is SQLite; keep its disk I/O off the event loop
+        cache_key, cached = await _run_blocking(client.lookup_cache, system_prompt, user_prompt, bypass_cache, validate)
+        if cached is not None:
+            return cached
+
+        api_key = config.get_api_key("perplexity")
+        if not api_key:
+            print("DEBUG: Perplexity API key not found.")
+            return "Error: Perplexity API key not set. Please configure it in the settings."
+
+        payload = client.build_payload(system_prompt, user_prompt)
+        estimated_tokens = client.estimate_request_tokens(system_prompt, user_prompt)
+        error = None
+        for attempt in range(client.max_retries + 1):
+            waited = 0.0
+            wait = client.circuit_wait(waited)
+            while wait:
+                await asyncio.sleep(wait)
+                waited += wait
+                wait = client.circuit_wait(waited)
+            if wait is None:
+                return error or CIRCUIT_OPEN_ERROR
+            delay = client.rate_limiter.reserve(estimated_tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            retry_after = None
+            try:
+                response = await http.post(
+                    client.api_url,
+                    json=payload,
+                    headers={"Authorization": f"Bearer {api_key}"},
+                )
+            except (httpx.TimeoutException, httpx.NetworkError) as e:
+                client.circuit_breaker.record_failure()
+                error = f"Error calling Perplexity API: {e}"
+            except httpx.HTTPError as e:
+                client.circuit_breaker.record_failure()
+                return f"Error calling Perplexity API: {e}"
+            else:
+                outcome, value, retry_after = client.handle_response(response)
+                if outcome == "ok":
+                    await _run_blocking(client.store_cache, cache_key, *value, validate)
+                    return value[0]
+                if outcome == "failed":
+                    return value
+                error = value
+
+            if attempt == client.max_retries:
+                return error
+            await asyncio.sleep(client.retry_delay(attempt, retry_after))
+        return error
+
+    async def aclose(self):
+        """
+        Close the pooled connections of the current event loop; clients of
+        other loops are left alone.
+        """
+        with self._loops_lock:
+            state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None and state[1] is not None:
+            await state[1].aclose()
+
+# Shared async client used by the async generators
+async_perplexity_client = AsyncPerplexityClient()
+
+async def _run_blocking(func, *args):
+    # Run blocking work in the loop's executor (asyncio.to_thread needs Python 3.9)
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+async def agenerate(kind, transcript, bypass_cache=False):
+    """
+    Generates one content kind; the async counterpart of GENERATORS[kind].
+    """
+    system_prompt, user_prompt = build_prompts(kind, transcript)
+    return await async_perplexity_client.chat(system_prompt, user_prompt, bypass_cache=bypass_cache)
+
+async def agenerate_combined(transcript, kinds=CONTENT_KINDS, bypass_cache=False):
+    """
+    Async counterpart of generate_combined.
+    """
+    kinds = list(kinds)
+    system_prompt, user_prompt = build_combined_prompts(transcript, kinds)
+    response_text = await async_perplexity_client.chat(
+        system_prompt, user_prompt, bypass_cache=bypass_cache,
+        validate=lambda text: is_valid_combined_response(text, kinds),
+    )
+    return _parse_combined_response(response_text, kinds)
+
+async def amap_reduce_notes(transcript, window_tokens=None, overlap_tokens=None):
+    """
+    Async counterpart of map_reduce_notes; every window is summarized
+    concurrently, limited only by the async client's semaphore.
+    """
+    windows = await _run_blocking(_map_windows, transcript, window_tokens, overlap_tokens)
+    summaries = _valid_notes(await asyncio.gather(*(
+        async_perplexity_client.chat(*build_window_prompts(window, index, len(windows)))
+        for index, window in enumerate(windows, 1)
+    )))
+    for _ in range(MAX_REDUCE_ROUNDS):
+        groups = _reduce_groups(summaries)
+        if groups is None:
+            break
+        merged = await asyncio.gather(*(
+            async_perplexity_client.chat(*build_reduce_prompts(group, index, len(groups)))
+            for index, group in enumerate(groups, 1)
+        ))
+        summaries = _merged_notes(merged, groups)
+    return _join_notes(summaries), len(windows)
+
+async def agenerate_all(transcript, kinds=CONTENT_KINDS, mode=None, report=None, bypass_cache=False):
+    """
+    Generates several content kinds for a transcript without blocking.
+
+    Behaves like generate_all but runs on the calling event loop: all API
+    calls are coroutines sharing one pooled HTTP client, so a single thread
+    can drive the generations of many videos at once.
+
+    Args:
+        transcript (str or Transcript): Video transcript
+        kinds (iterable): Content kinds to generate (keys of GENERATORS)
+        mode (str): "separate" or "combined"; defaults to the
+            generation_settings config value
+        report (dict): Filled like the report of generate_all
+        bypass_cache (bool): As for generate_all
+
+    Returns:
+        dict: Content kind mapped to the generated text, in the order of kinds
+    """
+    kinds, mode, content, api_kinds = _plan_generation(transcript, kinds, mode)
+    if not api_kinds:
+        return {kind: content[kind] for kind in kinds}
+
+    # Rendering and condensing a multi-hour transcript is CPU work, so it
+    # runs in the executor rather than stalling the other coroutines
+    input_kinds = _input_kinds(api_kinds, mode)
+    base_inputs, text = await _run_blocking(_base_inputs, transcript, input_kinds)
+    inputs = base_inputs
+    notes = None
+    if _needs_map_reduce(text):
+        notes, window_count = await amap_reduce_notes(transcript)
+        inputs = _apply_notes(inputs, notes, window_count, report)
+    inputs = await _run_blocking(_compact_inputs, transcript, inputs, base_inputs, notes, report)
+
+    separate = api_kinds
+    if mode == "combined":
+        content.update(await agenerate_combined(inputs["combined"], api_kinds, bypass_cache))
+        separate = [kind for kind in api_kinds if kind not in content]
+        if separate:
+            print(f"DEBUG: Combined response missing {', '.join(separate)}; falling back to separate calls")
+        _filter_combined_report(report, separate)
+    results = await asyncio.gather(*(agenerate(kind, inputs[kind], bypass_cache) for kind in separate))
+    content.update(zip(separate, results))
+
+    return {kind: content[kind] for kind in kinds}
+
+def run_coroutine(coroutine, loop=None):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Args:
+        coroutine: Coroutine to run, e.g. agenerate_all(...)
+        loop: A running event loop owned by another thread (such as the
+            Flet page's); the coroutine is scheduled there and this call
+            waits for it. Without one the coroutine runs on a new loop.
+
+    Returns:
+        The coroutine's result
+    """
+    if loop is not None and loop.is_running():
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+    return asyncio.run(_run_and_close(coroutine))
+
+async def _run_and_close(coroutine):
+    # The pooled connections belong to the loop asyncio.run is about to close
+    try:
+        return await coroutine
+    finally:
+        await async_perplexity_client.aclose()
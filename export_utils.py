@@ -1,14 +1,17 @@
 import os
 import json
 from datetime import datetime
+from transcript import Transcript
 
-def export_content(content_dict, base_filename=None):
+def export_content(content_dict, base_filename=None, transcript=None):
     """
     Export all generated content to separate files.
     
     Args:
         content_dict (dict): Dictionary containing all generated content
         base_filename (str): Base filename for exported files
+        transcript (Transcript): Timestamped transcript; when given, real
+            SRT and WebVTT caption files are exported as well
     
     Returns:
         list: List of paths to exported files
@@ -29,6 +32,13 @@ def export_content(content_dict, base_filename=None):
             except Exception as e:
                 print(f"Error exporting {content_type}: {e}")
     
+    # Export timed captions straight from the transcript segments
+    if isinstance(transcript, Transcript) and len(transcript):
+        for save_captions in (save_captions_as_srt, save_captions_as_vtt):
+            caption_filename = save_captions(transcript, base_filename)
+            if caption_filename:
+                exported_files.append(caption_filename)
+    
     # Also export everything to a single JSON file
     json_filename = f"{base_filename}_all_content.json"
     try:
@@ -109,12 +119,19 @@ def format_for_youtube_chapters(chapters_content):
     # In a more advanced implementation, we might parse and reformat timestamps
     return chapters_content
 
+def _write_caption_file(path, chunks):
+    # Cues are written one at a time so long transcripts never build the whole file in memory
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
 def save_captions_as_srt(captions_content, filename):
     """
     Save captions in SRT format.
     
     Args:
-        captions_content (str): Captions content
+        captions_content (Transcript or str): Timestamped transcript to
+            write as SRT cues, or caption text that is already SRT formatted
         filename (str): Output filename (without extension)
     
     Returns:
@@ -122,11 +139,30 @@ def save_captions_as_srt(captions_content, filename):
     """
     srt_filename = f"{filename}.srt"
     try:
-        # This is a simplified implementation
-        # A full implementation would parse the transcript and create proper SRT format
-        with open(srt_filename, 'w', encoding='utf-8') as f:
-            f.write(captions_content)
+        if isinstance(captions_content, Transcript):
+            _write_caption_file(srt_filename, captions_content.iter_srt())
+        else:
+            _write_caption_file(srt_filename, [captions_content])
         return srt_filename
     except Exception as e:
         print(f"Error saving SRT file: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def save_captions_as_vtt(transcript, filename):
+    """
+    Save captions in WebVTT format.
+    
+    Args:
+        transcript (Transcript): Timestamped transcript
+        filename (str): Output filename (without extension)
+    
+    Returns:
+        str: Path to saved file
+    """
+    vtt_filename = f"{filename}.vtt"
+    try:
+        _write_caption_file(vtt_filename, transcript.iter_vtt())
+        return vtt_filename
+    except Exception as e:
+        print(f"Error saving WebVTT file: {e}")
+        return None
@@ -0,0 +1,376 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from config import config
+from transcript_cache import hash_media_file
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    # Optional: without watchdog the folder is polled
+    Observer = None
+    FileSystemEventHandler = object
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+
+def is_video_file(path):
+    """
+    Check whether a path has one of the supported video extensions.
+    """
+    return path.lower().endswith(VIDEO_EXTENSIONS)
+
+class FolderIndex:
+    """
+    Persistent index of the files found in watched folders (SQLite).
+
+    Files are recorded with their size, mtime and content hash, so a rescan
+    only hashes files whose size or mtime changed, and a file that was
+    moved or copied after processing is recognized by its hash. Directory
+    mtimes are recorded too: a directory whose mtime has not changed has
+    had no files added, removed or renamed and is not listed again.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = Path(db_path or config.get_hot_folder_setting("index_path") or "cache/hot_folder.sqlite3")
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def get_file(self, path):
+        """
+        Look up an indexed file.
+
+        Returns:
+            tuple: (size, mtime, hash, status), or None if not indexed
+        """
+        with self._lock:
+            return self._connect().execute(
+                "SELECT size, mtime, hash, status FROM files WHERE path = ?", (path,)
+            ).fetchone()
+
+    def has_hash(self, file_hash):
+        """
+        Check whether a file with this content was already queued.
+
+        Returns:
+            bool: True if an indexed file with the hash is queued or processed
+        """
+        with self._lock:
+            return self._connect().execute(
+                "SELECT 1 FROM files WHERE hash = ? AND status IN ('queued', 'processed') LIMIT 1",
+                (file_hash,),
+            ).fetchone() is not None
+
+    def record_file(self, path, size, mtime, file_hash, status):
+        """
+        Add or update an indexed file.
+
+        Args:
+            path (str): File path
+            size (int): Size in bytes
+            mtime (float): Modification time
+            file_hash (str): Content hash from hash_media_file
+            status (str): "queued", "processed", "failed" or "duplicate"
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime, hash, status, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, size, mtime, file_hash, status, time.time()),
+            )
+            connection.commit()
+
+    def set_status(self, path, status):
+        """
+        Update the status of an indexed file.
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "UPDATE files SET status = ?, updated = ? WHERE path = ?", (status, time.time(), path)
+            )
+            connection.commit()
+
+    def get_dir(self, path):
+        """
+        Look up an indexed directory.
+
+        Returns:
+            tuple: (mtime, list of subdirectory paths), or None if not indexed
+        """
+        with self._lock:
+            row = self._connect().execute("SELECT mtime, subdirs FROM dirs WHERE path = ?", (path,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def record_dir(self, path, mtime, subdirs):
+        """
+        Record a directory whose files have all been indexed.
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO dirs (path, mtime, subdirs) VALUES (?, ?, ?)",
+                (path, mtime, json.dumps(subdirs)),
+            )
+            connection.commit()
+
+    def get_stats(self):
+        """
+        Get index statistics.
+
+        Returns:
+            dict: Indexed directories and files per status
+        """
+        with self._lock:
+            connection = self._connect()
+            statuses = dict(connection.execute("SELECT status, COUNT(*) FROM files GROUP BY status"))
+            dirs = connection.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+        return {"dirs": dirs, "files": statuses}
+
+    def _connect(self):
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Shared by the watcher and worker threads; every access is serialized by self._lock
+            self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime REAL, hash TEXT, status TEXT, updated REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS files_hash ON files (hash)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime REAL, subdirs TEXT)"
+            )
+            self._connection.commit()
+        return self._connection
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.dest_path)
+
+class HotFolderWatcher:
+    """
+    Watches a folder and hands over new video files once they are complete.
+
+    File system events (watchdog, when installed) or periodic scans find
+    new and changed files. A file is handed to on_file only after its size
+    and mtime have not changed for stable_seconds, so renders that are
+    still being written are skipped, and only if the index has not seen
+    the same content before.
+    """
+
+    def __init__(self, folder, on_file, index=None, recursive=None, stable_seconds=None,
+                 poll_interval=None, rescan_interval=None, full_rescan_interval=None, use_events=None):
+        self.folder = os.path.abspath(folder)
+        self.on_file = on_file
+        self.index = index or FolderIndex()
+        self.recursive = _setting(recursive, "recursive", True)
+        self.stable_seconds = _setting(stable_seconds, "stable_seconds", 10)
+        self.poll_interval = _setting(poll_interval, "poll_interval", 5)
+        self.rescan_interval = _setting(rescan_interval, "rescan_interval", 300)
+        self.full_rescan_interval = _setting(full_rescan_interval, "full_rescan_interval", 3600)
+        self.use_events = _setting(use_events, "use_events", True) and Observer is not None
+        self.candidates = {}
+        self._observer = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Start watching in a background thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        if self.use_events:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), self.folder, recursive=self.recursive)
+            self._observer.start()
+        print(f"DEBUG: Watching {self.folder} ({'events' if self.use_events else 'polling'})")
+        self._thread = threading.Thread(target=self._run, name="hot-folder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop watching.
+        """
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def is_watching(self):
+        """
+        Returns:
+            bool: True while the watcher is running
+        """
+        return self._thread is not None
+
+    def notify(self, path):
+        """
+        Report a file that may have been created or changed.
+
+        Args:
+            path (str): File path
+        """
+        if not is_video_file(path):
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        self._add_candidate(path, stat)
+
+    def mark_done(self, path, success):
+        """
+        Record the outcome of processing a file handed to on_file.
+
+        Args:
+            path (str): File path
+            success (bool): Whether processing succeeded
+        """
+        self.index.set_status(os.path.abspath(path), "processed" if success else "failed")
+
+    def scan(self, full=False):
+        """
+        Walk the folder and pick up files the index has not seen.
+
+        Args:
+            full (bool): Also list directories whose mtime is unchanged,
+                to catch files overwritten in place
+
+        Returns:
+            int: Number of directories listed
+        """
+        listed = 0
+        stack = [self.folder]
+        while stack and not self._stop.is_set():
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            cached = self.index.get_dir(directory)
+            if cached and cached[0] == mtime and not full:
+                stack.extend(cached[1])
+                continue
+
+            listed += 1
+            subdirs = []
+            pending = False
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                subdirs.append(entry.path)
+                        elif entry.is_file() and is_video_file(entry.name):
+                            pending = self._add_candidate(entry.path, entry.stat()) or pending
+            except OSError:
+                continue
+            # A directory with files still settling is listed again next time
+            if not pending:
+                self.index.record_dir(directory, mtime, subdirs)
+            stack.extend(subdirs)
+        return listed
+
+    def check_candidates(self):
+        """
+        Hand over every candidate whose size and mtime have settled.
+
+        Returns:
+            int: Number of files handed to on_file
+        """
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for path, (size, mtime, since) in list(self.candidates.items()):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    del self.candidates[path]
+                    continue
+                if (stat.st_size, stat.st_mtime) != (size, mtime) or not stat.st_size:
+                    self.candidates[path] = (stat.st_size, stat.st_mtime, now)
+                elif now - since >= self.stable_seconds:
+                    del self.candidates[path]
+                    ready.append((path, stat))
+
+        handed_over = 0
+        for path, stat in ready:
+            try:
+                file_hash = hash_media_file(path)
+            except OSError as e:
+                print(f"Warning: Could not read {path}: {e}")
+                continue
+            if self.index.has_hash(file_hash):
+                self.index.record_file(path, stat.st_size, stat.st_mtime, file_hash, "duplicate")
+                print(f"DEBUG: Skipping {path}; the same video was already processed")
+                continue
+            self.index.record_file(path, stat.st_size, stat.st_mtime, file_hash, "queued")
+            self.on_file(path)
+            handed_over += 1
+        return handed_over
+
+    def _add_candidate(self, path, stat):
+        indexed = self.index.get_file(path)
+        if indexed and indexed[0] == stat.st_size and indexed[1] == stat.st_mtime:
+            return False
+        with self._lock:
+            if path not in self.candidates:
+                self.candidates[path] = (stat.st_size, stat.st_mtime, time.monotonic())
+        return True
+
+    def _scan(self, full=False):
+        # Keep the watcher alive through I/O and index errors
+        try:
+            self.scan(full=full)
+            return True
+        except Exception as e:
+            print(f"Error scanning hot folder {self.folder}: {e}")
+            return False
+
+    def _run(self):
+        last_scan = last_full_scan = time.monotonic()
+        if not self._scan():
+            # Retry on the next poll instead of waiting for the rescan interval
+            last_scan = last_full_scan = float("-inf")
+        while not self._stop.wait(self.poll_interval):
+            now = time.monotonic()
+            # With events, scans only catch what the events missed
+            if not self.use_events or now - last_scan >= self.rescan_interval:
+                full = now - last_full_scan >= self.full_rescan_interval
+                # A failed scan (e.g. an unmounted share) is retried on the next poll
+                if self._scan(full=full):
+                    last_scan = now
+                    if full:
+                        last_full_scan = now
+            try:
+                self.check_candidates()
+            except Exception as e:
+                print(f"Error checking hot folder files: {e}")
+
+def _setting(value, name, default):
+    if value is not None:
+        return value
+    configured = config.get_hot_folder_setting(name)
+    return default if configured is None else configured
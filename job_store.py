@@ -0,0 +1,353 @@
+import os
+import time
+import json
+import socket
+import sqlite3
+import threading
+from pathlib import Path
+from config import config
+
+class JobStore:
+    """
+    Durable record of batch jobs in a local SQLite database.
+
+    Every queued file gets a row holding its options, the last stage it
+    completed and that stage's output: the transcript segments and each
+    generated content field. A batch that is interrupted can be resumed
+    from these rows without transcribing again or regenerating finished
+    fields. Extracted audio is not recorded; it lives in a temp directory
+    that does not outlive the process, so an unfinished job that was not
+    transcribed starts over.
+
+    Several processes (the GUI, a CLI batch or daemon) can share one
+    store. Each pending job is owned by the process that queued or
+    resumed it, which refreshes a heartbeat on its jobs while it runs;
+    only jobs whose owner stopped heartbeating for lease_seconds are
+    resumed by another process.
+    """
+
+    def __init__(self, db_path=None, owner=None, lease_seconds=None):
+        self.db_path = Path(db_path or config.get_batch_setting("job_store_path") or "cache/jobs.sqlite3")
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds or config.get_batch_setting("job_lease_seconds") or 60
+        self._connection = None
+        self._lock = threading.Lock()
+        self._heartbeat_thread = None
+        self._closed = threading.Event()
+
+    def add_job(self, file_path, options=None):
+        """
+        Record a newly queued file.
+
+        Args:
+            file_path (str): Path to the video file
+            options (dict): Per-job options, as for BatchProcessor.add_file
+
+        Returns:
+            int: Job ID
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            cursor = connection.execute(
+                "INSERT INTO jobs (file, options, stage, status, created, updated, owner, heartbeat) "
+                "VALUES (?, ?, 'queued', 'pending', ?, ?, ?, ?)",
+                (file_path, json.dumps(options or {}), now, now, self.owner, now),
+            )
+            connection.commit()
+        self._start_heartbeat()
+        return cursor.lastrowid
+
+    def get_job(self, job_id):
+        """
+        Get a job with every stage output recorded so far.
+
+        Args:
+            job_id (int): Job ID from add_job
+
+        Returns:
+            dict: Job fields, with "segments" as a Transcript dict (or None)
+                and "content" mapping each generated kind to its text;
+                None if there is no such job
+        """
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT id, file, options, stage, status, error, segments FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            content = dict(connection.execute("SELECT kind, content FROM fields WHERE job_id = ?", (job_id,)))
+        return {
+            "id": row[0],
+            "file": row[1],
+            "options": json.loads(row[2]),
+            "stage": row[3],
+            "status": row[4],
+            "error": row[5],
+            "segments": json.loads(row[6]) if row[6] else None,
+            "content": content,
+        }
+
+    def count_jobs(self, status=None):
+        """
+        Count the jobs in the store.
+
+        Args:
+            status (str): Only count jobs with this status
+
+        Returns:
+            int: Number of jobs
+        """
+        where, params = ("WHERE status = ?", (status,)) if status else ("", ())
+        with self._lock:
+            return self._connect().execute(f"SELECT COUNT(*) FROM jobs {where}", params).fetchone()[0]
+
+    def list_jobs(self, offset=0, limit=50, status=None):
+        """
+        Get one page of job summaries, newest first.
+
+        Only the small columns are read; use get_job for the transcript
+        and content of a job.
+
+        Args:
+            offset (int): Number of jobs to skip
+            limit (int): Maximum number of jobs to return
+            status (str): Only list jobs with this status
+
+        Returns:
+            list: Dicts with id, file, stage, status, error, created,
+                updated and timings
+        """
+        where, params = ("WHERE status = ?", (status,)) if status else ("", ())
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT id, file, stage, status, error, created, updated, timings FROM jobs {where} "
+                "ORDER BY id DESC LIMIT ? OFFSET ?",
+                params + (limit, offset),
+            ).fetchall()
+        return [
+            {
+                "id": row[0],
+                "file": row[1],
+                "stage": row[2],
+                "status": row[3],
+                "error": row[4],
+                "created": row[5],
+                "updated": row[6],
+                "timings": json.loads(row[7]) if row[7] else {},
+            }
+            for row in rows
+        ]
+
+    def claim_unfinished_jobs(self):
+        """
+        Take over the jobs that were queued but never finished.
+
+        Jobs still owned by a running process are left alone; a job is
+        only claimed once its owner's heartbeat is older than the lease.
+
+        Returns:
+            list: (job ID, file path, options) tuples in queue order
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            # Claimed in one write transaction so two processes resuming
+            # at once cannot both take a job
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(
+                    "SELECT id, file, options FROM jobs WHERE status = 'pending' "
+                    "AND (owner IS NULL OR (owner != ? AND COALESCE(heartbeat, 0) < ?)) ORDER BY id",
+                    (self.owner, now - self.lease_seconds),
+                ).fetchall()
+                connection.executemany(
+                    "UPDATE jobs SET owner = ?, heartbeat = ? WHERE id = ?",
+                    [(self.owner, now, row[0]) for row in rows],
+                )
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+        if rows:
+            self._start_heartbeat()
+        return [(job_id, file_path, json.loads(options)) for job_id, file_path, options in rows]
+
+    def release(self):
+        """
+        Give up this process's unfinished jobs so the next process to
+        resume takes them over without waiting for the lease to expire.
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "UPDATE jobs SET owner = NULL WHERE owner = ? AND status = 'pending'", (self.owner,)
+            )
+            connection.commit()
+
+    def heartbeat(self):
+        """
+        Refresh the heartbeat of this process's unfinished jobs.
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status = 'pending'", (time.time(), self.owner)
+            )
+            connection.commit()
+
+    def _start_heartbeat(self):
+        with self._lock:
+            if self._heartbeat_thread is not None:
+                return
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        # Runs until the store is closed; a stopped process stops
+        # heartbeating and its jobs can be claimed after the lease
+        while not self._closed.wait(self.lease_seconds / 3):
+            try:
+                self.heartbeat()
+            except sqlite3.Error as e:
+                print(f"Warning: Could not refresh job heartbeat: {e}")
+
+    def mark_transcribed(self, job_id, segments):
+        """
+        Record the transcript of a job.
+
+        Args:
+            job_id (int): Job ID
+            segments (dict): Transcript.to_dict() of the transcript
+        """
+        self._update(job_id, "stage = 'transcribed', segments = ?", (json.dumps(segments),))
+
+    def save_content(self, job_id, content):
+        """
+        Record generated content fields of a job.
+
+        Args:
+            job_id (int): Job ID
+            content (dict): Content kind mapped to the generated text
+        """
+        if not content:
+            return
+        with self._lock:
+            connection = self._connect()
+            connection.executemany(
+                "INSERT OR REPLACE INTO fields (job_id, kind, content) VALUES (?, ?, ?)",
+                [(job_id, kind, text) for kind, text in content.items()],
+            )
+            connection.execute("UPDATE jobs SET updated = ? WHERE id = ?", (time.time(), job_id))
+            connection.commit()
+
+    def finish_job(self, job_id, status, error=None, timings=None):
+        """
+        Record that a job left the pipeline.
+
+        Args:
+            job_id (int): Job ID
+            status (str): "success" or "failed"
+            error (str): Error message of a failed job
+            timings (dict): Seconds spent in each stage
+        """
+        timings = json.dumps(timings or {})
+        if status == "success":
+            self._update(job_id, "stage = 'done', status = 'done', error = NULL, timings = ?", (timings,))
+        else:
+            self._update(job_id, "status = 'failed', error = ?, timings = ?", (error, timings))
+
+    def requeue_failed(self):
+        """
+        Mark every failed job as pending again so it is resumed.
+
+        The jobs are released from their owner, so the next resume in
+        any process picks them up.
+
+        Returns:
+            int: Number of jobs requeued
+        """
+        with self._lock:
+            connection = self._connect()
+            cursor = connection.execute(
+                "UPDATE jobs SET status = 'pending', error = NULL, owner = NULL WHERE status = 'failed'"
+            )
+            connection.commit()
+            return cursor.rowcount
+
+    def get_stats(self):
+        """
+        Get job counts.
+
+        Returns:
+            dict: Number of jobs per status and, for pending jobs, per stage
+        """
+        with self._lock:
+            connection = self._connect()
+            statuses = dict(connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+            stages = dict(connection.execute("SELECT stage, COUNT(*) FROM jobs WHERE status = 'pending' GROUP BY stage"))
+        return {"statuses": statuses, "pending_stages": stages}
+
+    def clear(self, finished_only=True):
+        """
+        Remove jobs from the store.
+
+        Args:
+            finished_only (bool): Keep pending and failed jobs
+        """
+        where = "WHERE status = 'done'" if finished_only else ""
+        with self._lock:
+            connection = self._connect()
+            connection.execute(f"DELETE FROM fields WHERE job_id IN (SELECT id FROM jobs {where})")
+            connection.execute(f"DELETE FROM jobs {where}")
+            connection.commit()
+
+    def close(self):
+        """
+        Stop heartbeating and close the database connection.
+        """
+        self._closed.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _update(self, job_id, assignments, params):
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                f"UPDATE jobs SET {assignments}, updated = ? WHERE id = ?",
+                tuple(params) + (time.time(), job_id),
+            )
+            connection.commit()
+
+    def _connect(self):
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Shared by worker threads; every access is serialized by self._lock
+            self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, file TEXT, options TEXT, "
+                "stage TEXT, status TEXT, error TEXT, segments TEXT, "
+                "created REAL, updated REAL, timings TEXT, owner TEXT, heartbeat REAL)"
+            )
+            columns = [row[1] for row in self._connection.execute("PRAGMA table_info(jobs)")]
+            # Stores created before stage timings and job owners were recorded
+            for column, column_type in (("timings", "TEXT"), ("owner", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    self._connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS fields ("
+                "job_id INTEGER, kind TEXT, content TEXT, PRIMARY KEY (job_id, kind))"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            self._connection.commit()
+        return self._connection
+
+# Global job store instance
+job_store = JobStore()
@@ -1,15 +1,18 @@
 import flet as ft
-from video_processing import extract_audio
-from transcription import transcribe_audio
-from content_generation import (
-    generate_title, generate_description, generate_tags,
-    generate_hashtags, generate_chapters, generate_captions
-)
+from video_processing import prepare_audio, cleanup_audio
+from transcription import transcribe_stream, warm_up_model, get_transcription_settings, scale_for_workers
+from transcript_cache import lookup_transcript, store_transcript
+from transcript import Transcript
+from content_generation import generate_all, agenerate_all, run_coroutine
 from export_utils import export_content, copy_to_clipboard
 from config import config
 from batch_processing import BatchProcessor
+from hot_folder import HotFolderWatcher
+from progress import ProgressAggregator, format_progress
+from results_browser import BatchResults, format_summary, chunk_text
 import os
 import threading
+import time
 
 def main(page: ft.Page):
     page.title = "YouTube Content Optimization"
@@ -21,8 +24,22 @@ def main(page: ft.Page):
     # Global variables
     current_content = {}
     current_transcript = ""
+    current_segments = None
     batch_processor = BatchProcessor()
     selected_file_path = None
+    hot_folder_watcher = None
+    batch_results = BatchResults(batch_processor)
+    results_page = 0
+    # Long texts (transcript, captions) are shown a few chunks at a time
+    chunked_views = {}
+    transcript_chunk_chars = config.get_ui_setting("transcript_chunk_chars") or 5000
+    transcript_chunks_per_view = config.get_ui_setting("transcript_chunks_per_view") or 4
+
+    # Load the Whisper model in the background so the first video does not wait for it.
+    # Single videos and batches transcribe with the same scaled settings, so
+    # they share this one model instead of each loading a copy.
+    if config.get_transcription_setting("warm_up_on_start"):
+        warm_up_model(batch_processor.transcribe_workers)
 
     def theme_changed(e):
         page.theme_mode = (
@@ -152,25 +169,131 @@ def main(page: ft.Page):
         page.update()
 
     def on_batch_processing_complete(e=None):
-        update_progress_ui("Batch processing completed!")
         process_button.disabled = False
         batch_process_button.disabled = False
         progress_bar.visible = False
+        failed = sum(1 for result in batch_processor.get_results().values() if result["status"] != "success")
+        batch_progress.set_message(
+            f"Batch processing finished with {failed} failed files." if failed else "Batch processing completed!"
+        )
+        # List every job of the batch; content is only loaded when one is opened
+        refresh_results_list()
+        tabs.selected_index = len(tabs.tabs) - 1
+        page.update()
+        show_snackbar(
+            "Batch processing finished. Open a file in Batch Results to see its content.",
+            color=ft.Colors.ORANGE_ACCENT if failed else ft.Colors.GREEN,
+        )
+
+    def refresh_results_list(e=None):
+        """Show the current page of batch results; only summaries are read."""
+        nonlocal results_page
+        status = None if results_status_dropdown.value == "all" else results_status_dropdown.value
+        total = batch_results.count(status)
+        page_count = max(1, -(-total // batch_results.page_size))
+        results_page = min(results_page, page_count - 1)
+        results_list.controls = [
+            create_result_tile(summary) for summary in batch_results.get_page(results_page, status)
+        ]
+        results_page_text.value = f"Page {results_page + 1} of {page_count} ({total} files)"
+        results_prev_button.disabled = results_page == 0
+        results_next_button.disabled = results_page >= page_count - 1
         page.update()
-        # Display results of the last processed file in the batch
-        results = batch_processor.get_results()
-        if results:
-            last_file_path = list(results.keys())[-1]
-            last_result = results[last_file_path]
-            if last_result["status"] == "success":
-                global current_content, current_transcript
-                current_content = last_result["content"]
-                current_transcript = last_result.get("transcript", "") # Use .get for safety
-                update_result_tabs()
-                show_snackbar(f"Batch processing finished. Displaying results for {os.path.basename(last_file_path)}")
+
+    def change_results_page(step):
+        nonlocal results_page
+        results_page = max(0, results_page + step)
+        refresh_results_list()
+
+    def results_status_changed(e):
+        nonlocal results_page
+        results_page = 0
+        refresh_results_list()
+
+    def create_result_tile(summary):
+        title, details = format_summary(summary)
+        icon, color = {
+            "done": (ft.Icons.CHECK_CIRCLE, ft.Colors.GREEN),
+            "failed": (ft.Icons.ERROR, ft.Colors.RED),
+        }.get(summary["status"], (ft.Icons.HOURGLASS_EMPTY, ft.Colors.GREY))
+        return ft.ListTile(
+            leading=ft.Icon(icon, color=color),
+            title=ft.Text(title),
+            subtitle=ft.Text(details, max_lines=2, size=12),
+            dense=True,
+            on_click=lambda _: open_result(summary),
+        )
+
+    def open_result(summary):
+        show_snackbar(f"Loading {os.path.basename(summary['file'])}...")
+        threading.Thread(target=load_result_thread, args=(summary,), daemon=True).start()
+
+    def load_result_thread(summary):
+        """Read one job's content from storage and show it in the result tabs."""
+        nonlocal current_content, current_transcript, current_segments
+        try:
+            loaded = batch_results.load(summary)
+        except Exception as ex:
+            page.run_thread(show_error_dialog, "Loading Failed", f"Could not load {summary['file']}: {str(ex)}")
+            return
+        current_content = loaded["content"]
+        current_segments = loaded["transcript"]
+        current_transcript = current_segments.text if current_segments else ""
+        if not current_content and summary.get("error"):
+            page.run_thread(show_error_dialog, "Batch Processing Error", f"Error processing {os.path.basename(summary['file'])}: {summary['error']}")
+        page.run_thread(update_result_tabs)
+
+    def create_chunked_view(name):
+        """Create a list that shows a long text a few chunks at a time."""
+        view = ft.ListView(expand=True, spacing=0)
+        more_button = ft.TextButton("Show more", visible=False, on_click=lambda _: show_more_chunks(name))
+        chunked_views[name] = {"view": view, "more_button": more_button, "chunks": []}
+        return ft.Column([view, more_button], expand=True)
+
+    def show_chunks(name, chunks, keep_position=False):
+        """
+        Show the first chunks of a long text instead of one huge value.
+
+        Args:
+            name (str): Chunked view from create_chunked_view
+            chunks (list): Text chunks
+            keep_position (bool): Keep the chunks already shown, e.g. while
+                the transcript grows during live preview
+        """
+        state = chunked_views[name]
+        state["chunks"] = chunks
+        controls = state["view"].controls
+        shown = len(controls) if keep_position else 0
+        shown = min(len(chunks), max(shown, transcript_chunks_per_view))
+        # Reuse the Text controls so unchanged chunks are not sent again
+        for index, chunk in enumerate(chunks[:shown]):
+            if index < len(controls):
+                controls[index].value = chunk
             else:
-                show_error_dialog("Batch Processing Error", f"Error processing {os.path.basename(last_file_path)}: {last_result['error']}")
-                update_progress_ui(f"Batch processing finished with errors.")
+                controls.append(ft.Text(chunk, selectable=True))
+        del controls[shown:]
+        update_more_button(state)
+
+    def show_more_chunks(name):
+        state = chunked_views[name]
+        shown = len(state["view"].controls)
+        for chunk in state["chunks"][shown:shown + transcript_chunks_per_view]:
+            state["view"].controls.append(ft.Text(chunk, selectable=True))
+        update_more_button(state)
+        page.update()
+
+    def update_more_button(state):
+        hidden = len(state["chunks"]) - len(state["view"].controls)
+        state["more_button"].visible = hidden > 0
+        state["more_button"].text = f"Show more ({hidden} parts left)"
+
+    def show_transcript(transcript, keep_position=False):
+        """Show a Transcript or plain text in the Transcript tab."""
+        if isinstance(transcript, Transcript):
+            chunks = list(transcript.iter_text_chunks(transcript_chunk_chars))
+        else:
+            chunks = chunk_text(transcript or "", transcript_chunk_chars)
+        show_chunks("transcript", chunks, keep_position)
 
     def update_result_tabs():
         title_text_field.value = current_content.get("title", "")
@@ -178,61 +301,137 @@ def main(page: ft.Page):
         tags_text_field.value = current_content.get("tags", "")
         hashtags_text_field.value = current_content.get("hashtags", "")
         chapters_text_field.value = current_content.get("chapters", "")
-        captions_text_field.value = current_content.get("captions", "")
-        transcript_text_field.value = current_transcript
+        # SRT captions built from a multi-hour transcript are longer than the transcript
+        show_chunks("captions", chunk_text(current_content.get("captions", ""), transcript_chunk_chars))
+        show_transcript(current_segments or current_transcript)
 
         export_all_button.disabled = False
+        regenerate_button.disabled = not current_segments
         copy_title_button.disabled = not bool(current_content.get("title"))
         copy_description_button.disabled = not bool(current_content.get("description"))
         copy_tags_button.disabled = not bool(current_content.get("tags"))
         copy_hashtags_button.disabled = not bool(current_content.get("hashtags"))
         page.update()
 
+    def transcribe_with_live_preview(audio, settings):
+        """Transcribe while showing progress and the partial transcript as segments arrive."""
+        transcript = Transcript()
+        vad_report = {}
+        last_refresh = 0.0
+
+        def on_progress(fraction):
+            # Refresh at most twice a second; the final 100% always goes through
+            nonlocal last_refresh
+            now = time.monotonic()
+            if fraction < 1.0 and now - last_refresh < 0.5:
+                return
+            last_refresh = now
+            progress_bar.value = fraction
+            progress_text.value = f"Transcribing audio... {fraction:.0%}"
+            if vad_report:
+                progress_text.value += f" (skipped {vad_report['skipped_fraction']:.0%} silence)"
+            show_transcript(transcript, keep_position=True)
+            page.update()
+
+        try:
+            for segment in transcribe_stream(audio, on_progress, settings, vad_report):
+                transcript.append_segment(segment)
+        except Exception as e:
+            print(e)
+            return None
+        finally:
+            progress_bar.value = None
+        return transcript
+
+    def generate_content(transcript, bypass_cache=False):
+        """Generate all content for the transcript into current_content."""
+        # Update progress
+        page.run_thread(update_progress_ui, "Generating content...")
+
+        # Generate all content concurrently, or in one request in combined mode
+        if config.get_generation_setting("engine") == "async":
+            # Run on the page's event loop instead of a thread per request
+            current_content.update(run_coroutine(
+                agenerate_all(transcript, mode=get_generation_mode(), bypass_cache=bypass_cache),
+                getattr(page, "loop", None)
+            ))
+        else:
+            current_content.update(generate_all(transcript, mode=get_generation_mode(), bypass_cache=bypass_cache))
+
+        print(f"DEBUG: Generated Content: {current_content}")
+
+        # Check for API errors in generated content
+        for key, value in current_content.items():
+            if key == "captions" and config.get_generation_setting("captions_from_transcript"):
+                continue  # Built locally from the transcript, not by the API
+            if isinstance(value, str) and (value.startswith("Error:") or value.startswith("HTTP Error:") or "error" in value.lower()):
+                page.run_thread(show_error_dialog, "Content Generation Error", f"An API error occurred during {key} generation: {value}. Please check your API key and network connection.")
+                current_content[key] = ""
+
+    def regenerate_thread():
+        """Generate the content of the current transcript again, past the response cache."""
+        try:
+            generate_content(current_segments, bypass_cache=True)
+            page.run_thread(update_result_tabs)
+            page.run_thread(show_snackbar, "Content regenerated!")
+            page.run_thread(update_progress_ui, "Content regenerated!")
+        except Exception as ex:
+            page.run_thread(show_error_dialog, "Processing Error", f"An unexpected error occurred: {str(ex)}")
+            page.run_thread(update_progress_ui, f"Error: {str(ex)}")
+        finally:
+            progress_bar.visible = False
+            process_button.disabled = False
+            regenerate_button.disabled = False
+            page.run_thread(page.update)
+
+    def regenerate_content(e):
+        if not current_segments:
+            return
+        progress_bar.visible = True
+        progress_text.visible = True
+        process_button.disabled = True
+        regenerate_button.disabled = True
+        page.update()
+        threading.Thread(target=regenerate_thread, daemon=True).start()
+
     def process_video_thread(selected_file_path):
         """Main processing logic in a separate thread to avoid UI freezing."""
         try:
             # Reset current content
-            global current_content, current_transcript
+            nonlocal current_content, current_transcript, current_segments
             current_content = {}
             current_transcript = ""
-
-            # Update progress
-            page.run_thread(update_progress_ui, "Extracting audio...")
-            audio_path = extract_audio(selected_file_path)
-            if not audio_path:
-                page.run_thread(show_error_dialog, "Audio Extraction Failed", "Could not extract audio from the video. Ensure FFmpeg is installed and accessible in your system's PATH.")
-                return
-
-            # Update progress
-            page.run_thread(update_progress_ui, "Transcribing audio...")
-            transcript = transcribe_audio(audio_path)
-            if not transcript:
-                page.run_thread(show_error_dialog, "Transcription Failed", "Could not transcribe audio. Check the audio file and Whisper model.")
-                return
-
-            current_transcript = transcript
-            print(f"DEBUG: Transcript length: {len(transcript)} characters")
-            print(f"DEBUG: Transcript snippet: {transcript[:200]}...")
-
-            # Update progress
-            page.run_thread(update_progress_ui, "Generating content...")
-            
-            # Generate all content
-            current_content["title"] = generate_title(transcript)
-            current_content["description"] = generate_description(transcript)
-            current_content["tags"] = generate_tags(transcript)
-            current_content["hashtags"] = generate_hashtags(transcript)
-            current_content["chapters"] = generate_chapters(transcript)
-            current_content["captions"] = generate_captions(transcript)
-
-            print(f"DEBUG: Generated Content: {current_content}")
-
-            # Check for API errors in generated content
-            for key, value in current_content.items():
-                if isinstance(value, str) and (value.startswith("Error:") or value.startswith("HTTP Error:") or "error" in value.lower()):
-                    page.run_thread(show_error_dialog, "Content Generation Error", f"An API error occurred during {key} generation: {value}. Please check your API key and network connection.")
-                    current_content[key] = ""
-            
+            current_segments = None
+
+            # Reuse the transcript from an earlier run of the same video
+            transcription_settings = scale_for_workers(
+                get_transcription_settings(profile_dropdown.value), batch_processor.transcribe_workers
+            )
+            cache_key, transcript = lookup_transcript(selected_file_path, transcription_settings)
+            if transcript:
+                page.run_thread(update_progress_ui, "Using cached transcript...")
+            else:
+                # Update progress
+                page.run_thread(update_progress_ui, "Extracting audio...")
+                audio, audio_path = prepare_audio(selected_file_path)
+                if audio is None:
+                    page.run_thread(show_error_dialog, "Audio Extraction Failed", "Could not extract audio from the video. Ensure FFmpeg is installed and accessible in your system's PATH.")
+                    return
+
+                # Update progress
+                page.run_thread(update_progress_ui, "Transcribing audio...")
+                transcript = transcribe_with_live_preview(audio, transcription_settings)
+                if not transcript:
+                    page.run_thread(show_error_dialog, "Transcription Failed", "Could not transcribe audio. Check the audio file and Whisper model.")
+                    return
+                store_transcript(cache_key, transcript, selected_file_path, transcription_settings)
+
+            current_transcript = transcript.text
+            current_segments = transcript
+            print(f"DEBUG: Transcript length: {len(current_transcript)} characters, {len(transcript)} segments")
+            print(f"DEBUG: Transcript snippet: {current_transcript[:200]}...")
+
+            generate_content(transcript)
             page.run_thread(update_result_tabs)
             page.run_thread(show_snackbar, "Processing complete!")
             page.run_thread(update_progress_ui, "Processing complete!")
@@ -244,12 +443,9 @@ def main(page: ft.Page):
             process_button.disabled = False
             page.run_thread(page.update)
 
-            # Clean up temporary audio file
-            try:
-                if 'audio_path' in locals() and os.path.exists(audio_path):
-                    os.remove(audio_path)
-            except Exception as e:
-                print(f"Warning: Could not remove temporary audio file: {e}")
+            # Clean up temporary audio file and its job directory
+            if 'audio_path' in locals():
+                cleanup_audio(audio_path)
 
     def pick_files_result(e: ft.FilePickerResultEvent):
         if e.files:
@@ -260,6 +456,7 @@ def main(page: ft.Page):
             progress_text.visible = True
             update_progress_ui("Processing video...")
             process_button.disabled = True
+            regenerate_button.disabled = True
             page.update()
 
             # Check API key before starting
@@ -284,19 +481,82 @@ def main(page: ft.Page):
                 return
 
             for f in e.files:
-                batch_processor.add_file(f.path)
-            
-            if not batch_processor.is_processing():
-                progress_bar.visible = True
-                progress_text.visible = True
-                update_progress_ui(f"Added {len(e.files)} files to batch. Starting processing...")
-                process_button.disabled = True
-                batch_process_button.disabled = True
-                batch_processor.set_progress_callback(update_progress_ui)
-                batch_processor.process_queue()
-            else:
-                update_progress_ui(f"Added {len(e.files)} files to queue. {batch_processor.get_queue_size()} files in queue.")
-            page.update()
+                batch_processor.add_file(f.path, get_batch_options())
+            start_batch_processing(len(e.files))
+
+    def get_batch_options():
+        return {
+            "generation_mode": get_generation_mode(),
+            "profile": profile_dropdown.value,
+        }
+
+    def start_batch_processing(added_count, message=None):
+        batch_progress.add_files(added_count)
+        # Decided under the processor's queue lock, so a run that is just
+        # finishing either picks the files up or lets this start a new one
+        if batch_processor.process_queue():
+            progress_bar.visible = True
+            progress_text.visible = True
+            process_button.disabled = True
+            batch_process_button.disabled = True
+            batch_progress.set_message(message or f"Added {added_count} files to batch. Starting processing...")
+            batch_progress.start()
+        else:
+            batch_progress.set_message(message or f"Added {added_count} files to queue. {batch_processor.get_queue_size()} files in queue.")
+
+    def render_batch_progress(snapshot):
+        """Show a coalesced batch progress snapshot with a single page update."""
+        summary, active_files = format_progress(snapshot)
+        progress_bar.value = snapshot["overall"]
+        progress_text.value = f"{snapshot['message']}\n{summary}" if snapshot["message"] else summary
+        batch_files_text.value = active_files
+        batch_files_text.visible = bool(active_files)
+        page.update()
+
+    def on_batch_result(file_path, result):
+        batch_progress.file_done(file_path, result["status"] == "success")
+        if hot_folder_watcher is not None:
+            hot_folder_watcher.mark_done(file_path, result["status"] == "success")
+
+    def start_watching(folder):
+        nonlocal hot_folder_watcher
+        if not os.path.isdir(folder):
+            show_snackbar(f"Watched folder not found: {folder}")
+            return
+
+        def on_new_file(path):
+            batch_processor.add_file(path, get_batch_options())
+            start_batch_processing(1)
+
+        hot_folder_watcher = HotFolderWatcher(folder, on_new_file)
+        hot_folder_watcher.start()
+        watch_folder_button.text = "Stop Watching Folder"
+        show_snackbar(f"Watching {folder} for new videos")
+        page.update()
+
+    def stop_watching():
+        nonlocal hot_folder_watcher
+        if hot_folder_watcher is not None:
+            hot_folder_watcher.stop()
+            hot_folder_watcher = None
+        watch_folder_button.text = "Watch Folder"
+        page.update()
+
+    def pick_watch_folder_result(e: ft.FilePickerResultEvent):
+        if e.path:
+            if not config.get_api_key("perplexity"):
+                show_error_dialog("API Key Missing", "Please configure your Perplexity API key in settings before watching a folder.")
+                page.update()
+                return
+            config.set_hot_folder_setting("folder", e.path)
+            start_watching(e.path)
+
+    def watch_folder_clicked(e):
+        if hot_folder_watcher is not None:
+            stop_watching()
+            config.set_hot_folder_setting("folder", "")
+        else:
+            watch_folder_picker.get_directory_path(dialog_title="Folder to watch for new videos")
 
     def copy_content_to_clipboard(content_type):
         content = current_content.get(content_type, "")
@@ -322,7 +582,7 @@ def main(page: ft.Page):
                     else:
                         base_filename = f"youtube_content_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-                exported_files = export_content(current_content, base_filename)
+                exported_files = export_content(current_content, base_filename, current_segments)
                 if exported_files:
                     show_snackbar(f"Exported {len(exported_files)} files!")
                     update_progress_ui(f"Exported {len(exported_files)} files!")
@@ -336,14 +596,33 @@ def main(page: ft.Page):
             show_snackbar("No content to export.", color=ft.Colors.ORANGE_ACCENT)
             update_progress_ui("No content to export.")
 
+    def get_generation_mode():
+        return "combined" if combined_mode_checkbox.value else "separate"
+
+    def combined_mode_changed(e):
+        config.set_generation_setting("mode", get_generation_mode())
+
+    def profile_changed(e):
+        config.set_transcription_setting("profile", profile_dropdown.value)
+
     # UI Elements
     progress_bar = ft.ProgressBar(width=400, visible=False)
     progress_text = ft.Text("", visible=False)
+    batch_files_text = ft.Text("", visible=False, size=12)
+
+    # Batch workers report here; the UI is refreshed at a bounded rate
+    batch_progress = ProgressAggregator(render_batch_progress)
+    batch_processor.set_progress_callback(batch_progress.set_message)
+    batch_processor.set_stage_callback(batch_progress.set_stage)
+    batch_processor.set_result_callback(on_batch_result)
+    batch_processor.set_complete_callback(on_batch_processing_complete)
     
     file_picker = ft.FilePicker(on_result=pick_files_result)
     batch_file_picker = ft.FilePicker(on_result=pick_files_for_batch_result)
+    watch_folder_picker = ft.FilePicker(on_result=pick_watch_folder_result)
     page.overlay.append(file_picker)
     page.overlay.append(batch_file_picker)
+    page.overlay.append(watch_folder_picker)
 
     process_button = ft.ElevatedButton(
         "Upload Single Video",
@@ -357,6 +636,26 @@ def main(page: ft.Page):
         on_click=lambda _: batch_file_picker.pick_files(allow_multiple=True, allowed_extensions=["mp4", "avi", "mov", "mkv"]),
     )
 
+    watch_folder_button = ft.ElevatedButton(
+        "Watch Folder",
+        icon=ft.Icons.FOLDER_OPEN,
+        on_click=watch_folder_clicked,
+    )
+
+    combined_mode_checkbox = ft.Checkbox(
+        label="Single combined request (fewer tokens)",
+        value=config.get_generation_setting("mode") == "combined",
+        on_change=combined_mode_changed,
+    )
+
+    profile_dropdown = ft.Dropdown(
+        label="Transcription profile",
+        value=config.get_transcription_setting("profile"),
+        options=[ft.dropdown.Option(name) for name in config.get_transcription_profile_names()],
+        on_change=profile_changed,
+        width=200,
+    )
+
     # Copy buttons
     copy_title_button = ft.IconButton(
         icon=ft.Icons.COPY,
@@ -394,6 +693,14 @@ def main(page: ft.Page):
         disabled=True
     )
 
+    # Ask the API again instead of serving the cached responses
+    regenerate_button = ft.ElevatedButton(
+        "Regenerate",
+        icon=ft.Icons.REFRESH,
+        on_click=regenerate_content,
+        disabled=True
+    )
+
     # Create TextField widgets for each tab
     title_text_field = ft.TextField(
         value="",
@@ -440,23 +747,22 @@ def main(page: ft.Page):
         expand=True
     )
     
-    captions_text_field = ft.TextField(
-        value="",
-        multiline=True,
-        min_lines=10,
-        max_lines=20,
-        read_only=True,
-        expand=True
-    )
-    
-    transcript_text_field = ft.TextField(
-        value="",
-        multiline=True,
-        min_lines=10,
-        max_lines=20,
-        read_only=True,
-        expand=True
+    # Captions and transcripts can be hours long; they are shown in chunks
+    captions_view = create_chunked_view("captions")
+    transcript_view = create_chunked_view("transcript")
+
+    # Batch results browser: one page of job summaries at a time
+    results_status_dropdown = ft.Dropdown(
+        label="Status",
+        value="all",
+        options=[ft.dropdown.Option(status) for status in ("all", "done", "failed", "pending")],
+        on_change=results_status_changed,
+        width=150,
     )
+    results_list = ft.ListView(expand=True, spacing=0)
+    results_page_text = ft.Text("")
+    results_prev_button = ft.IconButton(icon=ft.Icons.CHEVRON_LEFT, tooltip="Previous page", on_click=lambda _: change_results_page(-1))
+    results_next_button = ft.IconButton(icon=ft.Icons.CHEVRON_RIGHT, tooltip="Next page", on_click=lambda _: change_results_page(1))
 
     # Tab content creation helper
     def create_tab_content(label, text_field):
@@ -496,12 +802,26 @@ def main(page: ft.Page):
     
     captions_tab = ft.Tab(
         text="Captions",
-        content=create_tab_content("Captions", captions_text_field)
+        content=create_tab_content("Captions", captions_view)
     )
     
     transcript_tab = ft.Tab(
         text="Transcript",
-        content=create_tab_content("Transcript", transcript_text_field)
+        content=create_tab_content("Transcript", transcript_view)
+    )
+
+    batch_results_tab = ft.Tab(
+        text="Batch Results",
+        content=ft.Column([
+            ft.Row([
+                results_status_dropdown,
+                results_prev_button,
+                results_page_text,
+                results_next_button,
+                ft.IconButton(icon=ft.Icons.REFRESH, tooltip="Refresh", on_click=refresh_results_list),
+            ]),
+            results_list
+        ], expand=True)
     )
 
     tabs = ft.Tabs(
@@ -514,7 +834,8 @@ def main(page: ft.Page):
             hashtags_tab,
             chapters_tab,
             captions_tab,
-            transcript_tab
+            transcript_tab,
+            batch_results_tab
         ],
         expand=1
     )
@@ -527,7 +848,11 @@ def main(page: ft.Page):
                 ft.Row([
                     process_button,
                     batch_process_button,
-                    export_all_button
+                    watch_folder_button,
+                    export_all_button,
+                    regenerate_button,
+                    profile_dropdown,
+                    combined_mode_checkbox
                 ]),
                 ft.Row([
                     copy_title_button,
@@ -537,11 +862,24 @@ def main(page: ft.Page):
                 ]),
                 progress_bar,
                 progress_text,
+                batch_files_text,
                 tabs
             ],
             expand=True
         )
     )
 
+    # List the results of earlier sessions
+    refresh_results_list()
+
+    # Pick up batch files left unfinished when the app was last closed
+    resumed = batch_processor.resume()
+    if resumed:
+        start_batch_processing(resumed, f"Resuming {resumed} unfinished batch files...")
+
+    # Keep watching the folder chosen in an earlier session
+    if config.get_hot_folder_setting("folder"):
+        start_watching(config.get_hot_folder_setting("folder"))
+
 if __name__ == "__main__":
     ft.app(target=main)
\ No newline at end of file
@@ -0,0 +1,194 @@
+import os
+import time
+import threading
+from config import config
+
+# Share of a file's total processing time spent before each stage starts,
+# and the share the stage itself takes; used for the overall percentage
+STAGE_WEIGHTS = {
+    "extract": (0.0, 0.1),
+    "transcribe": (0.1, 0.6),
+    "generate": (0.7, 0.3),
+}
+
+STAGE_NAMES = tuple(STAGE_WEIGHTS)
+
+class ProgressAggregator:
+    """
+    Collects progress from batch worker threads and renders it at a bounded rate.
+
+    Workers only record events under a lock. A single flusher thread hands
+    a snapshot of the combined state to the render callback at most
+    max_updates_per_second times, and only when something changed, so the
+    UI does one refresh per interval however many workers report.
+    """
+
+    def __init__(self, render, max_updates_per_second=None):
+        self.render = render
+        rate = max_updates_per_second or config.get_ui_setting("max_progress_updates_per_second") or 4
+        self.interval = 1.0 / rate
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.message = ""
+        self.files = {}
+        self.started_at = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start the flusher thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="progress", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the flusher thread after rendering any pending change.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def add_files(self, count):
+        """
+        Count newly queued files.
+        """
+        with self._lock:
+            if self.started_at is None or self.done + self.failed >= self.total:
+                # A new batch after the previous one finished
+                self.total = self.done = self.failed = 0
+                self.files = {}
+                self.started_at = time.monotonic()
+            self.total += count
+            self._dirty = True
+
+    def set_message(self, message):
+        """
+        Record the latest status message; older ones are dropped.
+        """
+        with self._lock:
+            self.message = message
+            self._dirty = True
+
+    def set_stage(self, file_path, stage, fraction=0.0):
+        """
+        Record the stage a file is in and how far along it is.
+
+        Args:
+            file_path (str): File being processed
+            stage (str): One of STAGE_NAMES
+            fraction (float): Progress within the stage, 0 to 1
+        """
+        with self._lock:
+            self.files[file_path] = (stage, fraction)
+            self._dirty = True
+
+    def file_done(self, file_path, success):
+        """
+        Record that a file left the pipeline.
+        """
+        with self._lock:
+            self.files.pop(file_path, None)
+            if success:
+                self.done += 1
+            else:
+                self.failed += 1
+            self._dirty = True
+
+    def snapshot(self):
+        """
+        Get the combined progress.
+
+        Returns:
+            dict: message, per-file stage and percent, per-stage counts,
+                done/failed/total counts, overall fraction and ETA seconds
+                (None until it can be estimated)
+        """
+        with self._lock:
+            stage_counts = {stage: 0 for stage in STAGE_NAMES}
+            partial = 0.0
+            files = {}
+            for file_path, (stage, fraction) in self.files.items():
+                stage_counts[stage] = stage_counts.get(stage, 0) + 1
+                start, share = STAGE_WEIGHTS.get(stage, (0.0, 0.0))
+                file_fraction = start + share * min(max(fraction, 0.0), 1.0)
+                partial += file_fraction
+                files[file_path] = {"stage": stage, "percent": round(file_fraction * 100)}
+
+            finished = self.done + self.failed
+            overall = (finished + partial) / self.total if self.total else 0.0
+            eta = None
+            if self.started_at is not None and 0 < overall < 1:
+                elapsed = time.monotonic() - self.started_at
+                eta = elapsed * (1 - overall) / overall
+            return {
+                "message": self.message,
+                "files": files,
+                "stage_counts": stage_counts,
+                "done": self.done,
+                "failed": self.failed,
+                "total": self.total,
+                "overall": min(overall, 1.0),
+                "eta_seconds": eta,
+            }
+
+    def flush(self):
+        """
+        Render now if anything changed since the last render.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+        try:
+            self.render(self.snapshot())
+        except Exception as e:
+            print(f"Error rendering progress: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+def format_eta(seconds):
+    """
+    Format an ETA for display, e.g. "4m 12s".
+    """
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+def format_progress(snapshot, max_files=8):
+    """
+    Format a snapshot as a summary line and one line per active file.
+
+    Returns:
+        tuple: (summary line, active files text)
+    """
+    counts = " · ".join(f"{stage.capitalize()} {count}" for stage, count in snapshot["stage_counts"].items())
+    summary = (
+        f"{counts} · Done {snapshot['done']}/{snapshot['total']}"
+        + (f" ({snapshot['failed']} failed)" if snapshot["failed"] else "")
+        + f" · ETA {format_eta(snapshot['eta_seconds'])}"
+    )
+    lines = [
+        f"{os.path.basename(file_path)}: {info['stage']} {info['percent']}%"
+        for file_path, info in list(snapshot["files"].items())[:max_files]
+    ]
+    hidden = len(snapshot["files"]) - len(lines)
+    if hidden > 0:
+        lines.append(f"... and {hidden} more")
+    return summary, "\n".join(lines)
@@ -0,0 +1,220 @@
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+class TokenBucket:
+    """
+    Token bucket that lets callers reserve capacity ahead of time.
+    
+    A reservation always succeeds and returns how long the caller must wait
+    for the bucket to refill, so waiting callers are served in order and
+    never spin on the lock.
+    """
+    
+    def __init__(self, rate_per_minute, burst_seconds=10):
+        self.burst_seconds = burst_seconds
+        self.set_rate(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def set_rate(self, rate_per_minute):
+        """
+        Change the refill rate.
+        
+        Args:
+            rate_per_minute (float): Tokens added per minute
+        """
+        self.rate_per_minute = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * self.burst_seconds)
+    
+    def reserve(self, amount=1):
+        """
+        Take tokens from the bucket.
+        
+        Args:
+            amount (float): Tokens to take; capped at the bucket capacity so
+                oversized requests still go through
+        
+        Returns:
+            float: Seconds to wait before using the reservation
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+class RateLimiter:
+    """
+    Client-side limiter for requests per minute and tokens per minute.
+    
+    One instance is shared by every worker thread. The request rate adapts:
+    it is halved whenever the server answers 429 and climbs back towards the
+    configured limit with every successful call.
+    """
+    
+    def __init__(self, requests_per_minute, tokens_per_minute=None):
+        self.max_requests_per_minute = requests_per_minute
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens=0):
+        """
+        Block until one request using the given number of tokens may be sent.
+        
+        Args:
+            tokens (int): Estimated tokens of the request
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+    
+    def reserve(self, tokens=0):
+        """
+        Reserve one request without blocking, e.g. from asyncio code.
+        
+        Args:
+            tokens (int): Estimated tokens of the request
+        
+        Returns:
+            float: Seconds the caller must wait before sending the request
+        """
+        with self._lock:
+            wait = self.requests.reserve(1)
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+    
+    def on_throttled(self):
+        """
+        Halve the request rate after the server rejected a request with 429.
+        """
+        with self._lock:
+            self.requests.set_rate(max(1.0, self.requests.rate_per_minute / 2))
+            print(f"DEBUG: Rate limited; lowering to {self.requests.rate_per_minute:.0f} requests/min")
+    
+    def on_success(self):
+        """
+        Raise the request rate slightly after a successful call.
+        """
+        with self._lock:
+            if self.requests.rate_per_minute < self.max_requests_per_minute:
+                self.requests.set_rate(min(
+                    self.max_requests_per_minute,
+                    self.requests.rate_per_minute + self.max_requests_per_minute * 0.05,
+                ))
+    
+    def get_rate(self):
+        """
+        Returns:
+            float: Current requests per minute
+        """
+        return self.requests.rate_per_minute
+
+class CircuitBreaker:
+    """
+    Pauses all requests after repeated failures.
+    
+    After failure_threshold consecutive failures the circuit opens and
+    callers wait for reset_seconds. A single probe request is then let
+    through; its success closes the circuit, its failure opens it again.
+    A probe that reports neither within probe_timeout seconds counts as
+    failed, so a lost outcome cannot leave the circuit half open.
+    """
+    
+    def __init__(self, failure_threshold=5, reset_seconds=60, probe_timeout=None):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.probe_timeout = probe_timeout or reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self._lock = threading.Lock()
+    
+    def before_request(self):
+        """
+        Ask whether a request may be sent now.
+        
+        Returns:
+            float: 0 if the request may go ahead, otherwise seconds to wait
+                before asking again
+        """
+        with self._lock:
+            if self.state == "closed":
+                return 0.0
+            now = time.monotonic()
+            if self.state == "half_open":
+                probe_remaining = self.probe_started + self.probe_timeout - now
+                if probe_remaining > 0:
+                    # The probe request is still in flight
+                    return max(probe_remaining, 1.0)
+                print(f"DEBUG: Circuit probe timed out; pausing requests for {self.reset_seconds}s")
+                self.state = "open"
+                self.opened_at = now
+            remaining = self.opened_at + self.reset_seconds - now
+            if remaining <= 0:
+                self.state = "half_open"
+                self.probe_started = now
+                return 0.0
+            return max(remaining, 1.0)
+    
+    def record_success(self):
+        """
+        Close the circuit after a successful request.
+        """
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+    
+    def record_failure(self):
+        """
+        Count a failed request, opening the circuit if needed.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"DEBUG: Circuit opened after {self.failures} failures; pausing requests for {self.reset_seconds}s")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """
+    Exponential backoff with full jitter.
+    
+    Args:
+        attempt (int): Zero-based retry number
+        base (float): Delay scale in seconds
+        cap (float): Maximum delay in seconds
+    
+    Returns:
+        float: Seconds to wait before the retry
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header.
+    
+    Args:
+        value (str): Header value, in seconds or as an HTTP date
+    
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,164 @@
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from config import config
+
+class ResponseCache:
+    """
+    Persistent cache of successful LLM responses in a local SQLite database.
+    
+    Responses are keyed by a hash of the model, system prompt and user
+    prompt. Entries expire after the TTL, and the least recently used
+    entries are dropped once the stored responses exceed the size limit.
+    """
+    
+    def __init__(self, db_path=None, ttl_hours=None, max_size_mb=None):
+        self.db_path = Path(db_path or config.get_cache_setting("response_cache_path"))
+        self.ttl_hours = ttl_hours or config.get_cache_setting("response_cache_ttl_hours")
+        self.max_size_mb = max_size_mb or config.get_cache_setting("response_cache_max_mb")
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self._connection = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(model, system_prompt, user_prompt):
+        """
+        Build the cache key for a request.
+        
+        Args:
+            model (str): Model name
+            system_prompt (str): System message
+            user_prompt (str): User message
+        
+        Returns:
+            str: Cache key
+        """
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, user_prompt):
+            digest.update(part.encode("utf-8"))
+            # Separator so ("ab", "c") and ("a", "bc") hash differently
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """
+        Look up a cached response.
+        
+        Args:
+            key (str): Cache key from make_key
+        
+        Returns:
+            str: Cached response text, or None on a miss
+        """
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT response, prompt_tokens, completion_tokens, created FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[3] > self.ttl_hours * 3600:
+                self.misses += 1
+                return None
+            connection.execute(
+                "UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            connection.commit()
+            self.hits += 1
+            self.tokens_saved += (row[1] or 0) + (row[2] or 0)
+            return row[0]
+    
+    def put(self, key, model, response, usage=None):
+        """
+        Store a successful response. Error messages must never be stored.
+        
+        Args:
+            key (str): Cache key from make_key
+            model (str): Model name
+            response (str): Response text
+            usage (dict): Token usage reported by the API
+        """
+        usage = usage or {}
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, prompt_tokens, completion_tokens, size, created, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, model, response, usage.get("prompt_tokens"), usage.get("completion_tokens"),
+                 len(response.encode("utf-8")), now, now),
+            )
+            self._evict(connection, now)
+            connection.commit()
+    
+    def get_stats(self):
+        """
+        Get cache statistics.
+        
+        Returns:
+            dict: Entry count, size, hit/miss counts for this process and
+                the tokens those hits saved
+        """
+        with self._lock:
+            entries, size, lifetime_hits = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM responses"
+            ).fetchone()
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "size_mb": size / (1024 * 1024),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "tokens_saved": self.tokens_saved,
+                "lifetime_hits": lifetime_hits,
+            }
+    
+    def clear(self):
+        """
+        Remove every cached response.
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM responses")
+            connection.commit()
+    
+    def _connect(self):
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Shared by worker threads; every access is serialized by self._lock
+            self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, response TEXT, "
+                "prompt_tokens INTEGER, completion_tokens INTEGER, size INTEGER, "
+                "created REAL, last_access REAL, hits INTEGER)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+            )
+            self._connection.commit()
+        return self._connection
+    
+    def _evict(self, connection, now):
+        connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_hours * 3600,))
+        max_bytes = self.max_size_mb * 1024 * 1024
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= max_bytes:
+            return
+        stale_keys = []
+        for key, size in connection.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if total <= max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+# Global response cache instance
+response_cache = ResponseCache()
@@ -0,0 +1,150 @@
+import os
+import time
+from config import config
+from transcript import Transcript
+
+# Stages whose timings make up a job's processing duration
+TIMED_STAGES = ("extract", "transcribe", "generate")
+
+class BatchResults:
+    """
+    Paged, read-only view of batch results for the results browser.
+
+    Pages hold only job summaries (file, status, error, timings); the
+    transcript and content of a job are read when it is opened. Results
+    come from the job store when one is used, so earlier sessions are
+    listed too, and otherwise from the processor's in-memory results.
+    """
+
+    def __init__(self, batch_processor, page_size=None):
+        self.batch_processor = batch_processor
+        self.page_size = page_size or config.get_ui_setting("results_page_size") or 50
+
+    @property
+    def store(self):
+        return self.batch_processor.job_store
+
+    def count(self, status=None):
+        """
+        Count the results.
+
+        Args:
+            status (str): Only count results with this status
+                ("done", "failed" or "pending")
+
+        Returns:
+            int: Number of results
+        """
+        if self.store:
+            return self.store.count_jobs(status)
+        return len(self._memory_summaries(status))
+
+    def get_page(self, page, status=None):
+        """
+        Get one page of job summaries, newest first.
+
+        Args:
+            page (int): Page number, starting at 0
+            status (str): Only list results with this status
+
+        Returns:
+            list: Summary dicts with id, file, status, error and timings
+        """
+        offset = page * self.page_size
+        if self.store:
+            return self.store.list_jobs(offset, self.page_size, status)
+        return self._memory_summaries(status)[offset:offset + self.page_size]
+
+    def load(self, summary):
+        """
+        Load the content and transcript of one job.
+
+        Args:
+            summary (dict): Summary from get_page
+
+        Returns:
+            dict: "content" mapping each generated kind to its text and
+                "transcript" as a Transcript (or None)
+        """
+        if self.store:
+            job = self.store.get_job(summary["id"]) or {}
+            content = job.get("content") or {}
+            segments = job.get("segments")
+        else:
+            result = self.batch_processor.get_results().get(summary["id"]) or {}
+            content = result.get("content") or {}
+            segments = result.get("segments")
+        return {
+            "content": content,
+            "transcript": Transcript.from_dict(segments) if segments else None,
+        }
+
+    def _memory_summaries(self, status=None):
+        summaries = [
+            {
+                # In memory, results are keyed by file path
+                "id": file_path,
+                "file": file_path,
+                "status": "done" if result["status"] == "success" else result["status"],
+                "error": result.get("error"),
+                "timings": result.get("timings", {}),
+            }
+            for file_path, result in reversed(list(self.batch_processor.get_results().items()))
+        ]
+        return [summary for summary in summaries if not status or summary["status"] == status]
+
+def job_duration(summary):
+    """
+    Get the total processing time of a job.
+
+    Returns:
+        float: Seconds spent in the pipeline stages
+    """
+    return sum(summary["timings"].get(stage, 0.0) for stage in TIMED_STAGES)
+
+def format_summary(summary):
+    """
+    Format a job summary as a title and a detail line for the results list.
+
+    Returns:
+        tuple: (title, details)
+    """
+    timings = " · ".join(
+        f"{stage} {summary['timings'][stage]:.1f}s" for stage in TIMED_STAGES if stage in summary["timings"]
+    )
+    details = [summary["status"], f"{job_duration(summary):.1f}s"]
+    if timings:
+        details.append(timings)
+    if summary.get("updated"):
+        details.append(time.strftime("%Y-%m-%d %H:%M", time.localtime(summary["updated"])))
+    if summary.get("error"):
+        details.append(summary["error"])
+    return os.path.basename(summary["file"]), " · ".join(details)
+
+def chunk_text(text, max_chars=5000):
+    """
+    Split text into display chunks, preferring blank lines (between SRT
+    cues), then line and word boundaries.
+
+    Args:
+        text (str): Text to split
+        max_chars (int): Maximum chunk size
+
+    Returns:
+        list: Chunks that join back into text
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        end = start + max_chars
+        for separator in ("\n\n", "\n", " "):
+            cut = text.rfind(separator, start, end)
+            if cut > start:
+                cut += len(separator) - 1
+                break
+        end = cut + 1 if cut > start else end
+        chunks.append(text[start:end])
+        start = end
+    if start < len(text) or not chunks:
+        chunks.append(text[start:])
+    return chunks
@@ -32,6 +32,7 @@ setup(
     entry_points={
         "console_scripts": [
             "youtube-optimizer=main:main",
+            "youtube-optimizer-cli=cli:main",
         ],
     },
     package_data={
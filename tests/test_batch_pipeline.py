@@ -0,0 +1,150 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import batch_processing
+from batch_processing import BatchProcessor
+from response_cache import ResponseCache
+from transcript import Transcript
+
+TIMEOUT = 5.0
+
+def fake_transcribe(audio, progress_callback=None, settings=None, vad_report=None):
+    transcript = Transcript()
+    transcript.append(0.0, 1.0, f"Transcript of {audio}")
+    return transcript
+
+def fake_generate(transcript, kinds=None, mode=None, report=None):
+    return {kind: f"{kind} text" for kind in kinds}
+
+class BatchPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        patches = {
+            "prepare_audio": lambda file_path: (file_path, None),
+            "cleanup_audio": lambda audio_path: None,
+            "lookup_transcript": lambda file_path, settings: (None, None),
+            "store_transcript": lambda *args: None,
+            "transcribe_segments": fake_transcribe,
+            "generate_all": fake_generate,
+            "response_cache": ResponseCache(db_path=os.path.join(self.temp_dir.name, "responses.sqlite3")),
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(batch_processing, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.processor = BatchProcessor(extract_workers=1, transcribe_workers=1, generate_workers=1,
+                                        stage_queue_size=1, generation_engine="threads")
+        self.processor.job_store = None
+        self.finished = []
+        self.processor.set_result_callback(lambda file_path, result: self.finished.append(file_path))
+
+    def run_batch(self, files):
+        for file_path in files:
+            self.processor.add_file(file_path)
+        self.processor.process_queue()
+        self.wait_until_idle()
+
+    def wait_until_idle(self):
+        deadline = time.monotonic() + TIMEOUT
+        while self.processor.is_processing():
+            self.assertLess(time.monotonic(), deadline, "batch is still processing")
+            time.sleep(0.01)
+
+    def test_results_follow_queue_order(self):
+        files = [f"video{index}.mp4" for index in range(5)]
+        self.run_batch(files)
+
+        self.assertEqual(self.finished, files)
+        for file_path in files:
+            result = self.processor.get_results()[file_path]
+            self.assertEqual(result["status"], "success")
+            self.assertEqual(result["content"]["title"], "title text")
+
+    def test_failing_result_callback_does_not_stall_the_batch(self):
+        def on_result(file_path, result):
+            self.finished.append(file_path)
+            raise RuntimeError("callback failed")
+
+        self.processor.set_result_callback(on_result)
+        files = [f"video{index}.mp4" for index in range(6)]
+        self.run_batch(files)
+
+        self.assertEqual(self.finished, files)
+        self.assertEqual(len(self.processor.get_results()), 6)
+
+    def test_stage_error_only_fails_its_job(self):
+        def lookup(file_path, settings):
+            if file_path == "broken.mp4":
+                raise OSError("disk error")
+            return None, None
+
+        def transcribe(audio, *args):
+            if audio == "bad_audio.mp4":
+                raise RuntimeError("decoder crashed")
+            return fake_transcribe(audio)
+
+        with mock.patch.object(batch_processing, "lookup_transcript", lookup), \
+             mock.patch.object(batch_processing, "transcribe_segments", transcribe):
+            self.run_batch(["a.mp4", "broken.mp4", "bad_audio.mp4", "b.mp4"])
+
+        results = self.processor.get_results()
+        self.assertEqual(results["broken.mp4"]["status"], "failed")
+        self.assertIn("disk error", results["broken.mp4"]["error"])
+        self.assertEqual(results["bad_audio.mp4"]["status"], "failed")
+        self.assertIn("decoder crashed", results["bad_audio.mp4"]["error"])
+        self.assertEqual(results["a.mp4"]["status"], "success")
+        self.assertEqual(results["b.mp4"]["status"], "success")
+
+    def test_raising_stage_handler_records_failed_result(self):
+        with mock.patch.object(BatchProcessor, "_generate_stage", side_effect=RuntimeError("boom")):
+            self.run_batch(["a.mp4", "b.mp4"])
+
+        for file_path in ("a.mp4", "b.mp4"):
+            result = self.processor.get_results()[file_path]
+            self.assertEqual(result["status"], "failed")
+            self.assertEqual(result["error"], "boom")
+
+    def test_streamed_audio_is_decoded_by_the_transcribe_workers(self):
+        decoded_on = []
+
+        def prepare_audio(file_path):
+            decoded_on.append(threading.current_thread().name)
+            return file_path, None
+
+        get_setting = batch_processing.config.get_transcription_setting
+        with mock.patch.object(batch_processing, "prepare_audio", prepare_audio), \
+             mock.patch.object(batch_processing.config, "get_transcription_setting",
+                               lambda setting: True if setting == "stream_audio" else get_setting(setting)):
+            self.run_batch(["a.mp4", "b.mp4"])
+
+        # Queued jobs only hold the path; nothing is decoded ahead of Whisper
+        self.assertEqual(decoded_on, ["transcribe-0", "transcribe-0"])
+        self.assertEqual(self.processor.get_results()["b.mp4"]["status"], "success")
+
+    def test_file_added_during_a_run_is_processed(self):
+        added = threading.Event()
+
+        def on_result(file_path, result):
+            self.finished.append(file_path)
+            if not added.is_set():
+                added.set()
+                self.processor.add_file("late.mp4", start=True)
+
+        self.processor.set_result_callback(on_result)
+        self.run_batch(["first.mp4"])
+        self.assertEqual(self.finished, ["first.mp4", "late.mp4"])
+
+    def test_add_file_restarts_a_finished_processor(self):
+        self.run_batch(["first.mp4"])
+        self.assertTrue(self.processor.add_file("second.mp4", start=True))
+        self.wait_until_idle()
+        self.assertEqual(self.finished, ["first.mp4", "second.mp4"])
+        self.assertEqual(self.processor.get_queue_size(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import time
+import unittest
+from content_generation import PerplexityClient
+from rate_limiting import CircuitBreaker
+
+RESET_SECONDS = 0.05
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.reason = ""
+        self.headers = headers or {}
+        self._body = body
+
+    @property
+    def text(self):
+        return str(self._body)
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("no JSON")
+        return self._body
+
+OK_BODY = {"choices": [{"message": {"content": "A title"}}]}
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.client = PerplexityClient()
+        self.client.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_seconds=RESET_SECONDS)
+        self.breaker = self.client.circuit_breaker
+
+    def open_circuit(self):
+        for _ in range(2):
+            self.client.handle_response(FakeResponse(503))
+        self.assertEqual(self.breaker.state, "open")
+        self.assertGreater(self.breaker.before_request(), 0)
+
+    def start_probe(self):
+        time.sleep(RESET_SECONDS * 1.5)
+        self.assertEqual(self.breaker.before_request(), 0)
+        self.assertEqual(self.breaker.state, "half_open")
+
+    def test_throttled_probe_reopens_then_recovers(self):
+        self.open_circuit()
+        self.start_probe()
+
+        outcome, _, _ = self.client.handle_response(FakeResponse(429))
+        self.assertEqual(outcome, "retry")
+        self.assertEqual(self.breaker.state, "open")
+
+        self.start_probe()
+        outcome, value, _ = self.client.handle_response(FakeResponse(200, OK_BODY))
+        self.assertEqual(outcome, "ok")
+        self.assertEqual(value[0], "A title")
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(self.breaker.before_request(), 0)
+
+    def test_rejected_or_unparsable_probe_closes(self):
+        for response in (FakeResponse(400), FakeResponse(200)):
+            self.open_circuit()
+            self.start_probe()
+            outcome, _, _ = self.client.handle_response(response)
+            self.assertEqual(outcome, "failed")
+            self.assertEqual(self.breaker.state, "closed")
+
+    def test_lost_probe_times_out(self):
+        self.open_circuit()
+        self.start_probe()
+        # The probe never reports; other callers wait for it
+        self.assertGreater(self.breaker.before_request(), 0)
+
+        time.sleep(RESET_SECONDS * 1.5)
+        self.assertGreater(self.breaker.before_request(), 0)
+        self.assertEqual(self.breaker.state, "open")
+
+        self.start_probe()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.before_request(), 0)
+
+if __name__ == "__main__":
+    unittest.main()
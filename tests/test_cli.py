@@ -0,0 +1,50 @@
+import os
+import json
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from cli import _accept_spool_file
+
+class SpoolTest(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.spool = Path(temp_dir.name)
+        for name in ("accepted", "rejected"):
+            (self.spool / name).mkdir()
+
+    def write_job(self, name, data, age=0):
+        path = self.spool / name
+        path.write_text(data if isinstance(data, str) else json.dumps(data), encoding="utf-8")
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_settled_job_is_accepted(self):
+        path = self.write_job("job.json", {"files": ["a.mp4", "b.mp4"], "options": {"profile": "fast"}}, age=10)
+        jobs = _accept_spool_file(path, self.spool, {"mode": "combined"}, settle_seconds=2)
+
+        self.assertEqual(jobs, [
+            ("a.mp4", {"mode": "combined", "profile": "fast"}),
+            ("b.mp4", {"mode": "combined", "profile": "fast"}),
+        ])
+        self.assertTrue((self.spool / "accepted" / "job.json").exists())
+
+    def test_job_still_being_written_is_left_alone(self):
+        # A half-written file is not rejected; it is read once it settles
+        path = self.write_job("job.json", '{"file": "a.m')
+        self.assertEqual(_accept_spool_file(path, self.spool, {}, settle_seconds=2), [])
+        self.assertTrue(path.exists())
+        self.assertFalse((self.spool / "rejected" / "job.json").exists())
+
+    def test_invalid_job_is_rejected(self):
+        path = self.write_job("job.json", '{"options": {}}', age=10)
+        self.assertEqual(_accept_spool_file(path, self.spool, {}, settle_seconds=2), [])
+        self.assertTrue((self.spool / "rejected" / "job.json").exists())
+
+    def test_missing_job_is_skipped(self):
+        self.assertEqual(_accept_spool_file(self.spool / "gone.json", self.spool, {}, settle_seconds=2), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from hot_folder import FolderIndex, HotFolderWatcher
+
+class HotFolderWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.index = FolderIndex(os.path.join(self.temp_dir.name, "index.sqlite3"))
+
+    def test_scan_errors_do_not_stop_the_watcher(self):
+        scans = []
+        rescanned = threading.Event()
+
+        def scan(full=False):
+            scans.append(full)
+            if len(scans) < 3:
+                raise OSError("share unavailable")
+            rescanned.set()
+            return 0
+
+        watcher = HotFolderWatcher(self.temp_dir.name, on_file=lambda path: None, index=self.index,
+                                   poll_interval=0.01, use_events=False)
+        with mock.patch.object(watcher, "scan", scan):
+            watcher.start()
+            self.addCleanup(watcher.stop)
+            self.assertTrue(rescanned.wait(5))
+        self.assertTrue(watcher.is_watching())
+        # The scans after a failure are full ones until one succeeds
+        self.assertEqual(scans[:3], [False, True, True])
+
+    def test_settled_file_is_handed_over_once(self):
+        path = os.path.join(self.temp_dir.name, "video.mp4")
+        with open(path, "wb") as f:
+            f.write(b"\0" * 1024)
+        handed_over = []
+        watcher = HotFolderWatcher(self.temp_dir.name, on_file=handed_over.append, index=self.index,
+                                   stable_seconds=0, use_events=False)
+
+        watcher.scan()
+        time.sleep(0.01)
+        self.assertEqual(watcher.check_candidates(), 1)
+        watcher.scan(full=True)
+        self.assertEqual(watcher.check_candidates(), 0)
+        self.assertEqual(handed_over, [path])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import time
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+import batch_processing
+from batch_processing import BatchProcessor
+from job_store import JobStore
+from response_cache import ResponseCache
+from transcript import Transcript
+
+SEGMENTS = {"start": [0.0], "end": [2.0], "text": ["Hello there"]}
+
+class JobStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.db_path = os.path.join(self.temp_dir.name, "jobs.sqlite3")
+        # A long lease keeps the heartbeat thread out of the way
+        self.store = self.open_store("first")
+
+    def open_store(self, owner, lease_seconds=3600):
+        store = JobStore(self.db_path, owner=owner, lease_seconds=lease_seconds)
+        self.addCleanup(store.close)
+        return store
+
+    def other_store(self, owner="second", lease_seconds=3600):
+        return self.open_store(owner, lease_seconds)
+
+    def test_job_lifecycle(self):
+        job_id = self.store.add_job("video.mp4", {"profile": "fast"})
+        job = self.store.get_job(job_id)
+        self.assertEqual((job["file"], job["stage"], job["status"]), ("video.mp4", "queued", "pending"))
+        self.assertEqual(job["options"], {"profile": "fast"})
+
+        self.store.mark_transcribed(job_id, SEGMENTS)
+        self.store.save_content(job_id, {"title": "A title"})
+        job = self.store.get_job(job_id)
+        self.assertEqual(job["stage"], "transcribed")
+        self.assertEqual(job["segments"], SEGMENTS)
+        self.assertEqual(job["content"], {"title": "A title"})
+
+        self.store.finish_job(job_id, "success", timings={"transcribe": 1.5})
+        [summary] = self.store.list_jobs()
+        self.assertEqual((summary["stage"], summary["status"]), ("done", "done"))
+        self.assertEqual(summary["timings"], {"transcribe": 1.5})
+        self.assertEqual(self.store.count_jobs("done"), 1)
+
+    def test_failed_jobs_are_requeued(self):
+        job_id = self.store.add_job("video.mp4")
+        self.store.finish_job(job_id, "failed", "ffmpeg missing")
+        self.assertEqual(self.store.get_job(job_id)["error"], "ffmpeg missing")
+        self.assertEqual(self.store.get_stats()["statuses"], {"failed": 1})
+
+        self.assertEqual(self.store.requeue_failed(), 1)
+        # Requeued jobs are released, so another process resumes them
+        self.assertEqual(self.other_store().claim_unfinished_jobs(), [(job_id, "video.mp4", {})])
+
+    def test_clear_keeps_unfinished_jobs(self):
+        done = self.store.add_job("done.mp4")
+        self.store.save_content(done, {"title": "A title"})
+        self.store.finish_job(done, "success")
+        pending = self.store.add_job("pending.mp4")
+
+        self.store.clear(finished_only=True)
+        self.assertIsNone(self.store.get_job(done))
+        self.assertIsNotNone(self.store.get_job(pending))
+        fields = sqlite3.connect(self.db_path).execute("SELECT COUNT(*) FROM fields").fetchone()[0]
+        self.assertEqual(fields, 0)
+
+    def test_jobs_of_a_live_owner_are_not_claimed(self):
+        job_id = self.store.add_job("video.mp4")
+        # Neither the owner itself nor another process takes it over
+        self.assertEqual(self.store.claim_unfinished_jobs(), [])
+        self.assertEqual(self.other_store().claim_unfinished_jobs(), [])
+
+        self.store.release()
+        self.assertEqual(self.other_store().claim_unfinished_jobs(), [(job_id, "video.mp4", {})])
+        self.assertEqual(self.other_store("third").claim_unfinished_jobs(), [])
+
+    def test_expired_lease_is_claimed(self):
+        job_id = self.store.add_job("video.mp4")
+        other = self.other_store(lease_seconds=0.05)
+        time.sleep(0.1)
+        self.assertEqual(other.claim_unfinished_jobs(), [(job_id, "video.mp4", {})])
+        # The new owner's heartbeat keeps it from being claimed again
+        other.heartbeat()
+        self.assertEqual(self.other_store("third", lease_seconds=60).claim_unfinished_jobs(), [])
+
+    def test_old_store_is_migrated(self):
+        connection = sqlite3.connect(self.db_path)
+        connection.execute(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, file TEXT, options TEXT, "
+            "stage TEXT, status TEXT, error TEXT, audio_path TEXT, segments TEXT, created REAL, updated REAL)"
+        )
+        connection.execute(
+            "INSERT INTO jobs (file, options, stage, status, created, updated) "
+            "VALUES ('old.mp4', '{}', 'extracted', 'pending', 0, 0)"
+        )
+        connection.commit()
+        connection.close()
+
+        [summary] = self.store.list_jobs()
+        self.assertEqual(summary["timings"], {})
+        # Jobs from before owners were recorded can be resumed
+        self.assertEqual(self.store.claim_unfinished_jobs(), [(summary["id"], "old.mp4", {})])
+        self.store.finish_job(summary["id"], "success", timings={"generate": 2.0})
+        self.assertEqual(self.store.list_jobs()[0]["timings"], {"generate": 2.0})
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.db_path = os.path.join(self.temp_dir.name, "jobs.sqlite3")
+        patcher = mock.patch.object(batch_processing, "response_cache",
+                                    ResponseCache(db_path=os.path.join(self.temp_dir.name, "responses.sqlite3")))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_resumed_job_skips_finished_work(self):
+        crashed = JobStore(self.db_path, owner="crashed", lease_seconds=3600)
+        self.addCleanup(crashed.close)
+        job_id = crashed.add_job("video.mp4", {"profile": "fast"})
+        crashed.mark_transcribed(job_id, SEGMENTS)
+        crashed.save_content(job_id, {"title": "Stored title"})
+        crashed.release()
+
+        generated = []
+
+        def generate(transcript, kinds=None, mode=None, report=None):
+            generated.append((transcript.text, list(kinds)))
+            return {kind: f"{kind} text" for kind in kinds}
+
+        def fail(*args):
+            raise AssertionError("resumed job was transcribed again")
+
+        store = JobStore(self.db_path, owner="resumed", lease_seconds=3600)
+        self.addCleanup(store.close)
+        processor = BatchProcessor(generation_engine="threads", job_store=store)
+        with mock.patch.object(batch_processing, "generate_all", generate), \
+             mock.patch.object(batch_processing, "prepare_audio", fail), \
+             mock.patch.object(batch_processing, "transcribe_segments", fail):
+            self.assertEqual(processor.resume(), 1)
+            processor.process_queue()
+            deadline = time.monotonic() + 5
+            while processor.is_processing():
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+
+        self.assertEqual(len(generated), 1)
+        text, kinds = generated[0]
+        self.assertEqual(text, "Hello there")
+        self.assertNotIn("title", kinds)
+        job = store.get_job(job_id)
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["content"]["title"], "Stored title")
+        self.assertEqual(Transcript.from_dict(job["segments"]).text, "Hello there")
+
+if __name__ == "__main__":
+    unittest.main()
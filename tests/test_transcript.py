@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from export_utils import save_captions_as_srt, save_captions_as_vtt
+from transcript import Transcript, TranscriptSegment, TranscriptWord, format_timestamp
+
+LONG_TEXT = ("This segment is long enough that it cannot fit in two caption lines "
+             "of forty two characters and has to become several cues.")
+
+class FormatTimestampTest(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(format_timestamp(3723.4567), "01:02:03,457")
+        self.assertEqual(format_timestamp(62.5, "."), "00:01:02.500")
+        self.assertEqual(format_timestamp(62.5, ".", always_hours=False), "01:02.500")
+        self.assertEqual(format_timestamp(-1), "00:00:00,000")
+
+class TranscriptTest(unittest.TestCase):
+    def test_segments_round_trip(self):
+        transcript = Transcript()
+        transcript.append_segment(TranscriptSegment(0.0, 1.5, " Hello"))
+        transcript.append(1.5, 3.0, " world.", [(1.5, 2.0, " world.")])
+
+        restored = Transcript.from_dict(transcript.to_dict())
+        self.assertEqual(restored.text, " Hello world.")
+        self.assertEqual(restored.duration, 3.0)
+        # Segments before the first with word timings get an empty list
+        self.assertEqual([segment.words for segment in restored], [[], [TranscriptWord(1.5, 2.0, " world.")]])
+
+    def test_to_srt(self):
+        transcript = Transcript()
+        transcript.append(0.0, 1.5, " Hello there.")
+        transcript.append(3661.25, 3663.0, " One hour later.")
+        self.assertEqual(transcript.to_srt(), (
+            "1\n00:00:00,000 --> 00:00:01,500\nHello there.\n\n"
+            "2\n01:01:01,250 --> 01:01:03,000\nOne hour later.\n\n"
+        ))
+
+    def test_iter_vtt(self):
+        transcript = Transcript()
+        transcript.append(0.0, 1.5, " Hello there.")
+        transcript.append(2.0, 2.0, "   ")
+        self.assertEqual("".join(transcript.iter_vtt()), "WEBVTT\n\n00:00:00.000 --> 00:00:01.500\nHello there.\n\n")
+
+    def test_long_segment_is_split_in_proportion_to_text(self):
+        transcript = Transcript()
+        transcript.append(10.0, 20.0, LONG_TEXT)
+        cues = list(transcript.iter_cues())
+
+        self.assertGreater(len(cues), 1)
+        for cue in cues:
+            self.assertLessEqual(len(cue.lines), 2)
+            self.assertTrue(all(len(line) <= 42 for line in cue.lines))
+        self.assertEqual((cues[0].start, cues[-1].end), (10.0, 20.0))
+        for previous, cue in zip(cues, cues[1:]):
+            self.assertEqual(previous.end, cue.start)
+        self.assertEqual(" ".join(line for cue in cues for line in cue.lines), LONG_TEXT)
+
+    def test_long_segment_is_split_at_word_timings(self):
+        words = [(10.0 + index, 10.5 + index, word) for index, word in enumerate(LONG_TEXT.split())]
+        transcript = Transcript()
+        transcript.append(10.0, 40.0, LONG_TEXT, words)
+        cues = list(transcript.iter_cues())
+
+        first_cue_words = sum(len(line.split()) for line in cues[0].lines)
+        self.assertEqual(cues[0].end, words[first_cue_words - 1][1])
+        self.assertEqual(cues[-1].end, words[-1][1])
+
+class CaptionExportTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.base = os.path.join(self.temp_dir.name, "video")
+        self.transcript = Transcript()
+        self.transcript.append(0.0, 1.5, " Hello there.")
+
+    def read(self, path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_transcript_is_saved_as_srt_and_vtt(self):
+        srt_path = save_captions_as_srt(self.transcript, self.base)
+        vtt_path = save_captions_as_vtt(self.transcript, self.base)
+
+        self.assertEqual(self.read(srt_path), self.transcript.to_srt())
+        self.assertEqual(self.read(vtt_path), "".join(self.transcript.iter_vtt()))
+
+    def test_generated_srt_text_is_saved_as_is(self):
+        captions = "1\n00:00:00,000 --> 00:00:01,000\nGenerated.\n"
+        self.assertEqual(self.read(save_captions_as_srt(captions, self.base)), captions)
+
+if __name__ == "__main__":
+    unittest.main()
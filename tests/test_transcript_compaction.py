@@ -0,0 +1,52 @@
+import unittest
+from transcript import Transcript
+from transcript_compaction import estimate_tokens, extractive_summary, split_long_text, split_windows
+
+# Unpunctuated ASR output: one "sentence" of about 9000 tokens
+ASR_TEXT = " ".join(f"today we look at python decorators and closures part {index}" for index in range(600))
+
+class SplitWindowsTest(unittest.TestCase):
+    def test_sentences_are_kept_whole(self):
+        text = "First sentence here. Second one follows! Is this the third? Yes it is."
+        windows = split_windows(text, window_tokens=12)
+        self.assertEqual(windows, ["First sentence here. Second one follows!", "Is this the third? Yes it is."])
+
+    def test_unpunctuated_text_is_cut_at_word_boundaries(self):
+        windows = split_windows(ASR_TEXT, window_tokens=500, overlap_tokens=50)
+
+        self.assertGreater(len(windows), 10)
+        for window in windows:
+            self.assertLessEqual(estimate_tokens(window), 500)
+        words = ASR_TEXT.split()
+        self.assertEqual(windows[0].split(), words[:len(windows[0].split())])
+        self.assertEqual(windows[-1].split()[-1], words[-1])
+
+    def test_long_segment_is_cut(self):
+        transcript = Transcript()
+        transcript.append(0.0, 5.0, "Short intro.")
+        transcript.append(5.0, 600.0, ASR_TEXT)
+        windows = split_windows(transcript, window_tokens=400)
+
+        self.assertEqual(windows[0], "[00:00:00] Short intro.")
+        self.assertTrue(windows[1].startswith("[00:00:05] today"))
+        for window in windows:
+            self.assertLessEqual(estimate_tokens(window), 400)
+
+    def test_word_longer_than_the_budget_is_cut(self):
+        self.assertEqual(split_long_text("ab " + "x" * 20, 3), ["ab", "xxxxxxxx", "xxxxxxxx", "xxxx"])
+
+class ExtractiveSummaryTest(unittest.TestCase):
+    def test_unpunctuated_text_has_a_summary(self):
+        summary = extractive_summary(ASR_TEXT, 200)
+
+        self.assertTrue(summary)
+        self.assertLessEqual(estimate_tokens(summary), 200)
+        self.assertIn("python decorators", summary)
+
+    def test_keeps_sentences_in_order_within_budget(self):
+        text = "Python decorators wrap functions. The weather was nice. Decorators in Python use closures."
+        summary = extractive_summary(text, 20)
+        self.assertEqual(summary, "Python decorators wrap functions. Decorators in Python use closures.")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+import numpy as np
+import transcription
+from transcript import TranscriptSegment, TranscriptWord
+from vad import SAMPLE_RATE, TimeMap, detect_speech_regions, remove_silence
+
+def tone(seconds, amplitude=0.5):
+    samples = np.arange(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    return (amplitude * np.sin(2 * np.pi * 440 * samples / SAMPLE_RATE)).astype(np.float32)
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+class SpeechRegionsTest(unittest.TestCase):
+    def test_silence_between_speech_is_removed(self):
+        audio = np.concatenate([silence(2), tone(1), silence(3), tone(2), silence(1)])
+        regions = detect_speech_regions(audio, pad_ms=0)
+
+        self.assertEqual(len(regions), 2)
+        starts = [start / SAMPLE_RATE for start, _ in regions]
+        ends = [end / SAMPLE_RATE for _, end in regions]
+        for actual, expected in zip(starts + ends, [2, 6, 3, 8]):
+            self.assertAlmostEqual(actual, expected, delta=0.05)
+        self.assertEqual(len(remove_silence(audio, regions)), sum(end - start for start, end in regions))
+
+    def test_short_pauses_do_not_split_a_region(self):
+        audio = np.concatenate([silence(1), tone(1), silence(0.2), tone(1), silence(1)])
+        self.assertEqual(len(detect_speech_regions(audio)), 1)
+
+    def test_all_silence_has_no_regions(self):
+        self.assertEqual(detect_speech_regions(silence(2)), [])
+        self.assertEqual(len(remove_silence(silence(2), [])), 0)
+
+class TimeMapTest(unittest.TestCase):
+    def test_times_map_back_to_the_original_audio(self):
+        # Speech at 2-3s and 6-8s of the original, 0-1s and 1-3s after remove_silence
+        time_map = TimeMap([(2 * SAMPLE_RATE, 3 * SAMPLE_RATE), (6 * SAMPLE_RATE, 8 * SAMPLE_RATE)])
+
+        self.assertAlmostEqual(time_map.to_original(0.0), 2.0)
+        self.assertAlmostEqual(time_map.to_original(0.5), 2.5)
+        self.assertAlmostEqual(time_map.to_original(1.0), 6.0)
+        self.assertAlmostEqual(time_map.to_original(2.5), 7.5)
+        # Past the last region, time continues from its start
+        self.assertAlmostEqual(time_map.to_original(3.5), 8.5)
+
+    def test_no_regions_keeps_times(self):
+        self.assertEqual(TimeMap([]).to_original(4.2), 4.2)
+
+class TranscribeStreamTest(unittest.TestCase):
+    def test_segment_and_word_times_are_remapped(self):
+        audio = np.concatenate([silence(2), tone(1), silence(3), tone(2), silence(1)])
+        decoded = []
+
+        def transcribe_prepared(speech, settings, progress_callback):
+            decoded.append(len(speech))
+            yield TranscriptSegment(0.25, 2.4, " Hi there", [TranscriptWord(0.25, 0.5, " Hi"), TranscriptWord(2.0, 2.4, " there")])
+
+        settings = dict(transcription.get_transcription_settings(), vad_prefilter=True)
+        report = {}
+        with mock.patch.object(transcription, "_transcribe_prepared", transcribe_prepared):
+            [segment] = transcription.transcribe_stream(audio, settings=settings, report=report)
+
+        # Only the speech was decoded
+        self.assertLess(decoded[0], 4 * SAMPLE_RATE)
+        self.assertAlmostEqual(report["audio_seconds"], 9.0)
+        self.assertGreater(report["skipped_fraction"], 0.5)
+        # 0.25s into the speech-only audio is in the first (padded) region, 2.0s in the second
+        first_start = detect_speech_regions(audio)[0][0] / SAMPLE_RATE
+        self.assertAlmostEqual(segment.start, first_start + 0.25, places=3)
+        self.assertAlmostEqual(segment.words[0].start, first_start + 0.25, places=3)
+        self.assertGreater(segment.words[1].start, 5.5)
+        self.assertAlmostEqual(segment.end - segment.words[1].start, 0.4, places=3)
+        self.assertEqual(segment.text, " Hi there")
+
+    def test_silent_audio_yields_nothing(self):
+        settings = dict(transcription.get_transcription_settings(), vad_prefilter=True)
+        with mock.patch.object(transcription, "_transcribe_prepared", side_effect=AssertionError("decoded silence")):
+            self.assertEqual(list(transcription.transcribe_stream(silence(2), settings=settings)), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+import textwrap
+from array import array
+from collections import namedtuple
+
+# One piece of transcribed speech, with start/end times in seconds and
+# optional word timings
+TranscriptSegment = namedtuple("TranscriptSegment", ["start", "end", "text", "words"], defaults=(None,))
+
+# One word with its start/end times in seconds
+TranscriptWord = namedtuple("TranscriptWord", ["start", "end", "word"])
+
+# One caption cue as it appears in an SRT or WebVTT file
+CaptionCue = namedtuple("CaptionCue", ["start", "end", "lines"])
+
+# Caption layout limits commonly used for YouTube captions
+MAX_CAPTION_LINE_LENGTH = 42
+MAX_CAPTION_LINES = 2
+
+def format_timestamp(seconds, separator=",", always_hours=True):
+    """
+    Format seconds as an SRT/WebVTT timestamp.
+    
+    Args:
+        seconds (float): Time in seconds
+        separator (str): Separator before the milliseconds ("," for SRT, "." for WebVTT)
+        always_hours (bool): Include the hours field even when it is zero
+    
+    Returns:
+        str: Timestamp such as 00:01:02,345
+    """
+    milliseconds = int(round(max(seconds, 0) * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    if hours or always_hours:
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+    return f"{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+class Transcript:
+    """
+    Timestamped transcript stored as parallel arrays.
+    
+    Start and end times live in compact float arrays next to a list of
+    segment texts, rather than one object per segment, so multi-hour
+    transcripts stay small in memory and serialize to plain JSON lists.
+    Word timings are optional and only kept when transcription produced them.
+    """
+    
+    def __init__(self):
+        self.starts = array('d')
+        self.ends = array('d')
+        self.texts = []
+        self.words = None
+    
+    def append_segment(self, segment):
+        """
+        Add a TranscriptSegment to the end of the transcript.
+        
+        Args:
+            segment (TranscriptSegment): Segment to add
+        """
+        self.append(segment.start, segment.end, segment.text, segment.words)
+    
+    def append(self, start, end, text, words=None):
+        """
+        Add a segment to the end of the transcript.
+        
+        Args:
+            start (float): Segment start in seconds
+            end (float): Segment end in seconds
+            text (str): Segment text
+            words (list): Optional TranscriptWord timings for the segment
+        """
+        self.starts.append(start)
+        self.ends.append(end)
+        self.texts.append(text)
+        if words is not None and self.words is None:
+            # Earlier segments had no word timings
+            self.words = [[] for _ in range(len(self.texts) - 1)]
+        if self.words is not None:
+            self.words.append([TranscriptWord(*word) for word in (words or [])])
+    
+    def __len__(self):
+        return len(self.texts)
+    
+    def __iter__(self):
+        for index, (start, end, text) in enumerate(zip(self.starts, self.ends, self.texts)):
+            yield TranscriptSegment(start, end, text, self.words[index] if self.words is not None else None)
+    
+    @property
+    def text(self):
+        """
+        str: The full transcript text.
+        """
+        return "".join(self.texts)
+    
+    @property
+    def duration(self):
+        """
+        float: End time of the last segment in seconds.
+        """
+        return self.ends[-1] if self.ends else 0.0
+    
+    def to_timestamped_text(self):
+        """
+        Render the transcript with a [HH:MM:SS] marker before every segment,
+        giving the model real timestamps to build chapters from.
+        
+        Returns:
+            str: Timestamped transcript
+        """
+        return "\n".join(
+            f"[{format_timestamp(start)[:8]}] {text.strip()}"
+            for start, text in zip(self.starts, self.texts)
+        )
+    
+    def iter_text_chunks(self, max_chars=5000):
+        """
+        Split the transcript text into display chunks at segment boundaries.
+        
+        Joined together the chunks equal text, so a multi-hour transcript
+        can be shown a few chunks at a time instead of as one huge string.
+        
+        Args:
+            max_chars (int): Target chunk size; a single longer segment
+                makes its own chunk
+        
+        Yields:
+            str: Chunk text
+        """
+        chunk = []
+        size = 0
+        for text in self.texts:
+            if chunk and size + len(text) > max_chars:
+                yield "".join(chunk)
+                chunk = []
+                size = 0
+            chunk.append(text)
+            size += len(text)
+        if chunk:
+            yield "".join(chunk)
+    
+    def iter_cues(self, max_line_length=MAX_CAPTION_LINE_LENGTH, max_lines=MAX_CAPTION_LINES):
+        """
+        Split the transcript into caption cues that fit the caption layout.
+        
+        Segments whose text needs more than max_lines lines are split into
+        several cues, timed by word timings when available and otherwise in
+        proportion to the text length.
+        
+        Yields:
+            CaptionCue: Cue with start/end times and wrapped lines
+        """
+        for index, (start, end, text) in enumerate(zip(self.starts, self.ends, self.texts)):
+            lines = textwrap.wrap(text.strip(), max_line_length)
+            if not lines:
+                continue
+            chunks = [lines[i:i + max_lines] for i in range(0, len(lines), max_lines)]
+            if len(chunks) == 1:
+                yield CaptionCue(start, end, chunks[0])
+                continue
+            
+            words = self.words[index] if self.words else []
+            word_position = 0
+            char_total = sum(len(line) for line in lines)
+            char_position = 0
+            chunk_start = start
+            for chunk in chunks:
+                chunk_words = sum(len(line.split()) for line in chunk)
+                char_position += sum(len(line) for line in chunk)
+                if words and word_position + chunk_words <= len(words):
+                    chunk_end = words[word_position + chunk_words - 1].end
+                    word_position += chunk_words
+                else:
+                    chunk_end = start + (end - start) * char_position / char_total
+                yield CaptionCue(chunk_start, chunk_end, chunk)
+                chunk_start = chunk_end
+    
+    def iter_srt(self):
+        """
+        Yield the transcript as SRT cue blocks, one string per cue.
+        """
+        for number, cue in enumerate(self.iter_cues(), 1):
+            yield f"{number}\n{format_timestamp(cue.start)} --> {format_timestamp(cue.end)}\n" + "\n".join(cue.lines) + "\n\n"
+    
+    def iter_vtt(self):
+        """
+        Yield the transcript as a WebVTT header followed by one string per cue.
+        """
+        yield "WEBVTT\n\n"
+        for cue in self.iter_cues():
+            yield f"{format_timestamp(cue.start, '.')} --> {format_timestamp(cue.end, '.')}\n" + "\n".join(cue.lines) + "\n\n"
+    
+    def to_srt(self):
+        """
+        Returns:
+            str: The transcript as SRT captions
+        """
+        return "".join(self.iter_srt())
+    
+    def to_dict(self):
+        """
+        Serialize to plain JSON-compatible lists.
+        
+        Returns:
+            dict: Parallel start/end/text lists and optional word timings
+        """
+        data = {
+            "start": list(self.starts),
+            "end": list(self.ends),
+            "text": list(self.texts),
+        }
+        if self.words is not None:
+            data["words"] = [[list(word) for word in words] for words in self.words]
+        return data
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a transcript serialized by to_dict.
+        
+        Args:
+            data (dict): Serialized transcript
+        
+        Returns:
+            Transcript: The transcript
+        """
+        transcript = cls()
+        transcript.starts = array('d', data.get("start", []))
+        transcript.ends = array('d', data.get("end", []))
+        transcript.texts = list(data.get("text", []))
+        if data.get("words") is not None:
+            transcript.words = [[TranscriptWord(*word) for word in words] for words in data["words"]]
+        return transcript
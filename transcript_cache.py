@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from config import config
+from transcript import Transcript
+
+# Files up to this size are hashed in full; larger files are sampled
+FULL_HASH_LIMIT = 8 * 1024 * 1024
+SAMPLE_SIZE = 1024 * 1024
+SAMPLE_COUNT = 8
+
+# Settings that only change how fast a transcript is made, or what the
+# profile is called, not its text; they are left out of the cache key
+RUNTIME_SETTINGS = ("profile", "cpu_threads", "num_workers")
+
+def hash_media_file(file_path):
+    """
+    Compute a fast content hash of a media file.
+    
+    Small files are hashed in full. Large files hash their size plus evenly
+    spaced 1 MB samples (always including the start and end), which is
+    enough to tell renders apart without reading gigabytes of video.
+    
+    Args:
+        file_path (str): Path to the media file
+    
+    Returns:
+        str: Hex digest identifying the file contents
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(size).encode())
+    with open(file_path, 'rb') as f:
+        if size <= FULL_HASH_LIMIT:
+            for chunk in iter(lambda: f.read(SAMPLE_SIZE), b""):
+                digest.update(chunk)
+        else:
+            step = (size - SAMPLE_SIZE) // (SAMPLE_COUNT - 1)
+            for index in range(SAMPLE_COUNT):
+                f.seek(index * step)
+                digest.update(f.read(SAMPLE_SIZE))
+    return digest.hexdigest()
+
+class TranscriptCache:
+    """
+    Persistent transcript cache keyed by media content and transcription settings.
+    
+    Each transcript is stored as its own JSON file, and index.json records
+    the size and last access time of every entry so the cache can be
+    inspected and trimmed least-recently-used first to stay under its size
+    limit.
+    """
+    
+    def __init__(self, cache_dir=None, max_size_mb=None):
+        self.cache_dir = Path(cache_dir or config.get_cache_setting("transcript_cache_dir"))
+        self.max_size_mb = max_size_mb or config.get_cache_setting("transcript_cache_max_mb")
+        self.index_file = self.cache_dir / "index.json"
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = None
+    
+    def make_key(self, file_path, settings):
+        """
+        Build the cache key for a media file.
+        
+        Args:
+            file_path (str): Path to the media file
+            settings (dict): Transcription settings; RUNTIME_SETTINGS are ignored
+        
+        Returns:
+            str: Cache key
+        """
+        output_settings = {name: value for name, value in settings.items() if name not in RUNTIME_SETTINGS}
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(hash_media_file(file_path).encode())
+        digest.update(json.dumps(output_settings, sort_keys=True).encode())
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """
+        Look up a cached transcript.
+        
+        Args:
+            key (str): Cache key from make_key
+        
+        Returns:
+            dict: Cached entry with a "transcript" field, or None on a miss
+        """
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self.misses += 1
+                return None
+            try:
+                with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except Exception as e:
+                print(f"Error reading cached transcript: {e}")
+                del index[key]
+                self._save_index()
+                self.misses += 1
+                return None
+            index[key]["last_access"] = time.time()
+            index[key]["hits"] = index[key].get("hits", 0) + 1
+            self._save_index()
+            self.hits += 1
+            return entry
+    
+    def put(self, key, transcript, metadata=None, segments=None):
+        """
+        Store a transcript.
+        
+        Args:
+            key (str): Cache key from make_key
+            transcript (str): Transcript text
+            metadata (dict): Extra information to record, e.g. the source file
+            segments (dict): Serialized Transcript with segment timestamps
+        """
+        entry = dict(metadata or {})
+        entry["transcript"] = transcript
+        if segments is not None:
+            entry["segments"] = segments
+        with self._lock:
+            index = self._load_index()
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                entry_path = self._entry_path(key)
+                self._write_json(entry_path, entry)
+            except Exception as e:
+                print(f"Error caching transcript: {e}")
+                return
+            now = time.time()
+            index[key] = {
+                "size": entry_path.stat().st_size,
+                "created": now,
+                "last_access": now,
+                "hits": 0,
+                **{name: value for name, value in (metadata or {}).items() if isinstance(value, (str, int, float, bool))},
+            }
+            self._evict()
+            self._save_index()
+    
+    def get_index(self):
+        """
+        Get a copy of the cache index.
+        
+        Returns:
+            dict: Cache key mapped to the entry's size, timestamps and metadata
+        """
+        with self._lock:
+            return {key: dict(value) for key, value in self._load_index().items()}
+    
+    def get_stats(self):
+        """
+        Get cache statistics.
+        
+        Returns:
+            dict: Entry count, total size and hit/miss counts
+        """
+        with self._lock:
+            index = self._load_index()
+            total = self.hits + self.misses
+            return {
+                "entries": len(index),
+                "size_mb": sum(entry["size"] for entry in index.values()) / (1024 * 1024),
+                "max_size_mb": self.max_size_mb,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+    
+    def clear(self):
+        """
+        Remove every cached transcript.
+        """
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove_entry(key)
+            self._save_index()
+    
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.json"
+    
+    def _load_index(self):
+        if self._index is None:
+            self._index = {}
+            if self.index_file.exists():
+                try:
+                    with open(self.index_file, 'r', encoding='utf-8') as f:
+                        self._index = json.load(f)
+                except Exception as e:
+                    print(f"Error loading transcript cache index: {e}")
+        return self._index
+    
+    def _save_index(self):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._write_json(self.index_file, self._index)
+        except Exception as e:
+            print(f"Error saving transcript cache index: {e}")
+    
+    def _write_json(self, path, data):
+        # Write to a temporary file first so a crash never leaves a truncated entry
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    
+    def _remove_entry(self, key):
+        self._index.pop(key, None)
+        try:
+            self._entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not remove cached transcript: {e}")
+    
+    def _evict(self):
+        max_bytes = self.max_size_mb * 1024 * 1024
+        total = sum(entry["size"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_access"]):
+            if total <= max_bytes or len(self._index) <= 1:
+                break
+            total -= self._index[key]["size"]
+            self._remove_entry(key)
+
+# Global transcript cache instance
+transcript_cache = TranscriptCache()
+
+def lookup_transcript(file_path, settings):
+    """
+    Look up the cached transcript for a media file.
+    
+    Args:
+        file_path (str): Path to the media file
+        settings (dict): Transcription settings that affect the output
+    
+    Returns:
+        tuple: (cache key, cached Transcript). The key is None when caching
+            is disabled or the file could not be hashed; the transcript is
+            None on a cache miss.
+    """
+    if not config.get_cache_setting("transcript_cache_enabled"):
+        return None, None
+    try:
+        key = transcript_cache.make_key(file_path, settings)
+    except Exception as e:
+        print(f"Warning: Could not hash {file_path} for the transcript cache: {e}")
+        return None, None
+    entry = transcript_cache.get(key)
+    # Entries written before segments were cached cannot provide timestamps
+    if not entry or "segments" not in entry:
+        return key, None
+    return key, Transcript.from_dict(entry["segments"])
+
+def store_transcript(key, transcript, file_path, settings):
+    """
+    Store a transcript under a key returned by lookup_transcript.
+    
+    Args:
+        key (str): Cache key, or None to skip caching
+        transcript (Transcript): Timestamped transcript
+        file_path (str): Source media file, recorded in the index
+        settings (dict): Transcription settings, recorded in the index
+    """
+    if key is None or not transcript:
+        return
+    transcript_cache.put(
+        key,
+        transcript.text,
+        {"file": os.path.abspath(file_path), **settings},
+        segments=transcript.to_dict(),
+    )
@@ -0,0 +1,314 @@
+import re
+from collections import Counter
+from transcript import Transcript, format_timestamp
+
+# Rough English average; good enough for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being
+below between both but by can can't could couldn't did didn't do does doesn't doing don't down during each
+few for from further get got gonna had hadn't has hasn't have haven't having he he'd he'll he's her here
+here's hers herself him himself his how how's i i'd i'll i'm i've if in into is isn't it it's its itself
+just know let's like me more most mustn't my myself no nor not now of off on once one only or other ought
+our ours ourselves out over own really right same shan't she she'd she'll she's should shouldn't so some
+such than that that's the their theirs them themselves then there there's these they they'd they'll
+they're they've this those through to too um uh under until up us very want was wasn't we we'd we'll we're
+we've well were weren't what what's when when's where where's which while who who's whom why why's will
+with won't would wouldn't yeah you you'd you'll you're you've your yours yourself yourselves going thing
+things okay oh actually
+""".split())
+
+# Which parts of the compact representation each content kind needs
+KIND_VIEWS = {
+    "title": ("keywords", "summary"),
+    "description": ("summary", "outline", "keywords"),
+    "tags": ("keywords",),
+    "hashtags": ("keywords",),
+    "chapters": ("outline",),
+    # Captions transcribe the video line by line, so they are never
+    # condensed; captions_from_transcript builds them without a prompt
+    "captions": None,
+    # The single request of combined mode generates every kind
+    "combined": ("summary", "keywords", "outline"),
+}
+
+# Longest sentence scored on its own; unpunctuated ASR text is cut into
+# pieces of this size so a summary can still pick from it
+SUMMARY_SENTENCE_TOKENS = 60
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'+#-]*")
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens a text uses in a prompt.
+    
+    Args:
+        text (str): Prompt text
+    
+    Returns:
+        int: Estimated token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def split_long_text(text, max_tokens):
+    """
+    Cut a text that is over max_tokens at word boundaries.
+    
+    Words longer than the budget on their own are cut where they cross it.
+    
+    Args:
+        text (str): Text to cut, usually one sentence or segment
+        max_tokens (int): Maximum piece size in tokens, separator included
+    
+    Returns:
+        list: Pieces of at most max_tokens in order
+    """
+    max_chars = max(1, (max_tokens - 1) * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return [text]
+    pieces = []
+    current = ""
+    for word in text.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_sentences(text, max_tokens):
+    """
+    Split a text into sentences of at most max_tokens.
+    
+    Sentences are cut at punctuation first; ones that are still too long,
+    as in unpunctuated ASR output, are cut at word boundaries.
+    
+    Args:
+        text (str): Text to split
+        max_tokens (int): Maximum sentence size in tokens
+    
+    Returns:
+        list: Sentences in order
+    """
+    return [
+        piece
+        for sentence in _SENTENCE_SPLIT.split(text) if sentence.strip()
+        for piece in split_long_text(sentence.strip(), max_tokens)
+    ]
+
+def _words(text):
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS and len(word) > 2]
+
+def extract_keywords(text, limit=25):
+    """
+    Pick the most frequent keywords and two-word keyphrases of a text.
+    
+    Args:
+        text (str): Transcript text
+        limit (int): Maximum number of keywords
+    
+    Returns:
+        list: Keywords and keyphrases, most frequent first
+    """
+    words = _words(text)
+    counts = Counter(words)
+    bigrams = Counter(zip(words, words[1:]))
+    # A keyphrase must recur to be worth more than its single words
+    phrases = Counter({f"{a} {b}": n * 2 for (a, b), n in bigrams.items() if n >= 2 and a != b})
+    ranked = (counts + phrases).most_common()
+    keywords = []
+    for keyword, _ in ranked:
+        if len(keywords) >= limit:
+            break
+        if any(keyword in phrase.split(" ") for phrase in keywords if " " in phrase):
+            continue
+        keywords.append(keyword)
+    return keywords
+
+def extractive_summary(text, token_budget):
+    """
+    Summarize a text by keeping its most representative sentences.
+    
+    Sentences are scored by the document frequency of their keywords,
+    normalized by length, and the best ones are kept in their original
+    order until the token budget is used up. Text without punctuation is
+    scored in word-boundary pieces of SUMMARY_SENTENCE_TOKENS.
+    
+    Args:
+        text (str): Transcript text
+        token_budget (int): Maximum summary size in tokens
+    
+    Returns:
+        str: Summary text
+    """
+    sentences = split_sentences(text, min(token_budget, SUMMARY_SENTENCE_TOKENS))
+    counts = Counter(_words(text))
+    scored = []
+    for index, sentence in enumerate(sentences):
+        sentence_words = _words(sentence)
+        if not sentence_words:
+            continue
+        score = sum(counts[word] for word in sentence_words) / len(sentence_words) ** 0.5
+        scored.append((score, index))
+    
+    chosen = []
+    used = 0
+    for score, index in sorted(scored, reverse=True):
+        cost = estimate_tokens(sentences[index]) + 1
+        if used + cost > token_budget:
+            continue
+        chosen.append(index)
+        used += cost
+    return " ".join(sentences[index] for index in sorted(chosen))
+
+def build_outline(transcript, sections=20, line_chars=200):
+    """
+    Outline a transcript as evenly spaced sections with one line each.
+    
+    Each line starts with the section's timestamp when the transcript has
+    segment times, and holds its most representative sentence.
+    
+    Args:
+        transcript (str or Transcript): Transcript to outline
+        sections (int): Number of outline lines
+        line_chars (int): Maximum characters per line
+    
+    Returns:
+        str: One outline line per section
+    """
+    if isinstance(transcript, Transcript) and len(transcript):
+        section_length = transcript.duration / sections or 1
+        groups = {}
+        for segment in transcript:
+            groups.setdefault(min(int(segment.start // section_length), sections - 1), []).append(segment)
+        parts = [(format_timestamp(group[0].start)[:8], "".join(s.text for s in group)) for _, group in sorted(groups.items())]
+    else:
+        text = transcript.text if isinstance(transcript, Transcript) else transcript
+        step = max(1, len(text) // sections)
+        parts = [(f"Part {number}", text[start:start + step]) for number, start in enumerate(range(0, len(text), step), 1)]
+    
+    lines = []
+    for label, text in parts:
+        best = extractive_summary(text, line_chars // CHARS_PER_TOKEN) or text.strip()
+        lines.append(f"[{label}] {best[:line_chars]}")
+    return "\n".join(lines)
+
+class CompactTranscript:
+    """
+    Compressed views of a transcript that is too long to send in full.
+    
+    The keyword list, extractive summary and outline are built once and
+    then combined per content kind according to KIND_VIEWS.
+    """
+    
+    def __init__(self, transcript, token_budget):
+        self.text = transcript.text if isinstance(transcript, Transcript) else transcript
+        self.keywords = ", ".join(extract_keywords(self.text))
+        self.summary = extractive_summary(self.text, token_budget // 2)
+        self.outline = build_outline(transcript)
+    
+    def render(self, views):
+        """
+        Render the requested views as prompt text.
+        
+        Args:
+            views (iterable): Any of "keywords", "summary", "outline"
+        
+        Returns:
+            str: Prompt text describing the transcript
+        """
+        sections = ["(The full transcript is too long to include; this is a condensed version of it.)"]
+        if "summary" in views:
+            sections.append(f"Summary:\n{self.summary}")
+        if "keywords" in views:
+            sections.append(f"Keywords: {self.keywords}")
+        if "outline" in views:
+            sections.append(f"Outline:\n{self.outline}")
+        return "\n\n".join(sections)
+
+def compact_prompt_inputs(transcript, inputs, token_budget):
+    """
+    Replace over-budget prompt inputs with the views each kind needs.
+    
+    Args:
+        transcript (str or Transcript): The transcript the inputs came from
+        inputs (dict): Content kind mapped to its full prompt input
+        token_budget (int): Largest input, in tokens, that is sent in full
+    
+    Returns:
+        tuple: (inputs, tokens saved per kind)
+    """
+    if not any(estimate_tokens(text) > token_budget for text in inputs.values()):
+        return inputs, {}
+    compact = CompactTranscript(transcript, token_budget)
+    compacted = {}
+    saved = {}
+    for kind, text in inputs.items():
+        views = KIND_VIEWS.get(kind)
+        if views is None or estimate_tokens(text) <= token_budget:
+            compacted[kind] = text
+            continue
+        compacted[kind] = compact.render(views)
+        saved[kind] = estimate_tokens(text) - estimate_tokens(compacted[kind])
+    return compacted, saved
+
+def split_windows(transcript, window_tokens, overlap_tokens=0):
+    """
+    Split a transcript into overlapping windows of at most window_tokens.
+    
+    Windows of a Transcript are cut at segment boundaries and rendered with
+    [HH:MM:SS] markers; plain text is cut at sentence boundaries. A segment
+    or sentence larger than a window on its own, as in unpunctuated ASR
+    output, is cut at word boundaries instead. Each window repeats about overlap_tokens of the end of the previous one so
+    topics that straddle a cut are seen whole at least once.
+    
+    Args:
+        transcript (str or Transcript): Transcript to split
+        window_tokens (int): Maximum window size in tokens
+        overlap_tokens (int): Tokens repeated from the previous window
+    
+    Returns:
+        list: Window texts in order
+    """
+    if isinstance(transcript, Transcript):
+        pieces = [
+            piece
+            for segment in transcript
+            for piece in split_long_text(f"[{format_timestamp(segment.start)[:8]}] {segment.text.strip()}", window_tokens)
+        ]
+        separator = "\n"
+    else:
+        pieces = split_sentences(transcript, window_tokens)
+        separator = " "
+    
+    windows = []
+    current = []
+    current_tokens = 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece) + 1
+        if current and current_tokens + piece_tokens > window_tokens:
+            windows.append(separator.join(current))
+            # Carry the tail of this window over into the next one
+            carried = []
+            carried_tokens = 0
+            for previous in reversed(current):
+                previous_tokens = estimate_tokens(previous) + 1
+                if carried_tokens + previous_tokens > overlap_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous_tokens
+            current, current_tokens = carried, carried_tokens
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        windows.append(separator.join(current))
+    return windows
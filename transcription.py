@@ -1,19 +1,513 @@
-from faster_whisper import WhisperModel
-import torch
+import os
+import threading
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from config import config
+from transcript import Transcript, TranscriptSegment, TranscriptWord
+from vad import SAMPLE_RATE, find_split_points, detect_speech_regions, remove_silence, TimeMap
 
-def transcribe_audio(audio_path):
+# faster_whisper (and CTranslate2 under it) is imported where it is first
+# needed, so importing this module stays cheap for the UI and the CLI.
+
+# Rough resident size of each model once loaded, in MB. Used to keep the
+# registry under its memory budget; int8 weights are about half of float16.
+MODEL_MEMORY_ESTIMATES_MB = {
+    "tiny": 150,
+    "base": 300,
+    "small": 1000,
+    "medium": 2500,
+    "large": 5000,
+}
+
+_detected_device = None
+
+def get_default_device():
+    """
+    Pick the device and compute type for Whisper.
+
+    transcription_settings.device forces "cpu" or "cuda". With "auto" the
+    GPU count comes from CTranslate2, which faster-whisper is built on,
+    rather than from importing torch, and is probed once per process.
+
+    Returns:
+        tuple: (device, compute_type)
+    """
+    global _detected_device
+    device = config.get_transcription_setting("device") or "auto"
+    if device == "auto":
+        if _detected_device is None:
+            _detected_device = _probe_device()
+        device = _detected_device
+    compute_type = "float16" if device == "cuda" else "int8"
+    return device, compute_type
+
+def _probe_device():
     try:
-        # Use a smaller model for faster transcription
+        import ctranslate2
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception as e:
+        print(f"Warning: Could not check for a CUDA device, using the CPU: {e}")
+        return "cpu"
+
+def _estimate_model_memory(model_size, compute_type):
+    base_size = model_size.split(".")[0].split("-")[0]
+    estimate = MODEL_MEMORY_ESTIMATES_MB.get(base_size, MODEL_MEMORY_ESTIMATES_MB["large"])
+    if compute_type.startswith("int8"):
+        estimate //= 2
+    return estimate
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded Whisper models.
+
+    Each (model_size, device, compute_type) combination is loaded once and
+    shared by every caller. Models are evicted least-recently-used first when
+    the registry holds too many models, exceeds its memory budget, or a model
+    has been idle for longer than the idle timeout.
+
+    Models are loaded outside the registry lock, so a slow load only makes
+    callers of that same model wait.
+    """
+
+    def __init__(self, max_models=2, memory_budget_mb=4096, idle_timeout=900):
+        self.max_models = max_models
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_timeout = idle_timeout
+        self._models = OrderedDict()
+        # Key mapped to an Event set when its load has finished or failed
+        self._loading = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_times = {}
+
+    def get_model(self, model_size="tiny", device=None, compute_type=None, cpu_threads=0, num_workers=1):
+        """
+        Get a loaded model, loading it on first use.
+
+        Args:
+            model_size (str): Whisper model size (e.g., 'tiny', 'base')
+            device (str): 'cuda' or 'cpu'; detected when not given
+            compute_type (str): CTranslate2 compute type; derived from device when not given
+            cpu_threads (int): CPU threads per decode (0 lets CTranslate2 decide)
+            num_workers (int): Number of decodes the model can run in parallel
+
+        Returns:
+            WhisperModel: Loaded model
+        """
+        if device is None:
+            device, default_compute_type = get_default_device()
+            compute_type = compute_type or default_compute_type
+        elif compute_type is None:
+            compute_type = "float16" if device == "cuda" else "int8"
+        key = (model_size, device, compute_type, cpu_threads, num_workers)
+
+        while True:
+            with self._lock:
+                self._evict_idle()
+                entry = self._models.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    entry["last_used"] = time.monotonic()
+                    self._models.move_to_end(key)
+                    return entry["model"]
+                loaded = self._loading.get(key)
+                if loaded is None:
+                    self.misses += 1
+                    loaded = self._loading[key] = threading.Event()
+                    break
+            # Another thread is loading this model; if its load failed,
+            # the next pass loads it here
+            loaded.wait()
+
+        try:
+            start_time = time.perf_counter()
+            from faster_whisper import WhisperModel
+            model = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+            )
+            load_time = time.perf_counter() - start_time
+            print(f"DEBUG: Loaded Whisper model {key} in {load_time:.2f}s")
+
+            with self._lock:
+                self.load_times[key] = load_time
+                self._models[key] = {
+                    "model": model,
+                    "memory_mb": _estimate_model_memory(model_size, compute_type),
+                    "last_used": time.monotonic(),
+                }
+                self._evict_over_budget()
+            return model
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loaded.set()
+
+    def warm_up(self, model_size="tiny", device=None, compute_type=None, cpu_threads=0, num_workers=1):
+        """
+        Load a model ahead of the first transcription.
+
+        Returns:
+            bool: True if the model is loaded, False otherwise
+        """
+        try:
+            self.get_model(model_size, device, compute_type, cpu_threads, num_workers)
+            return True
+        except Exception as e:
+            print(f"Error warming up Whisper model: {e}")
+            return False
+
+    def clear(self):
+        """
+        Drop every cached model.
+        """
+        with self._lock:
+            self._models.clear()
+
+    def get_stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hit/miss counts, load times and loaded models
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "load_times": {"/".join(map(str, key)): seconds for key, seconds in self.load_times.items()},
+                "loaded_models": ["/".join(map(str, key)) for key in self._models],
+                "memory_mb": sum(entry["memory_mb"] for entry in self._models.values()),
+            }
+
+    def _evict(self, key):
+        del self._models[key]
+        self.evictions += 1
+        print(f"DEBUG: Evicted Whisper model {key}")
+
+    def _evict_idle(self):
+        if not self.idle_timeout:
+            return
+        now = time.monotonic()
+        for key in [k for k, entry in self._models.items() if now - entry["last_used"] > self.idle_timeout]:
+            self._evict(key)
+
+    def _evict_over_budget(self):
+        # Always keep the most recently used model, even if it alone is over budget
+        while len(self._models) > 1 and (
+            len(self._models) > self.max_models
+            or sum(entry["memory_mb"] for entry in self._models.values()) > self.memory_budget_mb
+        ):
+            self._evict(next(iter(self._models)))
+
+# Global model registry instance
+model_registry = ModelRegistry(
+    max_models=config.get_transcription_setting("max_cached_models"),
+    memory_budget_mb=config.get_transcription_setting("model_memory_budget_mb"),
+    idle_timeout=config.get_transcription_setting("model_idle_timeout"),
+)
+
+def warm_up_model(workers=1):
+    """
+    Load the configured model in the background so the first transcription
+    does not pay the load time.
+
+    Args:
+        workers (int): Concurrent transcriptions the model is loaded for;
+            pass the same count as scale_for_workers() gets when
+            transcribing, so the warmed-up model is the one used
+
+    Returns:
+        threading.Thread: The warm-up thread
+    """
+    settings = scale_for_workers(get_transcription_settings(), workers)
+    thread = threading.Thread(
+        target=model_registry.warm_up,
+        args=(settings["model_size"], None, settings["compute_type"], settings["cpu_threads"], settings["num_workers"]),
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+def get_transcription_settings(profile=None):
+    """
+    Get the settings a transcription runs with.
+
+    The model and decoding parameters come from a named profile in the
+    config. The result is recorded alongside cached transcripts and batch
+    results, so any setting that changes the text must be included here.
+    Settings that only affect speed must be listed in
+    transcript_cache.RUNTIME_SETTINGS so they stay out of the cache key.
+
+    Args:
+        profile (str): Profile name ("fast", "balanced", "accurate", ...);
+            defaults to the configured profile
+
+    Returns:
+        dict: Profile name, model and decoding settings
+    """
+    profile = profile or config.get_transcription_setting("profile")
+    profile_settings = config.get_transcription_profile(profile)
+    if profile_settings is None:
+        raise ValueError(f"Unknown transcription profile: {profile}")
+    return {
+        "profile": profile,
         # Options: "tiny", "base", "small", "medium", "large"
-        model_size = "tiny"  # Fastest option with reasonable accuracy
-        
-        # Enable GPU acceleration if available
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        compute_type = "float16" if device == "cuda" else "int8"
-        
-        model = WhisperModel(model_size, device=device, compute_type=compute_type)
-        segments, info = model.transcribe(audio_path, beam_size=5)
-        return "".join(segment.text for segment in segments)
+        "model_size": profile_settings.get("model_size", "tiny"),
+        "compute_type": profile_settings.get("compute_type"),
+        "beam_size": profile_settings.get("beam_size", 5),
+        "vad_filter": bool(profile_settings.get("vad_filter", False)),
+        "cpu_threads": profile_settings.get("cpu_threads", 0),
+        "num_workers": profile_settings.get("num_workers", 1),
+        "word_timestamps": bool(config.get_transcription_setting("word_timestamps")),
+        "vad_prefilter": bool(config.get_transcription_setting("vad_prefilter")),
+        # Chunk boundaries can change the text of long recordings slightly
+        "chunk_seconds": config.get_transcription_setting("chunk_seconds"),
+    }
+
+def scale_for_workers(settings, workers):
+    """
+    Adapt settings for several threads transcribing at the same time.
+
+    The threads share one cached model, and faster-whisper only runs
+    concurrent transcribe() calls in parallel up to the model's
+    num_workers, so the model gets one worker per thread. Unless the
+    profile pins cpu_threads, the cores are split between the workers.
+
+    Args:
+        settings (dict): Settings from get_transcription_settings()
+        workers (int): Number of threads transcribing concurrently
+
+    Returns:
+        dict: Settings to transcribe with
+    """
+    if workers <= 1:
+        return settings
+    settings = dict(settings)
+    settings["num_workers"] = max(settings["num_workers"], workers)
+    if not settings["cpu_threads"]:
+        settings["cpu_threads"] = max(1, (os.cpu_count() or 1) // settings["num_workers"])
+    return settings
+
+def _get_profile_model(settings):
+    return model_registry.get_model(
+        settings["model_size"],
+        compute_type=settings["compute_type"],
+        cpu_threads=settings["cpu_threads"],
+        num_workers=settings["num_workers"],
+    )
+
+def _to_segment(segment, offset=0.0):
+    words = None
+    if segment.words:
+        words = [TranscriptWord(word.start + offset, word.end + offset, word.word) for word in segment.words]
+    return TranscriptSegment(segment.start + offset, segment.end + offset, segment.text, words)
+
+def get_chunk_workers(streams=1):
+    """
+    Get the number of worker processes for chunked transcription.
+
+    Args:
+        streams (int): Transcriptions running at the same time, e.g. the
+            batch transcription workers; they share the processes
+
+    Returns:
+        int: Configured chunk_workers, or one process per four cores,
+            divided between the streams
+    """
+    workers = config.get_transcription_setting("chunk_workers") or max(1, (os.cpu_count() or 1) // 4)
+    return max(1, workers // max(1, streams))
+
+# Model held by each chunk worker process, loaded once by _init_chunk_worker
+_worker_model = None
+_worker_settings = None
+
+def _init_chunk_worker(settings, cpu_threads):
+    global _worker_model, _worker_settings
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(
+        settings["model_size"],
+        device="cpu",
+        compute_type=settings["compute_type"] or "int8",
+        cpu_threads=cpu_threads,
+    )
+    _worker_settings = settings
+
+def _transcribe_chunk(offset, audio_chunk):
+    segments, _ = _worker_model.transcribe(
+        audio_chunk,
+        beam_size=_worker_settings["beam_size"],
+        vad_filter=_worker_settings["vad_filter"],
+        word_timestamps=_worker_settings["word_timestamps"],
+    )
+    return [_to_segment(segment, offset) for segment in segments]
+
+def transcribe_chunked(audio, settings=None, chunk_seconds=None, workers=None, progress_callback=None):
+    """
+    Transcribe long audio by splitting it into chunks decoded in parallel.
+
+    The audio is split at the quietest point near every chunk_seconds, the
+    chunks are transcribed by a pool of worker processes that each hold their
+    own model, and the segments are shifted by their chunk's start time and
+    yielded in order.
+
+    Args:
+        audio (numpy.ndarray): 16 kHz mono float32 samples
+        settings (dict): Transcription settings; defaults to get_transcription_settings()
+        chunk_seconds (float): Target chunk length in seconds
+        workers (int): Number of worker processes
+        progress_callback (function): Called with the fraction transcribed so far
+
+    Yields:
+        TranscriptSegment: Segment with start/end times in seconds
+    """
+    settings = settings or get_transcription_settings()
+    chunk_seconds = chunk_seconds or settings["chunk_seconds"]
+    # Concurrent transcriptions (see scale_for_workers) share the cores
+    streams = settings["num_workers"]
+    workers = workers or get_chunk_workers(streams)
+
+    bounds = [0] + find_split_points(audio, chunk_seconds) + [len(audio)]
+    chunks = [(bounds[i] / SAMPLE_RATE, audio[bounds[i]:bounds[i + 1]]) for i in range(len(bounds) - 1)]
+    # Share the cores between every stream's workers instead of oversubscribing them
+    cpu_threads = max(1, (os.cpu_count() or 1) // (workers * streams))
+    print(f"DEBUG: Transcribing {len(chunks)} chunks with {workers} worker processes")
+
+    # Forking a process that runs UI and worker threads and has OpenMP
+    # started (by a loaded model) can deadlock the children; spawn instead
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_chunk_worker,
+        initargs=(settings, cpu_threads),
+    ) as executor:
+        futures = [executor.submit(_transcribe_chunk, offset, chunk) for offset, chunk in chunks]
+        done_samples = 0
+        for future, (_, chunk) in zip(futures, chunks):
+            segments = future.result()
+            done_samples += len(chunk)
+            if progress_callback:
+                progress_callback(done_samples / len(audio))
+            yield from segments
+
+def _should_chunk(audio, settings):
+    threshold = config.get_transcription_setting("long_audio_threshold")
+    # With one process per stream, parallel streams already use the cores
+    if not threshold or get_chunk_workers(settings["num_workers"]) < 2:
+        return False
+    # Chunk workers run on the CPU; a GPU decodes a single stream fast enough
+    if get_default_device()[0] != "cpu":
+        return False
+    return len(audio) / SAMPLE_RATE >= threshold
+
+def _remap_segment(segment, time_map):
+    words = None
+    if segment.words:
+        words = [
+            TranscriptWord(time_map.to_original(word.start), time_map.to_original(word.end), word.word)
+            for word in segment.words
+        ]
+    return TranscriptSegment(time_map.to_original(segment.start), time_map.to_original(segment.end), segment.text, words)
+
+def transcribe_stream(audio, progress_callback=None, settings=None, report=None):
+    """
+    Transcribe audio incrementally, yielding segments as Whisper decodes them.
+
+    Consumers can display or process the transcript while the rest of the
+    audio is still being decoded. With the VAD prefilter enabled, silence
+    and quiet passages are cut out before decoding and segment times are
+    mapped back onto the original timeline.
+
+    Args:
+        audio: Audio file path or NumPy array of 16 kHz mono samples
+        progress_callback (function): Called with the fraction (0.0-1.0) of
+            the audio duration transcribed so far
+        settings (dict): Settings from get_transcription_settings(); the
+            configured profile is used when not given
+        report (dict): If given, filled with the audio and speech durations
+            and the fraction of audio the VAD prefilter skipped
+
+    Yields:
+        TranscriptSegment: Segment with start/end times in seconds
+    """
+    settings = settings or get_transcription_settings()
+    if isinstance(audio, str) and (settings["vad_prefilter"] or config.get_transcription_setting("long_audio_threshold")):
+        # faster-whisper decodes the whole file up front anyway
+        from faster_whisper import decode_audio
+        audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+
+    time_map = None
+    if settings["vad_prefilter"]:
+        total_samples = len(audio)
+        regions = detect_speech_regions(audio)
+        audio = remove_silence(audio, regions)
+        time_map = TimeMap(regions)
+        skipped = 1 - len(audio) / total_samples if total_samples else 0.0
+        print(f"DEBUG: VAD prefilter skipped {skipped:.0%} of the audio")
+        if report is not None:
+            report.update({
+                "audio_seconds": total_samples / SAMPLE_RATE,
+                "speech_seconds": len(audio) / SAMPLE_RATE,
+                "skipped_fraction": skipped,
+            })
+        if len(audio) == 0:
+            return
+
+    for segment in _transcribe_prepared(audio, settings, progress_callback):
+        yield _remap_segment(segment, time_map) if time_map is not None else segment
+
+def _transcribe_prepared(audio, settings, progress_callback):
+    if not isinstance(audio, str) and _should_chunk(audio, settings):
+        yield from transcribe_chunked(audio, settings, progress_callback=progress_callback)
+        return
+
+    model = _get_profile_model(settings)
+    segments, info = model.transcribe(
+        audio,
+        beam_size=settings["beam_size"],
+        vad_filter=settings["vad_filter"],
+        word_timestamps=settings["word_timestamps"],
+    )
+    duration = info.duration or 0
+    for segment in segments:
+        if progress_callback and duration:
+            progress_callback(min(1.0, segment.end / duration))
+        yield _to_segment(segment)
+    if progress_callback:
+        progress_callback(1.0)
+
+def transcribe_segments(audio, progress_callback=None, settings=None, report=None):
+    """
+    Transcribe audio into a timestamped Transcript.
+
+    Args:
+        audio: Audio file path or NumPy array of 16 kHz mono samples
+        progress_callback (function): Called with the fraction transcribed so far
+        settings (dict): Settings from get_transcription_settings()
+        report (dict): Filled with VAD statistics, as for transcribe_stream
+
+    Returns:
+        Transcript: Timestamped transcript, or None if transcription failed
+    """
+    try:
+        transcript = Transcript()
+        for segment in transcribe_stream(audio, progress_callback, settings, report):
+            transcript.append_segment(segment)
+        return transcript
     except Exception as e:
         print(e)
-        return None
\ No newline at end of file
+        return None
+
+def transcribe_audio(audio_path, progress_callback=None, settings=None):
+    transcript = transcribe_segments(audio_path, progress_callback, settings)
+    return transcript.text if transcript is not None else None
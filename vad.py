@@ -0,0 +1,157 @@
+import numpy as np
+
+# Whisper models expect 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+def frame_energies(audio, sample_rate=SAMPLE_RATE, frame_ms=30):
+    """
+    Compute the RMS energy of consecutive non-overlapping frames.
+    
+    Args:
+        audio (numpy.ndarray): Mono float32 samples
+        sample_rate (int): Sample rate in Hz
+        frame_ms (int): Frame length in milliseconds
+    
+    Returns:
+        numpy.ndarray: One RMS value per frame (a trailing partial frame is dropped)
+    """
+    frame_length = int(sample_rate * frame_ms / 1000)
+    frame_count = len(audio) // frame_length
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:frame_count * frame_length].reshape(frame_count, frame_length)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+def find_split_points(audio, chunk_seconds, sample_rate=SAMPLE_RATE, search_seconds=30, frame_ms=30):
+    """
+    Choose sample offsets that split audio into chunks at quiet moments.
+    
+    Each boundary starts chunk_seconds after the previous one and moves to
+    the quietest frame within search_seconds before that, so chunks rarely
+    cut through a word. Chunks are never shorter than half of chunk_seconds.
+    
+    Args:
+        audio (numpy.ndarray): Mono float32 samples
+        chunk_seconds (float): Target chunk length in seconds
+        sample_rate (int): Sample rate in Hz
+        search_seconds (float): How far back from each target to look for silence
+        frame_ms (int): Frame length used for the energy measurement
+    
+    Returns:
+        list: Sample offsets of the chunk boundaries, excluding 0 and the end
+    """
+    energies = frame_energies(audio, sample_rate, frame_ms)
+    frame_length = int(sample_rate * frame_ms / 1000)
+    frames_per_chunk = int(chunk_seconds * 1000 / frame_ms)
+    search_frames = int(search_seconds * 1000 / frame_ms)
+    
+    split_points = []
+    previous = 0
+    target = frames_per_chunk
+    while target < len(energies):
+        window_start = max(previous + frames_per_chunk // 2, target - search_frames)
+        quietest = window_start + int(np.argmin(energies[window_start:target + 1]))
+        split_points.append(quietest * frame_length)
+        previous = quietest
+        target = quietest + frames_per_chunk
+    return split_points
+
+def detect_speech_regions(audio, sample_rate=SAMPLE_RATE, frame_ms=30, margin_db=12,
+                          min_silence_ms=500, min_speech_ms=250, pad_ms=200):
+    """
+    Find the spans of audio that contain sound worth transcribing.
+    
+    Frames are classified by RMS energy against a threshold derived from
+    the recording itself: a fixed margin above its noise floor, capped
+    below its loud passages, and never below -60 dBFS. Runs of speech are
+    then merged across short pauses, very short blips are dropped, and each
+    region is padded so word edges are not clipped. Everything is computed
+    with vectorized NumPy operations over the frame array.
+    
+    Args:
+        audio (numpy.ndarray): Mono float32 samples
+        sample_rate (int): Sample rate in Hz
+        frame_ms (int): Frame length in milliseconds
+        margin_db (float): How far above the noise floor a frame must be
+        min_silence_ms (int): Shorter pauses do not split a region
+        min_speech_ms (int): Shorter regions are dropped
+        pad_ms (int): Padding added to both ends of every region
+    
+    Returns:
+        list: (start_sample, end_sample) tuples in ascending order
+    """
+    energies = frame_energies(audio, sample_rate, frame_ms)
+    if len(energies) == 0:
+        return [(0, len(audio))] if len(audio) else []
+    frame_length = int(sample_rate * frame_ms / 1000)
+    
+    levels_db = 20 * np.log10(energies + 1e-10)
+    noise_floor = np.percentile(levels_db, 10)
+    peak = np.percentile(levels_db, 99)
+    threshold = max(-60.0, min(noise_floor + margin_db, peak - 20))
+    speech = levels_db >= threshold
+    
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+    
+    starts, ends = _merge_close_regions(starts, ends, min_silence_ms // frame_ms)
+    long_enough = (ends - starts) >= max(1, min_speech_ms // frame_ms)
+    starts, ends = starts[long_enough], ends[long_enough]
+    
+    pad = pad_ms * sample_rate // 1000
+    starts = np.maximum(starts * frame_length - pad, 0)
+    ends = np.minimum(ends * frame_length + pad, len(audio))
+    starts, ends = _merge_close_regions(starts, ends, 0)
+    return [(int(start), int(end)) for start, end in zip(starts, ends)]
+
+def _merge_close_regions(starts, ends, min_gap):
+    # Join neighbouring regions separated by less than min_gap (or overlapping)
+    if len(starts) < 2:
+        return starts, ends
+    keep_gap = (starts[1:] - ends[:-1]) >= max(min_gap, 1)
+    return starts[np.concatenate(([True], keep_gap))], ends[np.concatenate((keep_gap, [True]))]
+
+def remove_silence(audio, regions):
+    """
+    Concatenate the speech regions of the audio.
+    
+    Args:
+        audio (numpy.ndarray): Mono float32 samples
+        regions (list): (start_sample, end_sample) tuples from detect_speech_regions
+    
+    Returns:
+        numpy.ndarray: Samples of the speech regions only
+    """
+    if not regions:
+        return audio[:0]
+    return np.concatenate([audio[start:end] for start, end in regions])
+
+class TimeMap:
+    """
+    Maps times in audio produced by remove_silence back to the original audio.
+    """
+    
+    def __init__(self, regions, sample_rate=SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.original_starts = np.array([start for start, _ in regions], dtype=np.int64)
+        lengths = np.array([end - start for start, end in regions], dtype=np.int64)
+        self.compressed_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(regions) else lengths
+    
+    def to_original(self, seconds):
+        """
+        Convert a time in the speech-only audio to the original timeline.
+        
+        Args:
+            seconds (float): Time in the speech-only audio
+        
+        Returns:
+            float: Time in the original audio
+        """
+        if len(self.original_starts) == 0:
+            return seconds
+        sample = seconds * self.sample_rate
+        index = max(0, int(np.searchsorted(self.compressed_starts, sample, side="right")) - 1)
+        return (self.original_starts[index] + sample - self.compressed_starts[index]) / self.sample_rate
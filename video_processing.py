@@ -1,9 +1,162 @@
 import ffmpeg
+import numpy as np
 import os
+import atexit
+import shutil
+import tempfile
+import threading
+import time
+from config import config
+from vad import SAMPLE_RATE as WHISPER_SAMPLE_RATE
 
-def extract_audio(video_path):
+# Prefix of the per-job temp directories created by this module
+TEMP_DIR_PREFIX = "yt_job_"
+
+# RAM-backed storage is only used when it has at least this much free space
+MIN_RAM_TEMP_FREE_BYTES = 512 * 1024 * 1024
+
+# Per-job temp directories older than this were left by a process that
+# crashed; no job runs this long
+STALE_TEMP_DIR_SECONDS = 24 * 3600
+
+_temp_dirs = set()
+_temp_dirs_lock = threading.Lock()
+
+def get_temp_root():
+    """
+    Pick the directory that per-job temp directories are created in.
+    
+    Uses the configured temp_dir if set, otherwise RAM-backed /dev/shm when
+    it exists and has room, otherwise the system temp directory.
+    
+    Returns:
+        str: Temp root directory
+    """
+    configured = config.get_cache_setting("temp_dir")
+    if configured:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    
+    ram_dir = "/dev/shm"
+    if config.get_cache_setting("prefer_ram_temp") and os.path.isdir(ram_dir) and os.access(ram_dir, os.W_OK):
+        try:
+            if shutil.disk_usage(ram_dir).free >= MIN_RAM_TEMP_FREE_BYTES:
+                return ram_dir
+        except OSError:
+            pass
+    return tempfile.gettempdir()
+
+def create_job_temp_dir():
+    """
+    Create a unique temp directory for one job.
+    
+    The directory is removed by remove_job_temp_dir, or at interpreter exit
+    if the job never cleaned up.
+    
+    Returns:
+        str: Path to the new directory
+    """
+    path = tempfile.mkdtemp(prefix=TEMP_DIR_PREFIX, dir=get_temp_root())
+    with _temp_dirs_lock:
+        _temp_dirs.add(path)
+    return path
+
+def remove_job_temp_dir(path):
+    """
+    Remove a temp directory created by create_job_temp_dir.
+    
+    Args:
+        path (str): Directory to remove
+    """
+    with _temp_dirs_lock:
+        _temp_dirs.discard(path)
+    try:
+        shutil.rmtree(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Warning: Could not remove temporary directory: {e}")
+
+def cleanup_audio(audio_path):
+    """
+    Remove an extracted audio file together with its per-job temp directory.
+    
+    Args:
+        audio_path (str): Path returned by extract_audio
+    """
+    if not audio_path:
+        return
+    job_dir = os.path.dirname(audio_path)
+    with _temp_dirs_lock:
+        managed = job_dir in _temp_dirs
+    if managed:
+        remove_job_temp_dir(job_dir)
+        return
+    # Clean up temporary audio file
+    try:
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+    except Exception as e:
+        print(f"Warning: Could not remove temporary audio file: {e}")
+
+def remove_stale_temp_dirs(max_age=STALE_TEMP_DIR_SECONDS):
+    """
+    Remove per-job temp directories that a crashed process left behind.
+    
+    Args:
+        max_age (float): Only remove directories not modified for this
+            many seconds, so those of running processes are kept
+    
+    Returns:
+        int: Number of directories removed
+    """
+    cutoff = time.time() - max_age
+    roots = {get_temp_root(), tempfile.gettempdir()}
+    with _temp_dirs_lock:
+        active = set(_temp_dirs)
+    removed = 0
+    for root in roots:
+        try:
+            entries = list(os.scandir(root))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                stale = entry.name.startswith(TEMP_DIR_PREFIX) and entry.is_dir() and entry.stat().st_mtime < cutoff
+            except OSError:
+                continue
+            if stale and entry.path not in active:
+                remove_job_temp_dir(entry.path)
+                removed += 1
+    return removed
+
+@atexit.register
+def _remove_leftover_temp_dirs():
+    with _temp_dirs_lock:
+        leftover = list(_temp_dirs)
+    for path in leftover:
+        remove_job_temp_dir(path)
+
+def extract_audio(video_path, output_dir=None):
+    """
+    Extract the audio track of a video into a per-job temp directory.
+    
+    Every call writes to its own file, so any number of extractions can run
+    at once. Pass the returned path to cleanup_audio when done with it.
+    
+    Args:
+        video_path (str): Path to the video file
+        output_dir (str): Directory to write into; a new per-job temp
+            directory is created when not given
+    
+    Returns:
+        str: Path to the extracted audio, or None if extraction failed
+    """
+    created_dir = output_dir is None
+    if created_dir:
+        output_dir = create_job_temp_dir()
+    audio_path = os.path.join(output_dir, "audio.aac")
     try:
-        audio_path = "temp_audio.aac"
         (
             ffmpeg
             .input(video_path)
@@ -13,4 +166,60 @@ def extract_audio(video_path):
         return audio_path
     except ffmpeg.Error as e:
         print(e.stderr)
-        return None
\ No newline at end of file
+        if created_dir:
+            remove_job_temp_dir(output_dir)
+        return None
+
+
+def decode_audio(video_path, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Decode the audio track of a video straight into memory.
+    
+    ffmpeg resamples to mono float32 PCM and writes it to a pipe, so nothing
+    touches the disk and Whisper does not have to decode the audio again.
+    
+    Args:
+        video_path (str): Path to the video file
+        sample_rate (int): Output sample rate in Hz
+    
+    Returns:
+        numpy.ndarray: Mono float32 samples, or None if decoding failed
+    """
+    try:
+        out, _ = (
+            ffmpeg
+            .input(video_path)
+            .output('pipe:', format='f32le', acodec='pcm_f32le', ac=1, ar=sample_rate)
+            .run(cmd="ffmpeg", capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        print(e.stderr)
+        return None
+    audio = np.frombuffer(out, dtype=np.float32)
+    if audio.size == 0:
+        return None
+    return audio
+
+def prepare_audio(video_path):
+    """
+    Get a video's audio in the form the transcriber should consume.
+    
+    With streaming enabled the audio is decoded to an in-memory array; if
+    that fails, or streaming is disabled, the audio is extracted to a
+    per-job temp file instead.
+    
+    Args:
+        video_path (str): Path to the video file
+    
+    Returns:
+        tuple: (audio, audio_path). audio is a NumPy array or a file path to
+            pass to transcribe_audio, or None on failure. audio_path is the
+            temp file to pass to cleanup_audio, or None if none was written.
+    """
+    if config.get_transcription_setting("stream_audio"):
+        audio = decode_audio(video_path)
+        if audio is not None:
+            return audio, None
+        print("DEBUG: Streaming decode failed; falling back to extracting an audio file")
+    audio_path = extract_audio(video_path)
+    return audio_path, audio_path